@@ -0,0 +1,59 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from app import models  # noqa: F401  (registers the tables on Base.metadata)
+from app.database import DATABASE_URL, Base
+
+config = context.config
+if config.config_file_name is not None:
+    # Keep the app loggers (e.g. app.slow_queries) when migrations run in-process
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+# FTS5 shadow tables are maintained by raw DDL, not the metadata
+IGNORED_TABLES = {"books_fts", "books_fts_config", "books_fts_data", "books_fts_docsize", "books_fts_idx"}
+
+def include_object(object, name, type_, reflected, compare_to):
+    return not (type_ == "table" and name in IGNORED_TABLES)
+
+def _url() -> str:
+    return config.get_main_option("sqlalchemy.url") or DATABASE_URL
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=True,
+        include_object=include_object,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def _run(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        # SQLite cannot ALTER constraints in place; batch mode recreates the table
+        render_as_batch=connection.dialect.name == "sqlite",
+        include_object=include_object,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online() -> None:
+    # Callers (e.g. tests) may pass an open connection via config.attributes
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run(connection)
+        return
+    with create_engine(_url(), poolclass=pool.NullPool).connect() as connection:
+        _run(connection)
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,75 @@
+"""Baseline schema
+
+The schema as ``Base.metadata.create_all`` created it before migrations were
+introduced. Databases created that way should be stamped at this revision
+(``alembic stamp 0001``) and then upgraded.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def _timestamps():
+    return [
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    ]
+
+def upgrade() -> None:
+    op.create_table(
+        "authors",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("biography", sa.Text()),
+        sa.Column("email", sa.String(255)),
+        *_timestamps(),
+    )
+    op.create_index("ix_authors_id", "authors", ["id"])
+    op.create_index("ix_authors_name", "authors", ["name"])
+    op.create_index("ix_authors_email", "authors", ["email"], unique=True)
+
+    op.create_table(
+        "categories",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("description", sa.Text()),
+        *_timestamps(),
+    )
+    op.create_index("ix_categories_id", "categories", ["id"])
+    op.create_index("ix_categories_name", "categories", ["name"], unique=True)
+
+    op.create_table(
+        "books",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("isbn", sa.String(13)),
+        sa.Column("description", sa.Text()),
+        sa.Column("price", sa.Float(), nullable=False),
+        sa.Column("stock_quantity", sa.Integer()),
+        sa.Column("published_date", sa.DateTime()),
+        sa.Column("author_id", sa.Integer(), sa.ForeignKey("authors.id")),
+        *_timestamps(),
+    )
+    op.create_index("ix_books_id", "books", ["id"])
+    op.create_index("ix_books_title", "books", ["title"])
+    op.create_index("ix_books_isbn", "books", ["isbn"], unique=True)
+
+    op.create_table(
+        "book_category",
+        sa.Column("book_id", sa.Integer(), sa.ForeignKey("books.id")),
+        sa.Column("category_id", sa.Integer(), sa.ForeignKey("categories.id")),
+    )
+
+def downgrade() -> None:
+    op.drop_table("book_category")
+    op.drop_table("books")
+    op.drop_table("categories")
+    op.drop_table("authors")
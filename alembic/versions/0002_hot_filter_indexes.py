@@ -0,0 +1,73 @@
+"""Indexes for the book list filters and a book_category primary key
+
+``get_books`` filters and sorts on price, stock_quantity and author_id and
+joins book_category from both sides, all of which were unindexed. The
+composite indexes end in ``id`` so keyset pages ordered by ``(column, id)``
+are index range scans. book_category gets a ``(book_id, category_id)``
+primary key (duplicate links are removed first) plus the reverse index for
+the category filter. Title search gets ``lower(title)`` and, on PostgreSQL,
+a trigram index so ILIKE substring matches stop scanning the table.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+BOOK_INDEXES = [
+    ("ix_books_author_id_id", ["author_id", "id"]),
+    ("ix_books_price_id", ["price", "id"]),
+    ("ix_books_stock_quantity_id", ["stock_quantity", "id"]),
+]
+
+def _dedupe_book_category(dialect: str) -> None:
+    op.execute("DELETE FROM book_category WHERE book_id IS NULL OR category_id IS NULL")
+    if dialect == "postgresql":
+        op.execute(
+            "DELETE FROM book_category a USING book_category b "
+            "WHERE a.ctid > b.ctid AND a.book_id = b.book_id AND a.category_id = b.category_id"
+        )
+    else:
+        op.execute(
+            "DELETE FROM book_category WHERE rowid NOT IN "
+            "(SELECT min(rowid) FROM book_category GROUP BY book_id, category_id)"
+        )
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    for name, columns in BOOK_INDEXES:
+        op.create_index(name, "books", columns)
+    op.create_index("ix_books_title_lower", "books", [sa.text("lower(title)")])
+    if dialect == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute("CREATE INDEX IF NOT EXISTS ix_books_title_trgm ON books USING gin (title gin_trgm_ops)")
+
+    _dedupe_book_category(dialect)
+    with op.batch_alter_table("book_category", recreate="auto") as batch_op:
+        batch_op.alter_column("book_id", existing_type=sa.Integer(), nullable=False)
+        batch_op.alter_column("category_id", existing_type=sa.Integer(), nullable=False)
+        batch_op.create_primary_key("book_category_pkey", ["book_id", "category_id"])
+    op.create_index("ix_book_category_category_id_book_id", "book_category", ["category_id", "book_id"])
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    op.drop_index("ix_book_category_category_id_book_id", table_name="book_category")
+    with op.batch_alter_table("book_category", recreate="auto") as batch_op:
+        batch_op.drop_constraint("book_category_pkey", type_="primary")
+        batch_op.alter_column("book_id", existing_type=sa.Integer(), nullable=True)
+        batch_op.alter_column("category_id", existing_type=sa.Integer(), nullable=True)
+
+    if dialect == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_books_title_trgm")
+    op.drop_index("ix_books_title_lower", table_name="books")
+    for name, _ in reversed(BOOK_INDEXES):
+        op.drop_index(name, table_name="books")
@@ -0,0 +1,39 @@
+"""Denormalized books_count on authors and categories
+
+Author and category listings with book counts needed a COUNT(*) over books
+or book_category per request. Both tables get a ``books_count`` column,
+backfilled here and kept current by the book writes in ``crud``, plus a
+``(books_count, id)`` index for the "top authors/categories" endpoints.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+BACKFILL = {
+    "authors": "UPDATE authors SET books_count = "
+               "(SELECT count(*) FROM books WHERE books.author_id = authors.id)",
+    "categories": "UPDATE categories SET books_count = "
+                  "(SELECT count(*) FROM book_category WHERE book_category.category_id = categories.id)",
+}
+
+def upgrade() -> None:
+    for table, backfill in BACKFILL.items():
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column("books_count", sa.Integer(), nullable=False, server_default="0"))
+        op.execute(backfill)
+        op.create_index(f"ix_{table}_books_count_id", table, ["books_count", "id"])
+
+def downgrade() -> None:
+    for table in reversed(list(BACKFILL)):
+        op.drop_index(f"ix_{table}_books_count_id", table_name=table)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column("books_count")
@@ -0,0 +1,34 @@
+"""Row version columns on authors, categories and books
+
+The ORM increments ``version`` on every UPDATE (``version_id_col``); it
+feeds ETags and the optimistic ``expected_version`` checks. Existing rows
+start at 1.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+TABLES = ("authors", "categories", "books")
+
+def upgrade() -> None:
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+
+def downgrade() -> None:
+    # Dropping a column rebuilds the table on SQLite, which loses the
+    # expression index from 0002 (reflection cannot see it): re-create it
+    for table in reversed(TABLES):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column("version")
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute("CREATE INDEX IF NOT EXISTS ix_books_title_lower ON books (lower(title))")
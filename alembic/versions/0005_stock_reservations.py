@@ -0,0 +1,41 @@
+"""Stock reservation tables
+
+A reservation holds stock for a set of books until it is committed,
+released or expires (see ``crud.reserve_stock``).
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        "stock_reservations",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("status", sa.String(16), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_stock_reservations_id", "stock_reservations", ["id"])
+    op.create_index("ix_stock_reservations_status", "stock_reservations", ["status"])
+    op.create_index("ix_stock_reservations_expires_at", "stock_reservations", ["expires_at"])
+
+    op.create_table(
+        "stock_reservation_items",
+        sa.Column("reservation_id", sa.Integer(), sa.ForeignKey("stock_reservations.id"), primary_key=True),
+        sa.Column("book_id", sa.Integer(), sa.ForeignKey("books.id"), primary_key=True),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+    )
+
+def downgrade() -> None:
+    op.drop_table("stock_reservation_items")
+    op.drop_table("stock_reservations")
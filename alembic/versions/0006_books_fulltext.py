@@ -0,0 +1,58 @@
+"""Full-text search over book titles and descriptions
+
+SQLite gets an external-content FTS5 table kept in sync by triggers and
+rebuilt here from the existing books; PostgreSQL gets expression GIN
+indexes over ``to_tsvector``. The statements match the ones ``models``
+attaches to ``create_all`` (copied, so later model changes do not alter
+this revision).
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+BOOKS_FTS_SQLITE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5("
+    "title, description, content='books', content_rowid='id', tokenize='unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS books_fts_ai AFTER INSERT ON books BEGIN "
+    "INSERT INTO books_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS books_fts_ad AFTER DELETE ON books BEGIN "
+    "INSERT INTO books_fts(books_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS books_fts_au AFTER UPDATE OF title, description ON books BEGIN "
+    "INSERT INTO books_fts(books_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO books_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+]
+BOOKS_FTS_POSTGRESQL = [
+    "CREATE INDEX IF NOT EXISTS ix_books_title_fts ON books "
+    "USING gin (to_tsvector('simple', coalesce(title, '')))",
+    "CREATE INDEX IF NOT EXISTS ix_books_fts ON books "
+    "USING gin (to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(description, '')))",
+]
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for statement in BOOKS_FTS_SQLITE:
+            op.execute(statement)
+        # The triggers only cover future writes: index the books already there
+        op.execute("INSERT INTO books_fts(books_fts) VALUES('rebuild')")
+    elif dialect == "postgresql":
+        for statement in BOOKS_FTS_POSTGRESQL:
+            op.execute(statement)
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for trigger in ("books_fts_ai", "books_fts_ad", "books_fts_au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS books_fts")
+    elif dialect == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_books_title_fts")
+        op.execute("DROP INDEX IF EXISTS ix_books_fts")
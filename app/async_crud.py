@@ -0,0 +1,185 @@
+from typing import Any, AsyncIterator, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import crud, models, schemas
+
+# Async counterparts of the ``crud`` functions for ``AsyncSession``.
+#
+# Each one runs the sync implementation through ``AsyncSession.run_sync``:
+# the SQL goes through the async driver on the event loop (no threadpool
+# worker is held while waiting on the database) and the query logic stays in
+# one place. Book writes re-read the book so author and categories are loaded
+# before the object leaves the session's greenlet.
+
+# Author operations
+async def create_author(db: AsyncSession, author: schemas.AuthorCreate) -> models.Author:
+    return await db.run_sync(crud.create_author, author)
+
+async def get_author(db: AsyncSession, author_id: int) -> Optional[models.Author]:
+    return await db.run_sync(crud.get_author, author_id)
+
+async def get_authors_by_ids(db: AsyncSession, ids: List[int]) -> Tuple[List[models.Author], List[int]]:
+    return await db.run_sync(crud.get_authors_by_ids, ids)
+
+async def get_authors(db: AsyncSession, skip: int = 0, limit: int = 100, after: Optional[int] = None) -> List[models.Author]:
+    return await db.run_sync(crud.get_authors, skip, limit, after)
+
+async def get_top_authors(db: AsyncSession, limit: int = 10) -> List[models.Author]:
+    return await db.run_sync(crud.get_top_authors, limit)
+
+async def update_author(db: AsyncSession, author_id: int, author: schemas.AuthorUpdate) -> Optional[models.Author]:
+    return await db.run_sync(crud.update_author, author_id, author)
+
+async def delete_author(db: AsyncSession, author_id: int) -> bool:
+    return await db.run_sync(crud.delete_author, author_id)
+
+# Category operations
+async def create_category(db: AsyncSession, category: schemas.CategoryCreate) -> models.Category:
+    return await db.run_sync(crud.create_category, category)
+
+async def get_category(db: AsyncSession, category_id: int) -> Optional[models.Category]:
+    return await db.run_sync(crud.get_category, category_id)
+
+async def get_categories_by_ids(db: AsyncSession, ids: List[int]) -> Tuple[List[models.Category], List[int]]:
+    return await db.run_sync(crud.get_categories_by_ids, ids)
+
+async def get_categories(db: AsyncSession, skip: int = 0, limit: int = 100, after: Optional[int] = None) -> List[models.Category]:
+    return await db.run_sync(crud.get_categories, skip, limit, after)
+
+async def get_top_categories(db: AsyncSession, limit: int = 10) -> List[models.Category]:
+    return await db.run_sync(crud.get_top_categories, limit)
+
+async def update_category(db: AsyncSession, category_id: int, category: schemas.CategoryUpdate) -> Optional[models.Category]:
+    return await db.run_sync(crud.update_category, category_id, category)
+
+async def delete_category(db: AsyncSession, category_id: int) -> bool:
+    return await db.run_sync(crud.delete_category, category_id)
+
+# Book operations
+def _reloaded(session, book: Optional[models.Book]) -> Optional[models.Book]:
+    return crud.get_book(session, book.id) if book is not None else None
+
+async def create_book(db: AsyncSession, book: schemas.BookCreate) -> models.Book:
+    return await db.run_sync(lambda session: _reloaded(session, crud.create_book(session, book)))
+
+async def get_book(db: AsyncSession, book_id: int) -> Optional[models.Book]:
+    return await db.run_sync(crud.get_book, book_id)
+
+async def get_books_by_ids(db: AsyncSession, ids: List[int]) -> Tuple[List[models.Book], List[int]]:
+    return await db.run_sync(crud.get_books_by_ids, ids)
+
+async def get_books(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    search: Optional[schemas.BookSearch] = None,
+    sort: Optional[str] = None,
+    after: Optional[Tuple[Any, ...]] = None
+) -> List[models.Book]:
+    return await db.run_sync(crud.get_books, skip, limit, search, sort, after)
+
+async def get_books_page(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    search: Optional[schemas.BookSearch] = None
+) -> Tuple[List[models.Book], int]:
+    return await db.run_sync(crud.get_books_page, skip, limit, search)
+
+async def get_row_versions(
+    db: AsyncSession,
+    model,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[int] = None,
+    ids: Optional[List[int]] = None
+) -> List[Tuple[int, int, int]]:
+    return await db.run_sync(crud.get_row_versions, model, skip, limit, after, ids)
+
+async def book_version_keys(db: AsyncSession, book_ids: List[int]) -> List[tuple]:
+    return await db.run_sync(crud.book_version_keys, book_ids)
+
+async def get_book_versions(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    search: Optional[schemas.BookSearch] = None,
+    sort: Optional[str] = None,
+    after: Optional[Tuple[Any, ...]] = None
+) -> Tuple[List[tuple], int]:
+    return await db.run_sync(crud.get_book_versions, skip, limit, search, sort, after)
+
+async def get_book_summaries(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    search: Optional[schemas.BookSearch] = None,
+    sort: Optional[str] = None,
+    after: Optional[Tuple[Any, ...]] = None
+) -> List[Any]:
+    return await db.run_sync(crud.get_book_summaries, skip, limit, search, sort, after)
+
+async def get_books_count(db: AsyncSession, search: Optional[schemas.BookSearch] = None) -> int:
+    return await db.run_sync(crud.get_books_count, search)
+
+async def get_book_facets(db: AsyncSession, search: Optional[schemas.BookSearch] = None) -> schemas.BookFacets:
+    return await db.run_sync(crud.get_book_facets, search)
+
+async def search_books(db: AsyncSession, q: str, skip: int = 0, limit: int = 100) -> List[models.Book]:
+    return await db.run_sync(crud.search_books, q, skip, limit)
+
+async def iter_book_rows(
+    db: AsyncSession,
+    search: Optional[schemas.BookSearch] = None,
+    batch_size: int = 1000
+) -> AsyncIterator[List[dict]]:
+    """Batches of ``crud.iter_book_rows``: the same query, streamed through
+    ``AsyncSession.stream`` (a server-side cursor) ``batch_size`` rows at a time."""
+    statement = await db.run_sync(lambda session: crud.book_rows_query(session, search).statement)
+    result = await db.stream(statement, execution_options={"yield_per": batch_size})
+    async for batch in result.partitions(batch_size):
+        yield await db.run_sync(crud.with_category_ids, batch)
+
+async def update_book(db: AsyncSession, book_id: int, book: schemas.BookUpdate) -> Optional[models.Book]:
+    return await db.run_sync(lambda session: _reloaded(session, crud.update_book(session, book_id, book)))
+
+async def delete_book(db: AsyncSession, book_id: int) -> bool:
+    return await db.run_sync(crud.delete_book, book_id)
+
+async def update_book_stock(db: AsyncSession, book_id: int, quantity_change: int) -> Optional[models.Book]:
+    return await db.run_sync(
+        lambda session: _reloaded(session, crud.update_book_stock(session, book_id, quantity_change))
+    )
+
+# Bulk import
+async def bulk_create_authors(
+    db: AsyncSession, records: List[Any], start: int, result: schemas.BulkImportResult
+) -> schemas.BulkImportResult:
+    return await db.run_sync(crud.bulk_create_authors, records, len(records), start, result)
+
+async def bulk_create_categories(
+    db: AsyncSession, records: List[Any], start: int, result: schemas.BulkImportResult
+) -> schemas.BulkImportResult:
+    return await db.run_sync(crud.bulk_create_categories, records, len(records), start, result)
+
+async def bulk_create_books(
+    db: AsyncSession, records: List[Any], start: int, result: schemas.BulkImportResult
+) -> schemas.BulkImportResult:
+    return await db.run_sync(crud.bulk_create_books, records, len(records), start, result)
+
+# Stock reservations
+async def reserve_stock(db: AsyncSession, reservation: schemas.ReservationCreate) -> models.StockReservation:
+    return await db.run_sync(crud.reserve_stock, reservation)
+
+async def get_reservation(db: AsyncSession, reservation_id: int) -> Optional[models.StockReservation]:
+    return await db.run_sync(crud.get_reservation, reservation_id)
+
+async def commit_reservation(db: AsyncSession, reservation_id: int) -> Optional[models.StockReservation]:
+    return await db.run_sync(crud.commit_reservation, reservation_id)
+
+async def release_reservation(db: AsyncSession, reservation_id: int) -> Optional[models.StockReservation]:
+    return await db.run_sync(crud.release_reservation, reservation_id)
+
+async def release_expired_reservations(db: AsyncSession) -> int:
+    return await db.run_sync(crud.release_expired_reservations)
@@ -0,0 +1,450 @@
+from fastapi import FastAPI, Depends, Query, HTTPException, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.exc import StaleDataError
+from typing import List, Optional
+import math
+
+from . import async_crud, crud, models, schemas
+from .bulk import RecordDecoder, format_from_content_type, stream_chunks
+from .cache import book_dependencies, cached
+from .conditional import conditional, rows_etag
+from .database import get_async_db
+from .export import MEDIA_TYPES, render_batches
+from .metrics import MetricsMiddleware, metrics_response
+from .profiling import ProfilingMiddleware, router as profiling_router
+from .pagination import decode_cursor, next_cursor, parse_ids
+from .serialization import FastJSONResponse, model_data, model_response
+
+# Database-backed API with async endpoints. Run with
+#   uvicorn app.async_main:app
+# Each request awaits the database on the event loop instead of occupying a
+# threadpool worker, so one worker can hold many slow clients.
+
+app = FastAPI(
+    title="Book Store Service",
+    description="A comprehensive book store management API",
+    version="1.0.0",
+    docs_url="/docs",
+    redoc_url="/redoc",
+    default_response_class=FastJSONResponse,
+)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+app.add_middleware(ProfilingMiddleware)
+# Added last, so it is outermost and also times the CORS middleware
+app.add_middleware(MetricsMiddleware)
+app.include_router(profiling_router)
+
+@app.exception_handler(StaleDataError)
+async def stale_data(request: Request, exc: StaleDataError):
+    # The row's version (models: version_id_col) moved between read and write:
+    # a concurrent update won, so the client should reload and retry
+    return FastJSONResponse(
+        {"detail": "The resource was modified by another request; reload it and retry"},
+        status_code=409,
+    )
+
+@app.get("/", tags=["Root"])
+async def read_root():
+    return {
+        "message": "Welcome to Book Store Service API",
+        "version": "1.0.0",
+        "docs": "/docs",
+        "redoc": "/redoc"
+    }
+
+@app.get("/health", tags=["Health"])
+async def health_check():
+    return {"status": "healthy", "service": "book-store-service"}
+
+@app.get("/metrics", tags=["Health"], include_in_schema=False)
+async def metrics():
+    """Prometheus text-format metrics."""
+    return metrics_response()
+
+# Serializers, built once; endpoints return model_response(...), or
+# model_data(...) under ``cached``/``conditional``, so FastAPI does not
+# validate and encode the rows a second time
+AUTHOR = TypeAdapter(schemas.AuthorResponse)
+CATEGORY = TypeAdapter(schemas.CategoryResponse)
+BOOK = TypeAdapter(schemas.BookResponse)
+AUTHOR_LIST = TypeAdapter(List[schemas.AuthorResponse])
+CATEGORY_LIST = TypeAdapter(List[schemas.CategoryResponse])
+BOOK_LIST = TypeAdapter(List[schemas.BookResponse])
+SUMMARY_LIST = TypeAdapter(List[schemas.BookSummary])
+BOOK_PAGE = TypeAdapter(schemas.PaginatedResponse)
+AUTHOR_BATCH = TypeAdapter(schemas.AuthorBatch)
+CATEGORY_BATCH = TypeAdapter(schemas.CategoryBatch)
+BOOK_BATCH = TypeAdapter(schemas.BookBatch)
+
+IDS_QUERY = Query(..., description="Ids to fetch, comma-separated and/or repeated")
+TOP_LIMIT = Query(10, ge=1, le=100)
+
+def _batch_ids(ids: List[str]) -> List[int]:
+    try:
+        return parse_ids(ids)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+CURSOR_QUERY = Query(
+    None,
+    description="Keyset pagination cursor: send an empty value for the first page, "
+                "then the previous response's next_cursor",
+)
+BOOK_SORT_QUERY = Query("id", pattern="^(id|title|price|stock_quantity)$", description="Sort key of cursor pages")
+FIELDS_QUERY = Query(
+    "full", pattern="^(full|summary)$",
+    description="summary: id, title, price, stock_quantity and author_name only (no embedded rows)",
+)
+
+def _cursor_after(cursor: Optional[str], sort: str = "id") -> Optional[tuple]:
+    try:
+        after = decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if after is not None and len(after) != (1 if sort == "id" else 2):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return after
+
+def _cursor_page(adapter: TypeAdapter, items: list, limit: int, sort: str = "id") -> dict:
+    return {
+        "items": model_data(adapter, items),
+        "next_cursor": next_cursor(items[-1] if items else None, limit, len(items), sort),
+    }
+
+BULK_CHUNK_SIZE = 1000
+
+async def _bulk_import(request: Request, fmt: Optional[str], import_chunk, db: AsyncSession) -> schemas.BulkImportResult:
+    # Each chunk goes to crud.bulk_create_* (validation, IN checks, one
+    # executemany) as soon as it has streamed in
+    try:
+        decoder = RecordDecoder(fmt or format_from_content_type(request.headers.get("content-type")))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    result = schemas.BulkImportResult()
+    async for row, chunk in stream_chunks(request.stream(), decoder, BULK_CHUNK_SIZE):
+        await import_chunk(db, chunk, row, result)
+    return result
+
+# ETags come from version keys read before the payload is built (see
+# crud.get_row_versions and crud.book_version_keys). Cached entries are keyed
+# on them too, so a worker's cache cannot outlive another worker's write.
+async def _row_etag(name: str, model, row_id: int, db: AsyncSession) -> Optional[str]:
+    rows = await async_crud.get_row_versions(db, model, ids=[row_id])
+    return rows_etag(name, rows) if rows else None
+
+def _list_etag(name: str, model):
+    async def etag_for(skip: int, limit: int, cursor: Optional[str], db: AsyncSession) -> str:
+        after = _cursor_after(cursor)
+        skip = 0 if cursor is not None else skip
+        rows = await async_crud.get_row_versions(db, model, skip, limit, after[-1] if after else None)
+        return rows_etag(name, rows, skip, limit, cursor is not None)
+    return etag_for
+
+async def _book_etag(book_id: int, db: AsyncSession) -> Optional[str]:
+    keys = await async_crud.book_version_keys(db, [book_id])
+    return rows_etag("book", keys) if keys else None
+
+async def _books_etag(
+    page: int, size: int, cursor: Optional[str], sort: str, fields: str, facets: bool, db: AsyncSession, **filters
+) -> Optional[str]:
+    if facets:
+        return None  # facet counts cover every match, not just the page
+    search = schemas.BookSearch(**filters)
+    if cursor is not None:
+        keys, _ = await async_crud.get_book_versions(db, 0, size, search, sort, _cursor_after(cursor, sort))
+        return rows_etag("books", keys, size, sort, fields, filters)
+    keys, total = await async_crud.get_book_versions(db, (page - 1) * size, size, search)
+    return rows_etag("books", keys, total, page, size, fields, filters)
+
+# Authors
+@app.get("/authors/", tags=["Authors"])
+@conditional(_list_etag("authors", models.Author))
+@cached(("authors",))
+async def read_authors(
+    skip: int = 0,
+    limit: int = Query(100, le=1000),
+    cursor: Optional[str] = CURSOR_QUERY,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """A list of authors, or with ``cursor`` a keyset page ``{items, next_cursor}``."""
+    if cursor is not None:
+        after = _cursor_after(cursor)
+        items = await async_crud.get_authors(db, limit=limit, after=after[-1] if after else None)
+        return _cursor_page(AUTHOR_LIST, items, limit)
+    return model_data(AUTHOR_LIST, await async_crud.get_authors(db, skip=skip, limit=limit))
+
+@app.get("/authors/batch", response_model=schemas.AuthorBatch, tags=["Authors"])
+async def read_authors_batch(ids: List[str] = IDS_QUERY, db: AsyncSession = Depends(get_async_db)):
+    """Fetch many authors in one query; results follow the request order."""
+    items, missing = await async_crud.get_authors_by_ids(db, _batch_ids(ids))
+    return model_response(AUTHOR_BATCH, {"items": items, "missing": missing})
+
+@app.get("/authors/top", response_model=List[schemas.AuthorResponse], tags=["Authors"])
+async def read_top_authors(limit: int = TOP_LIMIT, db: AsyncSession = Depends(get_async_db)):
+    """Authors with the most books, from the maintained ``books_count``."""
+    return model_response(AUTHOR_LIST, await async_crud.get_top_authors(db, limit))
+
+@app.get("/authors/{author_id}", response_model=schemas.AuthorResponse, tags=["Authors"])
+@conditional(lambda author_id, db: _row_etag("author", models.Author, author_id, db))
+@cached(lambda author_id, db: (f"author:{author_id}",))
+async def read_author(author_id: int, db: AsyncSession = Depends(get_async_db)):
+    author = await async_crud.get_author(db, author_id)
+    if author is None:
+        raise HTTPException(status_code=404, detail="Author not found")
+    return model_data(AUTHOR, author)
+
+@app.post("/authors/", response_model=schemas.AuthorResponse, tags=["Authors"])
+async def create_author(author: schemas.AuthorCreate, db: AsyncSession = Depends(get_async_db)):
+    return await async_crud.create_author(db, author)
+
+@app.post("/authors/bulk", response_model=schemas.BulkImportResult, tags=["Authors"])
+async def bulk_create_authors(request: Request, format: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    """Import authors from an NDJSON or CSV body; invalid rows are reported, not fatal."""
+    return await _bulk_import(request, format, async_crud.bulk_create_authors, db)
+
+@app.put("/authors/{author_id}", response_model=schemas.AuthorResponse, tags=["Authors"])
+async def update_author(author_id: int, author: schemas.AuthorUpdate, db: AsyncSession = Depends(get_async_db)):
+    db_author = await async_crud.update_author(db, author_id, author)
+    if db_author is None:
+        raise HTTPException(status_code=404, detail="Author not found")
+    return db_author
+
+@app.delete("/authors/{author_id}", tags=["Authors"])
+async def delete_author(author_id: int, db: AsyncSession = Depends(get_async_db)):
+    if not await async_crud.delete_author(db, author_id):
+        raise HTTPException(status_code=404, detail="Author not found")
+    return {"message": "Author deleted"}
+
+# Categories
+@app.get("/categories/", tags=["Categories"])
+@conditional(_list_etag("categories", models.Category))
+@cached(("categories",))
+async def read_categories(
+    skip: int = 0,
+    limit: int = Query(100, le=1000),
+    cursor: Optional[str] = CURSOR_QUERY,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """A list of categories, or with ``cursor`` a keyset page ``{items, next_cursor}``."""
+    if cursor is not None:
+        after = _cursor_after(cursor)
+        items = await async_crud.get_categories(db, limit=limit, after=after[-1] if after else None)
+        return _cursor_page(CATEGORY_LIST, items, limit)
+    return model_data(CATEGORY_LIST, await async_crud.get_categories(db, skip=skip, limit=limit))
+
+@app.get("/categories/batch", response_model=schemas.CategoryBatch, tags=["Categories"])
+async def read_categories_batch(ids: List[str] = IDS_QUERY, db: AsyncSession = Depends(get_async_db)):
+    """Fetch many categories in one query; results follow the request order."""
+    items, missing = await async_crud.get_categories_by_ids(db, _batch_ids(ids))
+    return model_response(CATEGORY_BATCH, {"items": items, "missing": missing})
+
+@app.get("/categories/top", response_model=List[schemas.CategoryResponse], tags=["Categories"])
+async def read_top_categories(limit: int = TOP_LIMIT, db: AsyncSession = Depends(get_async_db)):
+    """Categories with the most books, from the maintained ``books_count``."""
+    return model_response(CATEGORY_LIST, await async_crud.get_top_categories(db, limit))
+
+@app.get("/categories/{category_id}", response_model=schemas.CategoryResponse, tags=["Categories"])
+@conditional(lambda category_id, db: _row_etag("category", models.Category, category_id, db))
+@cached(lambda category_id, db: (f"category:{category_id}",))
+async def read_category(category_id: int, db: AsyncSession = Depends(get_async_db)):
+    category = await async_crud.get_category(db, category_id)
+    if category is None:
+        raise HTTPException(status_code=404, detail="Category not found")
+    return model_data(CATEGORY, category)
+
+@app.post("/categories/", response_model=schemas.CategoryResponse, tags=["Categories"])
+async def create_category(category: schemas.CategoryCreate, db: AsyncSession = Depends(get_async_db)):
+    return await async_crud.create_category(db, category)
+
+@app.post("/categories/bulk", response_model=schemas.BulkImportResult, tags=["Categories"])
+async def bulk_create_categories(request: Request, format: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    """Import categories from an NDJSON or CSV body; invalid rows are reported, not fatal."""
+    return await _bulk_import(request, format, async_crud.bulk_create_categories, db)
+
+@app.put("/categories/{category_id}", response_model=schemas.CategoryResponse, tags=["Categories"])
+async def update_category(category_id: int, category: schemas.CategoryUpdate, db: AsyncSession = Depends(get_async_db)):
+    db_category = await async_crud.update_category(db, category_id, category)
+    if db_category is None:
+        raise HTTPException(status_code=404, detail="Category not found")
+    return db_category
+
+@app.delete("/categories/{category_id}", tags=["Categories"])
+async def delete_category(category_id: int, db: AsyncSession = Depends(get_async_db)):
+    if not await async_crud.delete_category(db, category_id):
+        raise HTTPException(status_code=404, detail="Category not found")
+    return {"message": "Category deleted"}
+
+# Books
+@app.get("/books/", tags=["Books"])
+@conditional(_books_etag)
+@cached(book_dependencies())
+async def read_books(
+    page: int = Query(1, ge=1),
+    size: int = Query(10, ge=1, le=100),
+    title: Optional[str] = None,
+    author_name: Optional[str] = None,
+    category_name: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    in_stock: Optional[bool] = None,
+    cursor: Optional[str] = CURSOR_QUERY,
+    sort: str = BOOK_SORT_QUERY,
+    fields: str = FIELDS_QUERY,
+    facets: bool = Query(False, description="Include author, category, price and stock counts for the filter"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """A page of books (``PaginatedResponse``), or with ``cursor`` a keyset page
+    ``{items, next_cursor, size}`` ordered by ``sort``. ``fields=summary``
+    lists ``BookSummary`` rows, read as plain columns."""
+    search = schemas.BookSearch(
+        title=title, author_name=author_name, category_name=category_name,
+        min_price=min_price, max_price=max_price, in_stock=in_stock,
+    )
+    summary = fields == "summary"
+    if cursor is not None:
+        after = _cursor_after(cursor, sort)
+        if summary:
+            items = await async_crud.get_book_summaries(db, limit=size, search=search, sort=sort, after=after)
+        else:
+            items = await async_crud.get_books(db, limit=size, search=search, sort=sort, after=after)
+        page_data = dict(_cursor_page(SUMMARY_LIST if summary else BOOK_LIST, items, size, sort), size=size)
+    elif summary:
+        items = await async_crud.get_book_summaries(db, skip=(page - 1) * size, limit=size, search=search)
+        total = await async_crud.get_books_count(db, search)
+        page_data = {
+            "items": model_data(SUMMARY_LIST, items),
+            "total": total,
+            "page": page,
+            "size": size,
+            "pages": math.ceil(total / size),
+        }
+    else:
+        items, total = await async_crud.get_books_page(db, skip=(page - 1) * size, limit=size, search=search)
+        page_data = model_data(BOOK_PAGE, {
+            "items": items,
+            "total": total,
+            "page": page,
+            "size": size,
+            "pages": math.ceil(total / size),
+        })
+    if facets:
+        page_data["facets"] = (await async_crud.get_book_facets(db, search)).model_dump(mode="json")
+    return page_data
+
+@app.get("/books/export", tags=["Books"])
+async def export_books(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    title: Optional[str] = None,
+    author_name: Optional[str] = None,
+    category_name: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    in_stock: Optional[bool] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Stream the whole (optionally filtered) catalog as NDJSON or CSV."""
+    search = schemas.BookSearch(
+        title=title, author_name=author_name, category_name=category_name,
+        min_price=min_price, max_price=max_price, in_stock=in_stock,
+    )
+    return StreamingResponse(
+        render_batches(async_crud.iter_book_rows(db, search), format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="books.{format}"'},
+    )
+
+@app.get("/books/batch", response_model=schemas.BookBatch, tags=["Books"])
+async def read_books_batch(ids: List[str] = IDS_QUERY, db: AsyncSession = Depends(get_async_db)):
+    """Fetch many books in one query; results follow the request order."""
+    items, missing = await async_crud.get_books_by_ids(db, _batch_ids(ids))
+    return model_response(BOOK_BATCH, {"items": items, "missing": missing})
+
+@app.get("/books/{book_id}", response_model=schemas.BookResponse, tags=["Books"])
+@conditional(_book_etag)
+@cached(lambda book_id, db: book_dependencies(book_id))
+async def read_book(book_id: int, db: AsyncSession = Depends(get_async_db)):
+    book = await async_crud.get_book(db, book_id)
+    if book is None:
+        raise HTTPException(status_code=404, detail="Book not found")
+    return model_data(BOOK, book)
+
+@app.post("/books/", response_model=schemas.BookResponse, tags=["Books"])
+async def create_book(book: schemas.BookCreate, db: AsyncSession = Depends(get_async_db)):
+    return await async_crud.create_book(db, book)
+
+@app.post("/books/bulk", response_model=schemas.BulkImportResult, tags=["Books"])
+async def bulk_create_books(request: Request, format: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    """Import books from an NDJSON or CSV body (``category_ids`` as ``1;2`` in CSV)."""
+    return await _bulk_import(request, format, async_crud.bulk_create_books, db)
+
+@app.put("/books/{book_id}", response_model=schemas.BookResponse, tags=["Books"])
+async def update_book(book_id: int, book: schemas.BookUpdate, db: AsyncSession = Depends(get_async_db)):
+    db_book = await async_crud.update_book(db, book_id, book)
+    if db_book is None:
+        raise HTTPException(status_code=404, detail="Book not found")
+    return db_book
+
+@app.delete("/books/{book_id}", tags=["Books"])
+async def delete_book(book_id: int, db: AsyncSession = Depends(get_async_db)):
+    if not await async_crud.delete_book(db, book_id):
+        raise HTTPException(status_code=404, detail="Book not found")
+    return {"message": "Book deleted"}
+
+@app.patch("/books/{book_id}/stock", response_model=schemas.BookResponse, tags=["Books"])
+async def update_book_stock(book_id: int, quantity_change: int, db: AsyncSession = Depends(get_async_db)):
+    db_book = await async_crud.update_book_stock(db, book_id, quantity_change)
+    if db_book is None:
+        raise HTTPException(status_code=404, detail="Book not found")
+    return db_book
+
+# Stock reservations
+@app.post("/reservations/", response_model=schemas.ReservationResponse, tags=["Stock"])
+async def create_reservation(reservation: schemas.ReservationCreate, db: AsyncSession = Depends(get_async_db)):
+    """Reserve stock for a batch of line items, all or nothing."""
+    try:
+        return await async_crud.reserve_stock(db, reservation)
+    except crud.InsufficientStock as exc:
+        raise HTTPException(status_code=409, detail={"message": str(exc), "book_ids": exc.book_ids})
+
+@app.post("/reservations/expire", tags=["Stock"])
+async def expire_reservations(db: AsyncSession = Depends(get_async_db)):
+    """Release every pending reservation past its expiry; run it periodically (e.g. from cron)."""
+    return {"released": await async_crud.release_expired_reservations(db)}
+
+@app.get("/reservations/{reservation_id}", response_model=schemas.ReservationResponse, tags=["Stock"])
+async def read_reservation(reservation_id: int, db: AsyncSession = Depends(get_async_db)):
+    reservation = await async_crud.get_reservation(db, reservation_id)
+    if reservation is None:
+        raise HTTPException(status_code=404, detail="Reservation not found")
+    return reservation
+
+async def _finish_reservation(action, reservation_id: int, status: str, db: AsyncSession):
+    reservation = await action(db, reservation_id)
+    if reservation is None:
+        raise HTTPException(status_code=404, detail="Reservation not found")
+    if reservation.status != status:
+        raise HTTPException(status_code=409, detail=f"Reservation is {reservation.status}")
+    return reservation
+
+@app.post("/reservations/{reservation_id}/commit", response_model=schemas.ReservationResponse, tags=["Stock"])
+async def commit_reservation(reservation_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await _finish_reservation(async_crud.commit_reservation, reservation_id, "committed", db)
+
+@app.post("/reservations/{reservation_id}/release", response_model=schemas.ReservationResponse, tags=["Stock"])
+async def release_reservation(reservation_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await _finish_reservation(async_crud.release_reservation, reservation_id, "released", db)
+
+# Search
+@app.get("/search/books/", response_model=List[schemas.BookResponse], tags=["Search"])
+async def search_books(q: str = Query(...), skip: int = 0, limit: int = Query(100, le=1000), db: AsyncSession = Depends(get_async_db)):
+    return model_response(BOOK_LIST, await async_crud.search_books(db, q, skip=skip, limit=limit))
@@ -0,0 +1,174 @@
+import argparse
+import codecs
+import csv
+import json
+from itertools import islice
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from . import schemas
+
+# Streaming record decoding for bulk imports (NDJSON or CSV).
+#
+# Bytes are pushed in as they arrive and complete records come out, so an
+# import never holds more than one chunk of the body in memory. A record that
+# fails to parse comes out as a ValueError, which the importers report as a
+# per-row error instead of aborting the batch.
+
+FORMATS = ("ndjson", "csv")
+# CSV cells holding lists, e.g. category_ids "1;4;7"
+CSV_LIST_FIELDS = {"category_ids"}
+
+def format_from_content_type(content_type: Optional[str]) -> str:
+    if content_type and "csv" in content_type:
+        return "csv"
+    return "ndjson"
+
+
+class RecordDecoder:
+    def __init__(self, fmt: str = "ndjson"):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported format: {fmt}")
+        self.fmt = fmt
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._buffer = ""
+        self._pending = ""
+        self._header: Optional[List[str]] = None
+
+    def feed(self, data: bytes) -> List[Any]:
+        *lines, self._buffer = (self._buffer + self._decoder.decode(data)).split("\n")
+        return [record for line in lines for record in self._line(line)]
+
+    def close(self) -> List[Any]:
+        tail = self._buffer + self._decoder.decode(b"", final=True)
+        self._buffer = ""
+        records = self._line(tail) if tail else []
+        if self._pending:
+            records.append(ValueError("Unterminated quoted CSV field"))
+            self._pending = ""
+        return records
+
+    def _line(self, line: str) -> List[Any]:
+        line = line.rstrip("\r")
+        if self.fmt == "ndjson":
+            if not line.strip():
+                return []
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                return [ValueError(f"Invalid JSON: {exc}")]
+            if not isinstance(record, dict):
+                return [ValueError("Each line must be a JSON object")]
+            return [record]
+
+        text = self._pending + line
+        if text.count('"') % 2:
+            # A quoted field continues on the next line
+            self._pending = text + "\n"
+            return []
+        self._pending = ""
+        if not text.strip():
+            return []
+        row = next(csv.reader([text]))
+        if self._header is None:
+            self._header = [name.strip() for name in row]
+            return []
+        if len(row) != len(self._header):
+            return [ValueError(f"Expected {len(self._header)} CSV fields, got {len(row)}")]
+        record = {}
+        for name, value in zip(self._header, row):
+            if value == "":
+                continue
+            if name in CSV_LIST_FIELDS:
+                value = [item.strip() for item in value.split(";") if item.strip()]
+            record[name] = value
+        return [record]
+
+
+def iter_records(chunks: Iterable[bytes], fmt: str = "ndjson") -> Iterator[Any]:
+    decoder = RecordDecoder(fmt)
+    for data in chunks:
+        yield from decoder.feed(data)
+    yield from decoder.close()
+
+async def stream_chunks(
+    stream: AsyncIterable[bytes], decoder: RecordDecoder, size: int
+) -> AsyncIterator[Tuple[int, List[Any]]]:
+    """``(first row number, records)`` chunks of ``size`` records, each one
+    yielded as soon as it is complete while the body streams in."""
+    pending, row = [], 1
+    async for data in stream:
+        pending.extend(decoder.feed(data))
+        while len(pending) >= size:
+            yield row, pending[:size]
+            del pending[:size]
+            row += size
+    pending.extend(decoder.close())
+    for chunk in chunked(pending, size):
+        yield row, chunk
+        row += len(chunk)
+
+def chunked(records: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(records)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def _validation_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()
+    )
+
+def validate_chunk(chunk: List[Any], start: int, schema, result: schemas.BulkImportResult) -> List[Tuple[int, Any]]:
+    """Validate records against ``schema``; failures are added to ``result.errors``."""
+    valid = []
+    for row, record in enumerate(chunk, start=start):
+        if isinstance(record, Exception):
+            result.errors.append(schemas.BulkRowError(row=row, error=str(record)))
+            continue
+        try:
+            valid.append((row, schema(**record)))
+        except ValidationError as exc:
+            result.errors.append(schemas.BulkRowError(row=row, error=_validation_message(exc)))
+    return valid
+
+def _read_blocks(path: str, block_size: int = 1 << 16) -> Iterator[bytes]:
+    with open(path, "rb") as handle:
+        while True:
+            block = handle.read(block_size)
+            if not block:
+                return
+            yield block
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from . import crud
+    from .database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Bulk load books, authors or categories from NDJSON/CSV")
+    parser.add_argument("entity", choices=["books", "authors", "categories"])
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS, help="defaults to the file extension")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("csv" if args.path.endswith(".csv") else "ndjson")
+    loader = {
+        "books": crud.bulk_create_books,
+        "authors": crud.bulk_create_authors,
+        "categories": crud.bulk_create_categories,
+    }[args.entity]
+    db = SessionLocal()
+    try:
+        result = loader(db, iter_records(_read_blocks(args.path), fmt), chunk_size=args.chunk_size)
+    finally:
+        db.close()
+    print(f"Created {result.created} {args.entity}, {len(result.errors)} errors")
+    for error in result.errors[:50]:
+        print(f"  row {error.row}: {error.error}")
+
+if __name__ == "__main__":
+    main()
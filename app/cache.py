@@ -0,0 +1,315 @@
+import heapq
+import inspect
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import wraps
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .conditional import current_etag
+
+# Catalog read cache.
+#
+# Entries are keyed by the namespaces they depend on plus the normalized
+# request parameters. Each namespace carries a generation number that writes
+# bump, so invalidation is O(1) and precise: the next read of a dependent
+# entry builds a new key, and the stale one ages out of the backend.
+
+_MISSING = object()
+
+
+class CacheBackend(ABC):
+    """Storage interface; implement this to plug in another store."""
+
+    @abstractmethod
+    def get(self, key: str) -> Any:
+        """Return the cached value or ``_MISSING``."""
+
+    @abstractmethod
+    def set(self, key: str, value: Any) -> None:
+        ...
+
+    @abstractmethod
+    def generation(self, namespace: str) -> int:
+        ...
+
+    @abstractmethod
+    def bump(self, namespace: str) -> int:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        ...
+
+
+class LRUBackend(CacheBackend):
+    """In-process LRU with a size bound and per-entry TTL.
+
+    Generations are bounded too: at most ``maxsize`` namespaces keep their
+    own, least recently bumped first out. Generations come from one counter,
+    and namespaces without their own read ``_floor``, which moves past every
+    generation handed out whenever one is dropped, so a dropped namespace
+    never reads a generation its stale entries were keyed with.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._generations: "OrderedDict[str, int]" = OrderedDict()
+        self._counter = self._floor = 0
+        self._lock = Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                    self.evictions += 1
+                self.misses += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def generation(self, namespace: str) -> int:
+        return self._generations.get(namespace, self._floor)
+
+    def bump(self, namespace: str) -> int:
+        with self._lock:
+            self._counter += 1
+            self._generations[namespace] = self._counter
+            self._generations.move_to_end(namespace)
+            if len(self._generations) > self.maxsize:
+                self._generations.popitem(last=False)
+                self._counter += 1
+                self._floor = self._counter
+            return self._generations[namespace]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            self._counter = self._floor = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
+
+
+class LocalKeyValueClient:
+    """Single-process stand-in for a Redis client (GET/SET EX/INCR/FLUSHDB).
+
+    Expired keys are deleted when read, and every write first deletes the
+    keys that have expired since (oldest expiry first, from a heap), so keys
+    that are never read again do not pile up.
+    """
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[Optional[float], bytes]] = {}
+        self._expiries: List[Tuple[float, str]] = []
+        self._lock = Lock()
+
+    def _get(self, key: str, now: float) -> Optional[bytes]:
+        # Call with the lock held
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[0] is not None and entry[0] < now:
+            del self._data[key]
+            return None
+        return entry[1]
+
+    def _set(self, key: str, value: bytes, ex: Optional[float], now: float) -> None:
+        # Call with the lock held
+        while self._expiries and self._expiries[0][0] < now:
+            expires, expired = heapq.heappop(self._expiries)
+            entry = self._data.get(expired)
+            if entry is not None and entry[0] == expires:  # not rewritten since
+                del self._data[expired]
+        expires = now + ex if ex else None
+        self._data[key] = (expires, value)
+        if expires is not None:
+            heapq.heappush(self._expiries, (expires, key))
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            return self._get(key, time.monotonic())
+
+    def set(self, key: str, value: bytes, ex: Optional[float] = None) -> None:
+        with self._lock:
+            self._set(key, value, ex, time.monotonic())
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            now = time.monotonic()
+            value = int(self._get(key, now) or 0) + 1
+            self._set(key, str(value).encode(), None, now)
+            return value
+
+    def flushdb(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._expiries.clear()
+
+
+class KeyValueBackend(CacheBackend):
+    """Backend for a Redis-style client; values are stored as JSON."""
+
+    def __init__(self, client: Any, ttl: float = 60.0, prefix: str = "bookstore:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = self.misses = 0
+
+    def get(self, key: str) -> Any:
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            self.misses += 1
+            return _MISSING
+        self.hits += 1
+        return json.loads(raw)
+
+    def set(self, key: str, value: Any) -> None:
+        self.client.set(self.prefix + key, json.dumps(value, default=str).encode(), ex=self.ttl)
+
+    def generation(self, namespace: str) -> int:
+        return int(self.client.get(f"{self.prefix}gen:{namespace}") or 0)
+
+    def bump(self, namespace: str) -> int:
+        return self.client.incr(f"{self.prefix}gen:{namespace}")
+
+    def clear(self) -> None:
+        self.client.flushdb()
+
+    def stats(self) -> Dict[str, int]:
+        # Evictions happen inside the server and are not visible here
+        return {"hits": self.hits, "misses": self.misses, "evictions": 0}
+
+
+class Cache:
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+
+    def key(self, namespaces: Iterable[str], params: Optional[dict] = None) -> str:
+        versions = ",".join(f"{ns}@{self.backend.generation(ns)}" for ns in namespaces)
+        normalized = json.dumps(
+            {k: v for k, v in (params or {}).items() if v is not None},
+            sort_keys=True, separators=(",", ":"), default=str,
+        )
+        return f"{versions}|{normalized}"
+
+    def get_or_set(
+        self,
+        namespaces: Iterable[str],
+        params: Optional[dict],
+        loader: Callable[[], Any],
+    ) -> Any:
+        key = self.key(namespaces, params)
+        value = self.backend.get(key)
+        if value is _MISSING:
+            value = loader()
+            self.backend.set(key, value)
+        return value
+
+    async def get_or_set_async(
+        self,
+        namespaces: Iterable[str],
+        params: Optional[dict],
+        loader: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        key = self.key(namespaces, params)
+        value = self.backend.get(key)
+        if value is _MISSING:
+            value = await loader()
+            self.backend.set(key, value)
+        return value
+
+    def invalidate(self, *namespaces: str) -> None:
+        for namespace in namespaces:
+            self.backend.bump(namespace)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return self.backend.stats()
+
+
+# Namespaces for catalog entries. Book payloads embed their author and
+# categories, so book entries also depend on the author/category namespaces.
+def book_dependencies(book_id: Optional[int] = None) -> Tuple[str, ...]:
+    own = "books" if book_id is None else f"book:{book_id}"
+    return (own, "authors", "categories")
+
+def invalidate_book(book_id: int) -> None:
+    catalog_cache.invalidate("books", f"book:{book_id}")
+
+def invalidate_author(author_id: int) -> None:
+    catalog_cache.invalidate("authors", f"author:{author_id}")
+
+def invalidate_category(category_id: int) -> None:
+    catalog_cache.invalidate("categories", f"category:{category_id}")
+
+
+def _params(func: Callable, kwargs: dict, ignore: Tuple[str, ...]) -> dict:
+    params = {name: value for name, value in kwargs.items() if name not in ignore}
+    # Under ``conditional``, the ETag pins the entry to the data it was built
+    # from, so a process that missed another one's write (per-process
+    # backends) still cannot serve a body older than its ETag
+    return dict(params, endpoint=func.__name__, etag=current_etag.get())
+
+def cached(dependencies: Any, ignore: Tuple[str, ...] = ("db",)):
+    """Cache an endpoint's result under its keyword arguments.
+
+    ``dependencies`` is a tuple of namespaces, or a callable receiving the
+    endpoint's arguments and returning one. Arguments named in ``ignore``
+    (the database session) are not part of the key. Works on sync and async
+    endpoints; the result must be JSON-shaped. Exceptions are not cached.
+    """
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def wrapper(**kwargs):
+                namespaces = dependencies(**kwargs) if callable(dependencies) else dependencies
+                params = _params(func, kwargs, ignore)
+                return await catalog_cache.get_or_set_async(namespaces, params, lambda: func(**kwargs))
+        else:
+            @wraps(func)
+            def wrapper(**kwargs):
+                namespaces = dependencies(**kwargs) if callable(dependencies) else dependencies
+                params = _params(func, kwargs, ignore)
+                return catalog_cache.get_or_set(namespaces, params, lambda: func(**kwargs))
+        return wrapper
+    return decorator
+
+
+def _backend_from_env() -> CacheBackend:
+    ttl = float(os.getenv("CACHE_TTL", "60"))
+    if os.getenv("CACHE_BACKEND", "lru") == "kv":
+        return KeyValueBackend(LocalKeyValueClient(), ttl=ttl)
+    return LRUBackend(maxsize=int(os.getenv("CACHE_MAXSIZE", "1024")), ttl=ttl)
+
+catalog_cache = Cache(_backend_from_env())
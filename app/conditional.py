@@ -0,0 +1,82 @@
+import hashlib
+import inspect
+import json
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+
+from .serialization import FastJSONResponse
+
+# Conditional GET: endpoints compute a cheap ETag from version data before
+# building (or serializing) their payload, and answer 304 when it matches.
+
+# The ETag of the response being built; ``cache.cached`` keys entries on it
+current_etag: ContextVar[Optional[str]] = ContextVar("current_etag", default=None)
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag from version parts (ids, versions, revisions, parameters)."""
+    raw = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return '"%s"' % hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()
+
+def rows_etag(name: str, rows: Iterable[Tuple[Any, ...]], *extra: Any) -> str:
+    """ETag for a list page from the version key (``(id, version, ...)``) of each row."""
+    return make_etag(name, [list(row) for row in rows], *extra)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # If-None-Match uses weak comparison, so W/"x" matches "x"
+    return "*" in candidates or etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+def _respond(etag: Optional[str], content: Any) -> Response:
+    response = FastJSONResponse(content)
+    if etag:
+        response.headers["ETag"] = etag
+    return response
+
+def conditional(etag_for: Callable[..., Any]):
+    """Add ETag/If-None-Match handling to a GET endpoint.
+
+    ``etag_for`` receives the endpoint's arguments and returns the ETag (or
+    None when the resource does not exist, letting the endpoint raise its 404).
+    A match short-circuits to 304 without running the endpoint at all. For an
+    async endpoint, ``etag_for`` may be async too. While the endpoint runs,
+    the ETag is available as ``current_etag``.
+    """
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def wrapper(request: Request, **kwargs):
+                etag = etag_for(**kwargs)
+                if inspect.isawaitable(etag):
+                    etag = await etag
+                if etag and etag_matches(request.headers.get("if-none-match"), etag):
+                    return Response(status_code=304, headers={"ETag": etag})
+                token = current_etag.set(etag)
+                try:
+                    return _respond(etag, await func(**kwargs))
+                finally:
+                    current_etag.reset(token)
+        else:
+            @wraps(func)
+            def wrapper(request: Request, **kwargs):
+                etag = etag_for(**kwargs)
+                if etag and etag_matches(request.headers.get("if-none-match"), etag):
+                    return Response(status_code=304, headers={"ETag": etag})
+                token = current_etag.set(etag)
+                try:
+                    return _respond(etag, func(**kwargs))
+                finally:
+                    current_etag.reset(token)
+
+        wrapper.__signature__ = signature.replace(parameters=[
+            inspect.Parameter("request", inspect.Parameter.POSITIONAL_OR_KEYWORD, annotation=Request),
+            *signature.parameters.values(),
+        ])
+        return wrapper
+    return decorator
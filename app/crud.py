@@ -1,7 +1,15 @@
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_
-from typing import List, Optional
+from sqlalchemy.orm import Query, Session, joinedload, selectinload
+from sqlalchemy import String, and_, case, func, insert, literal, or_, select, tuple_, union_all, update
+from sqlalchemy.exc import SQLAlchemyError
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from . import models, schemas
+from .bulk import chunked, validate_chunk
+from .database import use_primary
+from .facets import PRICE_EDGES, build_facets
+from .cache import catalog_cache, invalidate_author, invalidate_book, invalidate_category
+from .search import apply_fulltext
 
 # Author CRUD operations
 def create_author(db: Session, author: schemas.AuthorCreate) -> models.Author:
@@ -9,15 +17,40 @@ def create_author(db: Session, author: schemas.AuthorCreate) -> models.Author:
     db.add(db_author)
     db.commit()
     db.refresh(db_author)
+    invalidate_author(db_author.id)
     return db_author
 
 def get_author(db: Session, author_id: int) -> Optional[models.Author]:
     return db.query(models.Author).filter(models.Author.id == author_id).first()
 
-def get_authors(db: Session, skip: int = 0, limit: int = 100) -> List[models.Author]:
-    return db.query(models.Author).offset(skip).limit(limit).all()
+def _get_many(db: Session, model, ids: List[int], *options) -> Tuple[list, List[int]]:
+    """Rows for ``ids`` in the given order, plus the ids that do not exist.
+
+    One ``IN`` query per chunk of ids (bound-parameter limits), with
+    relationships batch-loaded through ``options``.
+    """
+    found = {}
+    for chunk in chunked(ids, 500):
+        for row in db.query(model).options(*options).filter(model.id.in_(chunk)):
+            found[row.id] = row
+    return [found[i] for i in ids if i in found], [i for i in ids if i not in found]
+
+def get_authors_by_ids(db: Session, ids: List[int]) -> Tuple[List[models.Author], List[int]]:
+    return _get_many(db, models.Author, ids)
+
+def get_authors(db: Session, skip: int = 0, limit: int = 100, after: Optional[int] = None) -> List[models.Author]:
+    query = db.query(models.Author)
+    if after is not None:
+        # Keyset pagination: seek past the last id served instead of OFFSET
+        return query.filter(models.Author.id > after).order_by(models.Author.id).limit(limit).all()
+    return query.order_by(models.Author.id).offset(skip).limit(limit).all()
+
+def get_top_authors(db: Session, limit: int = 10) -> List[models.Author]:
+    """Authors with the most books (ties: newest first), straight off the counter index."""
+    return _top(db, models.Author, limit)
 
 def update_author(db: Session, author_id: int, author: schemas.AuthorUpdate) -> Optional[models.Author]:
+    use_primary(db)
     db_author = get_author(db, author_id)
     if db_author:
         update_data = author.dict(exclude_unset=True)
@@ -25,13 +58,16 @@ def update_author(db: Session, author_id: int, author: schemas.AuthorUpdate) ->
             setattr(db_author, field, value)
         db.commit()
         db.refresh(db_author)
+        invalidate_author(author_id)
     return db_author
 
 def delete_author(db: Session, author_id: int) -> bool:
+    use_primary(db)
     db_author = get_author(db, author_id)
     if db_author:
         db.delete(db_author)
         db.commit()
+        invalidate_author(author_id)
         return True
     return False
 
@@ -41,15 +77,26 @@ def create_category(db: Session, category: schemas.CategoryCreate) -> models.Cat
     db.add(db_category)
     db.commit()
     db.refresh(db_category)
+    invalidate_category(db_category.id)
     return db_category
 
 def get_category(db: Session, category_id: int) -> Optional[models.Category]:
     return db.query(models.Category).filter(models.Category.id == category_id).first()
 
-def get_categories(db: Session, skip: int = 0, limit: int = 100) -> List[models.Category]:
-    return db.query(models.Category).offset(skip).limit(limit).all()
+def get_categories_by_ids(db: Session, ids: List[int]) -> Tuple[List[models.Category], List[int]]:
+    return _get_many(db, models.Category, ids)
+
+def get_categories(db: Session, skip: int = 0, limit: int = 100, after: Optional[int] = None) -> List[models.Category]:
+    query = db.query(models.Category)
+    if after is not None:
+        return query.filter(models.Category.id > after).order_by(models.Category.id).limit(limit).all()
+    return query.order_by(models.Category.id).offset(skip).limit(limit).all()
+
+def get_top_categories(db: Session, limit: int = 10) -> List[models.Category]:
+    return _top(db, models.Category, limit)
 
 def update_category(db: Session, category_id: int, category: schemas.CategoryUpdate) -> Optional[models.Category]:
+    use_primary(db)
     db_category = get_category(db, category_id)
     if db_category:
         update_data = category.dict(exclude_unset=True)
@@ -57,17 +104,89 @@ def update_category(db: Session, category_id: int, category: schemas.CategoryUpd
             setattr(db_category, field, value)
         db.commit()
         db.refresh(db_category)
+        invalidate_category(category_id)
     return db_category
 
 def delete_category(db: Session, category_id: int) -> bool:
+    use_primary(db)
     db_category = get_category(db, category_id)
     if db_category:
         db.delete(db_category)
         db.commit()
+        invalidate_category(category_id)
         return True
     return False
 
+# Denormalized book counters
+# authors.books_count and categories.books_count move with every book write,
+# in the same transaction, as relative "books_count + n" UPDATEs so concurrent
+# writers cannot lose each other's changes. They are derived data and leave
+# the row version alone: a new book must not fail an author's optimistic update.
+def _top(db: Session, model, limit: int) -> list:
+    # Backward scan of the (books_count, id) index, no sort
+    return db.query(model).order_by(model.books_count.desc(), model.id.desc()).limit(limit).all()
+
+def _count_changes(before: Iterable[Optional[int]], after: Iterable[Optional[int]]) -> Counter:
+    changes = Counter(i for i in after if i is not None)
+    changes.subtract(i for i in before if i is not None)
+    return changes
+
+def _adjust_book_counts(db: Session, authors: Counter, categories: Counter) -> None:
+    for model, changes in ((models.Author, authors), (models.Category, categories)):
+        # One UPDATE per distinct delta, not per row
+        by_delta: Dict[int, List[int]] = {}
+        for row_id, delta in changes.items():
+            if delta:
+                by_delta.setdefault(delta, []).append(row_id)
+        for delta, ids in by_delta.items():
+            db.execute(
+                update(model)
+                .where(model.id.in_(ids))
+                .values(books_count=model.books_count + delta)
+                .execution_options(synchronize_session=False)
+            )
+
+def _invalidate_counts(authors: Counter, categories: Counter) -> None:
+    for author_id, delta in authors.items():
+        if delta:
+            invalidate_author(author_id)
+    for category_id, delta in categories.items():
+        if delta:
+            invalidate_category(category_id)
+
+def refresh_book_counts(db) -> None:
+    """Recompute every counter from books and book_category (after raw bulk loads).
+
+    ``db`` is a Session or Connection; the caller commits.
+    """
+    db.execute(update(models.Author).values(books_count=(
+        select(func.count()).where(models.Book.author_id == models.Author.id).scalar_subquery()
+    )))
+    link = models.book_category.c
+    db.execute(update(models.Category).values(books_count=(
+        select(func.count()).select_from(models.book_category)
+        .where(link.category_id == models.Category.id).scalar_subquery()
+    )))
+
 # Book CRUD operations
+# Loader options for book lists: the many-to-one author rides on the main
+# query, categories come from one batched "WHERE book_id IN (...)" query so
+# LIMIT applies to books rather than book x category rows.
+BOOK_LIST_OPTIONS = (
+    joinedload(models.Book.author),
+    selectinload(models.Book.categories),
+)
+# Columns usable as keyset sort keys; ties are broken by id
+BOOK_SORT_COLUMNS = {
+    "id": models.Book.id,
+    "title": models.Book.title,
+    "price": models.Book.price,
+    "stock_quantity": models.Book.stock_quantity,
+}
+# Nullable sort keys compare through coalesce, so NULL rows sort as this value
+# instead of dropping out of the keyset comparison
+BOOK_SORT_NULLS = {"stock_quantity": 0}
+
 def create_book(db: Session, book: schemas.BookCreate) -> models.Book:
     book_data = book.dict()
     category_ids = book_data.pop('category_ids', [])
@@ -80,8 +199,13 @@ def create_book(db: Session, book: schemas.BookCreate) -> models.Book:
         db_book.categories = categories
     
     db.add(db_book)
+    authors = _count_changes([], [db_book.author_id])
+    categories = _count_changes([], [category.id for category in db_book.categories])
+    _adjust_book_counts(db, authors, categories)
     db.commit()
     db.refresh(db_book)
+    invalidate_book(db_book.id)
+    _invalidate_counts(authors, categories)
     return db_book
 
 def get_book(db: Session, book_id: int) -> Optional[models.Book]:
@@ -90,26 +214,28 @@ def get_book(db: Session, book_id: int) -> Optional[models.Book]:
         joinedload(models.Book.categories)
     ).filter(models.Book.id == book_id).first()
 
-def get_books(
-    db: Session, 
-    skip: int = 0, 
-    limit: int = 100,
-    search: Optional[schemas.BookSearch] = None
-) -> List[models.Book]:
-    query = db.query(models.Book).options(
-        joinedload(models.Book.author),
-        joinedload(models.Book.categories)
-    )
-    
+def get_books_by_ids(db: Session, ids: List[int]) -> Tuple[List[models.Book], List[int]]:
+    return _get_many(db, models.Book, ids, *BOOK_LIST_OPTIONS)
+
+def _book_filters(
+    query,
+    search: Optional[schemas.BookSearch],
+    rank: bool = True,
+    author_joined: bool = False
+):
+    """Apply the ``BookSearch`` criteria shared by the list, page and count queries."""
     if search:
         if search.title:
-            query = query.filter(models.Book.title.ilike(f"%{search.title}%"))
+            query = apply_fulltext(query, search.title, columns=("title",), rank=rank)
         if search.author_name:
-            query = query.join(models.Author).filter(models.Author.name.ilike(f"%{search.author_name}%"))
+            if not author_joined:
+                query = query.join(models.Author)
+            query = query.filter(models.Author.name.ilike(f"%{search.author_name}%"))
         if search.category_name:
-            query = query.join(models.Category, models.Book.categories).filter(
+            # EXISTS instead of a join: no duplicate rows per matching category
+            query = query.filter(models.Book.categories.any(
                 models.Category.name.ilike(f"%{search.category_name}%")
-            )
+            ))
         if search.min_price is not None:
             query = query.filter(models.Book.price >= search.min_price)
         if search.max_price is not None:
@@ -119,41 +245,264 @@ def get_books(
                 query = query.filter(models.Book.stock_quantity > 0)
             else:
                 query = query.filter(models.Book.stock_quantity == 0)
-    
+
     # Filter out books with missing authors to prevent validation errors
-    books = query.filter(models.Book.author_id.isnot(None)).offset(skip).limit(limit).all()
-    return books
+    return query.filter(models.Book.author_id.isnot(None))
+
+def _keyset(query, sort: str, after: Optional[Tuple[Any, ...]]):
+    column = BOOK_SORT_COLUMNS[sort]
+    if sort in BOOK_SORT_NULLS:
+        default = BOOK_SORT_NULLS[sort]
+        column = func.coalesce(column, default)
+        if after is not None and after[0] is None:
+            after = (default, *after[1:])  # cursor of a NULL row
+    if after is not None:
+        if column is models.Book.id:
+            query = query.filter(models.Book.id > after[-1])
+        else:
+            query = query.filter(tuple_(column, models.Book.id) > tuple_(*after))
+    order = [models.Book.id] if column is models.Book.id else [column, models.Book.id]
+    return query.order_by(*order)
+
+def get_books(
+    db: Session, 
+    skip: int = 0, 
+    limit: int = 100,
+    search: Optional[schemas.BookSearch] = None,
+    sort: Optional[str] = None,
+    after: Optional[Tuple[Any, ...]] = None
+) -> List[models.Book]:
+    """List books.
+
+    With ``sort`` set, pages are keyset-ordered by ``(sort, id)`` and ``after``
+    is the key of the last book served (see ``pagination``); ``skip`` is ignored.
+    """
+    query = db.query(models.Book).options(*BOOK_LIST_OPTIONS)
+    query = _book_filters(query, search, rank=sort is None)
+    if sort is not None:
+        return _keyset(query, sort, after).limit(limit).all()
+    return query.offset(skip).limit(limit).all()
+
+def get_books_page(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    search: Optional[schemas.BookSearch] = None
+) -> Tuple[List[models.Book], int]:
+    """Return one page of books plus the total match count in a single query.
+
+    The total rides along on every row as ``COUNT(*) OVER ()``, which the
+    database evaluates before OFFSET/LIMIT. Only a page past the end (no rows
+    to carry the total) costs a second, count-only query.
+    """
+    total_column = func.count().over().label("total")
+    query = db.query(models.Book, total_column).options(*BOOK_LIST_OPTIONS)
+    # id breaks rank ties and orders unranked pages, as in get_book_versions
+    rows = _book_filters(query, search).order_by(models.Book.id).offset(skip).limit(limit).all()
+    if not rows:
+        return [], (get_books_count(db, search) if skip else 0)
+    return [book for book, _ in rows], rows[0].total
+
+def get_book_summaries(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    search: Optional[schemas.BookSearch] = None,
+    sort: Optional[str] = None,
+    after: Optional[Tuple[Any, ...]] = None
+):
+    """Column-only projection for catalog listings (no ORM objects, no categories).
+
+    Rows expose ``id``, ``title``, ``price``, ``stock_quantity`` and
+    ``author_name``; paging works as in ``get_books`` and ``get_books_page``
+    (same order), and ``GET /books/?fields=summary`` serves them.
+    """
+    query = db.query(
+        models.Book.id,
+        models.Book.title,
+        models.Book.price,
+        models.Book.stock_quantity,
+        models.Author.name.label("author_name"),
+    ).join(models.Author, models.Book.author_id == models.Author.id)
+    query = _book_filters(query, search, rank=sort is None, author_joined=True)
+    if sort is not None:
+        return _keyset(query, sort, after).limit(limit).all()
+    return query.order_by(models.Book.id).offset(skip).limit(limit).all()
+
+def get_book_version(db: Session, book_id: int) -> Optional[int]:
+    """Version of a book without loading it, for conditional GETs."""
+    return db.query(models.Book.version).filter(models.Book.id == book_id).scalar()
+
+# Version keys for conditional GETs
+# A payload is current while its version key is: the row's version plus its
+# books_count (derived data that moves without a version bump) and, for a
+# book, the keys of the author and categories it embeds. Keys are read with
+# a couple of narrow queries, before any payload is built.
+def _counted_keys(db: Session, model, ids: List[int]) -> Dict[int, Tuple[int, int]]:
+    rows = db.query(model.id, model.version, model.books_count).filter(model.id.in_(ids)) if ids else []
+    return {row_id: (version, books_count) for row_id, version, books_count in rows}
+
+def get_row_versions(
+    db: Session,
+    model,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[int] = None,
+    ids: Optional[List[int]] = None
+) -> List[Tuple[int, int, int]]:
+    """``(id, version, books_count)`` of the authors or categories ``ids``, or of
+    the ``get_authors``/``get_categories`` page for ``skip`` and ``after``."""
+    query = db.query(model.id, model.version, model.books_count)
+    if ids is not None:
+        return [tuple(row) for row in query.filter(model.id.in_(ids)).order_by(model.id)]
+    if after is not None:
+        query = query.filter(model.id > after)
+    return [tuple(row) for row in query.order_by(model.id).offset(skip).limit(limit)]
+
+def book_version_keys(db: Session, book_ids: List[int]) -> List[tuple]:
+    """Version keys of the books ``book_ids`` that exist, in that order:
+    ``(id, version, author key, [category keys])``."""
+    if not book_ids:
+        return []
+    books = {
+        row.id: row for row in
+        db.query(models.Book.id, models.Book.version, models.Book.author_id).filter(models.Book.id.in_(book_ids))
+    }
+    link = models.book_category.c
+    category_ids: Dict[int, List[int]] = {}
+    for book_id, category_id in (
+        db.query(link.book_id, link.category_id)
+        .filter(link.book_id.in_(book_ids))
+        .order_by(link.book_id, link.category_id)
+    ):
+        category_ids.setdefault(book_id, []).append(category_id)
+    authors = _counted_keys(db, models.Author, list({row.author_id for row in books.values() if row.author_id}))
+    categories = _counted_keys(db, models.Category, list({i for ids in category_ids.values() for i in ids}))
+    return [
+        (
+            book_id,
+            books[book_id].version,
+            (books[book_id].author_id, authors.get(books[book_id].author_id)),
+            [(i, categories.get(i)) for i in category_ids.get(book_id, [])],
+        )
+        for book_id in book_ids if book_id in books
+    ]
+
+def get_book_versions(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    search: Optional[schemas.BookSearch] = None,
+    sort: Optional[str] = None,
+    after: Optional[Tuple[Any, ...]] = None
+) -> Tuple[List[tuple], int]:
+    """Version keys of a ``get_books_page`` page (``get_books`` with ``sort``)
+    plus the total match count, for list ETags."""
+    query = db.query(models.Book.id, func.count().over().label("total"))
+    query = _book_filters(query, search, rank=sort is None)
+    if sort is not None:
+        rows = _keyset(query, sort, after).limit(limit).all()
+    else:
+        rows = query.order_by(models.Book.id).offset(skip).limit(limit).all()
+    total = rows[0].total if rows else (get_books_count(db, search) if skip else 0)
+    return book_version_keys(db, [row.id for row in rows]), total
+
+def book_rows_query(db: Session, search: Optional[schemas.BookSearch] = None) -> Query:
+    """Flat export rows (book columns plus ``author_name``) in id order; see ``iter_book_rows``."""
+    columns = [column for column in models.Book.__table__.c if column.name != "version"]
+    query = db.query(*columns, models.Author.name.label("author_name")).join(
+        models.Author, models.Book.author_id == models.Author.id
+    )
+    query = _book_filters(query, search, rank=False, author_joined=True)
+    return query.order_by(models.Book.id)
+
+def with_category_ids(db: Session, batch: List[Any]) -> List[dict]:
+    """Turn a batch of ``book_rows_query`` rows into dicts with their category ids (one IN query)."""
+    book_ids = [row.id for row in batch]
+    category_ids = {book_id: [] for book_id in book_ids}
+    links = db.execute(
+        select(models.book_category.c.book_id, models.book_category.c.category_id)
+        .where(models.book_category.c.book_id.in_(book_ids))
+    )
+    for book_id, category_id in links:
+        category_ids[book_id].append(category_id)
+    rows = []
+    for row in batch:
+        data = row._asdict()
+        data["category_ids"] = category_ids[row.id]
+        rows.append(data)
+    return rows
+
+def iter_book_rows(
+    db: Session,
+    search: Optional[schemas.BookSearch] = None,
+    batch_size: int = 1000
+) -> Iterator[dict]:
+    """Stream every matching book as a flat dict (see ``export.EXPORT_FIELDS``).
+
+    Rows come off a server-side cursor ``batch_size`` at a time as plain
+    column tuples (nothing accumulates in the identity map), and each batch's
+    category ids are fetched with one IN query, so memory stays constant.
+    """
+    for batch in chunked(book_rows_query(db, search).yield_per(batch_size), batch_size):
+        yield from with_category_ids(db, batch)
 
 def get_books_count(db: Session, search: Optional[schemas.BookSearch] = None) -> int:
-    query = db.query(models.Book)
-    
-    if search:
-        if search.title:
-            query = query.filter(models.Book.title.ilike(f"%{search.title}%"))
-        if search.author_name:
-            query = query.join(models.Author).filter(models.Author.name.ilike(f"%{search.author_name}%"))
-        if search.category_name:
-            query = query.join(models.Category, models.Book.categories).filter(
-                models.Category.name.ilike(f"%{search.category_name}%")
-            )
-        if search.min_price is not None:
-            query = query.filter(models.Book.price >= search.min_price)
-        if search.max_price is not None:
-            query = query.filter(models.Book.price <= search.max_price)
-        if search.in_stock is not None:
-            if search.in_stock:
-                query = query.filter(models.Book.stock_quantity > 0)
-            else:
-                query = query.filter(models.Book.stock_quantity == 0)
-    
     # Count only books with valid authors
-    return query.filter(models.Book.author_id.isnot(None)).count()
+    return _book_filters(db.query(models.Book), search, rank=False).count()
+
+def get_book_facets(db: Session, search: Optional[schemas.BookSearch] = None) -> schemas.BookFacets:
+    """Author, category, price bucket and stock counts for the books matching ``search``.
+
+    The filtered ids are a CTE and every facet is a GROUP BY over it, joined
+    with UNION ALL, so all counts come back from a single statement.
+    """
+    matched = _book_filters(
+        db.query(models.Book.id, models.Book.author_id, models.Book.price, models.Book.stock_quantity),
+        search, rank=False,
+    ).cte("matched")
+    bucket = case(
+        *[(matched.c.price < edge, index) for index, edge in enumerate(PRICE_EDGES)],
+        else_=len(PRICE_EDGES),
+    )
+    stocked = case((func.coalesce(matched.c.stock_quantity, 0) > 0, 1), else_=0)
+    no_name = literal(None, String)
+    statement = union_all(
+        select(literal("author"), models.Author.id, models.Author.name, func.count())
+        .join(matched, matched.c.author_id == models.Author.id)
+        .group_by(models.Author.id, models.Author.name),
+        select(literal("category"), models.Category.id, models.Category.name, func.count())
+        .join(models.book_category, models.book_category.c.category_id == models.Category.id)
+        .join(matched, matched.c.id == models.book_category.c.book_id)
+        .group_by(models.Category.id, models.Category.name),
+        select(literal("price"), bucket, no_name, func.count())
+        .select_from(matched).where(matched.c.price.isnot(None)).group_by(bucket),
+        select(literal("stock"), stocked, no_name, func.count())
+        .select_from(matched).group_by(stocked),
+    )
+    facets = {"author": [], "category": [], "price": [], "stock": []}
+    for facet, key, name, count in db.execute(statement):
+        facets[facet].append((key, name, count))
+    stock = {key: count for key, _, count in facets["stock"]}
+    return build_facets(
+        facets["author"], facets["category"],
+        {key: count for key, _, count in facets["price"]},
+        stock.get(1, 0), stock.get(0, 0),
+    )
+
+def search_books(db: Session, q: str, skip: int = 0, limit: int = 100) -> List[models.Book]:
+    query = db.query(models.Book).options(*BOOK_LIST_OPTIONS)
+    query = apply_fulltext(query, q)
+    return query.filter(models.Book.author_id.isnot(None)).offset(skip).limit(limit).all()
 
 def update_book(db: Session, book_id: int, book: schemas.BookUpdate) -> Optional[models.Book]:
+    use_primary(db)
     db_book = get_book(db, book_id)
     if db_book:
         update_data = book.dict(exclude_unset=True)
         category_ids = update_data.pop('category_ids', None)
+        old_author_id = db_book.author_id
+        old_category_ids = [category.id for category in db_book.categories]
         
         for field, value in update_data.items():
             setattr(db_book, field, value)
@@ -161,25 +510,303 @@ def update_book(db: Session, book_id: int, book: schemas.BookUpdate) -> Optional
         if category_ids is not None:
             categories = db.query(models.Category).filter(models.Category.id.in_(category_ids)).all()
             db_book.categories = categories
+            # Collection changes alone do not UPDATE the row; force one so
+            # the version (and with it the ETag) moves
+            db_book.updated_at = func.now()
         
+        authors = _count_changes([old_author_id], [db_book.author_id])
+        categories = _count_changes(old_category_ids, [category.id for category in db_book.categories])
+        _adjust_book_counts(db, authors, categories)
         db.commit()
         db.refresh(db_book)
+        invalidate_book(book_id)
+        _invalidate_counts(authors, categories)
     return db_book
 
 def delete_book(db: Session, book_id: int) -> bool:
+    use_primary(db)
     db_book = get_book(db, book_id)
     if db_book:
+        authors = _count_changes([db_book.author_id], [])
+        categories = _count_changes([category.id for category in db_book.categories], [])
         db.delete(db_book)
+        _adjust_book_counts(db, authors, categories)
         db.commit()
+        invalidate_book(book_id)
+        _invalidate_counts(authors, categories)
         return True
     return False
 
 def update_book_stock(db: Session, book_id: int, quantity_change: int) -> Optional[models.Book]:
-    db_book = get_book(db, book_id)
-    if db_book:
-        db_book.stock_quantity += quantity_change
-        if db_book.stock_quantity < 0:
-            db_book.stock_quantity = 0
+    # One conditional UPDATE: the database applies the change (clamped at 0)
+    # atomically, so concurrent adjustments cannot overwrite each other
+    new_stock = models.Book.stock_quantity + quantity_change
+    statement = (
+        update(models.Book)
+        .where(models.Book.id == book_id)
+        .values(
+            stock_quantity=case((new_stock < 0, 0), else_=new_stock),
+            version=models.Book.version + 1,
+        )
+        .execution_options(synchronize_session="fetch")
+    )
+    if db.execute(statement).rowcount == 0:
+        db.rollback()
+        return None
+    db.commit()
+    invalidate_book(book_id)
+    return get_book(db, book_id)
+
+# Stock reservations
+class InsufficientStock(Exception):
+    """Raised when some reservation lines cannot be satisfied; nothing is reserved."""
+
+    def __init__(self, book_ids: List[int]):
+        super().__init__(f"Insufficient stock or stale version for books {book_ids}")
+        self.book_ids = book_ids
+
+def _adjust_stock(db: Session, book_id: int, delta: int, expected_version: Optional[int] = None) -> bool:
+    statement = update(models.Book).where(models.Book.id == book_id)
+    if delta < 0:
+        statement = statement.where(models.Book.stock_quantity >= -delta)
+    if expected_version is not None:
+        statement = statement.where(models.Book.version == expected_version)
+    statement = statement.values(
+        stock_quantity=models.Book.stock_quantity + delta,
+        version=models.Book.version + 1,
+    ).execution_options(synchronize_session="fetch")
+    return db.execute(statement).rowcount == 1
+
+def reserve_stock(db: Session, reservation: schemas.ReservationCreate) -> models.StockReservation:
+    """Take stock for every line item, all or nothing.
+
+    Each line is one conditional ``UPDATE ... WHERE stock_quantity >= :qty``
+    (plus ``version = :expected`` when given), so concurrent checkouts cannot
+    oversell. Lines are applied in book id order to keep lock order stable.
+    """
+    lines: Dict[int, List[Any]] = {}
+    for item in reservation.items:
+        line = lines.setdefault(item.book_id, [0, item.expected_version])
+        line[0] += item.quantity
+    failed = [
+        book_id for book_id, (quantity, expected_version) in sorted(lines.items())
+        if not _adjust_stock(db, book_id, -quantity, expected_version)
+    ]
+    if failed:
+        db.rollback()
+        raise InsufficientStock(failed)
+    db_reservation = models.StockReservation(
+        status="pending",
+        expires_at=datetime.utcnow() + timedelta(seconds=reservation.ttl_seconds),
+        items=[
+            models.StockReservationItem(book_id=book_id, quantity=quantity)
+            for book_id, (quantity, _) in sorted(lines.items())
+        ],
+    )
+    db.add(db_reservation)
+    db.commit()
+    db.refresh(db_reservation)
+    for book_id in lines:
+        invalidate_book(book_id)
+    return db_reservation
+
+def get_reservation(db: Session, reservation_id: int) -> Optional[models.StockReservation]:
+    return db.query(models.StockReservation).filter(models.StockReservation.id == reservation_id).first()
+
+def _transition_reservation(db: Session, reservation_id: int, status: str, *conditions) -> bool:
+    # Compare-and-set on the status, so commit and release race safely
+    statement = (
+        update(models.StockReservation)
+        .where(
+            models.StockReservation.id == reservation_id,
+            models.StockReservation.status == "pending",
+            *conditions
+        )
+        .values(status=status, updated_at=func.now())
+        .execution_options(synchronize_session="fetch")
+    )
+    return db.execute(statement).rowcount == 1
+
+def commit_reservation(db: Session, reservation_id: int) -> Optional[models.StockReservation]:
+    """Finalize a pending, unexpired reservation; the stock is already taken.
+
+    Returns the reservation (check ``status`` for the outcome) or None if unknown.
+    """
+    use_primary(db)
+    if _transition_reservation(db, reservation_id, "committed",
+                               models.StockReservation.expires_at > datetime.utcnow()):
         db.commit()
-        db.refresh(db_book)
-    return db_book 
\ No newline at end of file
+    return get_reservation(db, reservation_id)
+
+def release_reservation(db: Session, reservation_id: int) -> Optional[models.StockReservation]:
+    """Return a pending reservation's stock to the books."""
+    use_primary(db)
+    if _transition_reservation(db, reservation_id, "released"):
+        items = db.query(models.StockReservationItem).filter(
+            models.StockReservationItem.reservation_id == reservation_id
+        ).all()
+        for item in items:
+            _adjust_stock(db, item.book_id, item.quantity)
+        db.commit()
+        for item in items:
+            invalidate_book(item.book_id)
+    return get_reservation(db, reservation_id)
+
+def release_expired_reservations(db: Session) -> int:
+    use_primary(db)
+    expired = db.scalars(
+        select(models.StockReservation.id).where(
+            models.StockReservation.status == "pending",
+            models.StockReservation.expires_at <= datetime.utcnow(),
+        )
+    ).all()
+    released = 0
+    for reservation_id in expired:
+        reservation = release_reservation(db, reservation_id)
+        released += reservation is not None and reservation.status == "released"
+    return released
+
+# Bulk import
+# Records are validated a chunk at a time, foreign keys and unique columns
+# are checked with one IN query per chunk, and each chunk is inserted with a
+# single executemany in its own transaction. A chunk that still fails is
+# retried row by row so only the offending rows are reported.
+# ``start`` and ``result`` let a streaming caller import a body chunk by
+# chunk: rows are numbered from ``start`` and errors accumulate in ``result``.
+def _existing(db: Session, column, values: Iterable[Any]) -> set:
+    values = set(values)
+    if not values:
+        return set()
+    return set(db.scalars(select(column).where(column.in_(values))))
+
+def _insert_chunk(
+    db: Session,
+    table,
+    rows: List[Tuple[int, dict]],
+    result: schemas.BulkImportResult,
+    link: Optional[Callable[[List[int], List[dict]], None]] = None
+) -> List[int]:
+    statement = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+
+    def write(batch: List[Tuple[int, dict]]) -> List[int]:
+        values = [data for _, data in batch]
+        ids = list(db.execute(statement, values).scalars())
+        if link:
+            link(ids, values)
+        db.commit()
+        return ids
+
+    if not rows:
+        return []
+    try:
+        ids = write(rows)
+    except SQLAlchemyError:
+        db.rollback()
+        ids = []
+        for row, data in rows:
+            try:
+                ids.extend(write([(row, data)]))
+            except SQLAlchemyError as exc:
+                db.rollback()
+                result.errors.append(schemas.BulkRowError(row=row, error=str(getattr(exc, "orig", None) or exc)))
+    result.created += len(ids)
+    return ids
+
+def bulk_create_authors(
+    db: Session,
+    records: Iterable[Any],
+    chunk_size: int = 1000,
+    start: int = 1,
+    result: Optional[schemas.BulkImportResult] = None
+) -> schemas.BulkImportResult:
+    result = result if result is not None else schemas.BulkImportResult()
+    for index, chunk in enumerate(chunked(records, chunk_size)):
+        valid = validate_chunk(chunk, start + index * chunk_size, schemas.AuthorCreate, result)
+        taken = _existing(db, models.Author.email, (author.email for _, author in valid))
+        rows = []
+        for row, author in valid:
+            if author.email in taken:
+                result.errors.append(schemas.BulkRowError(row=row, error=f"Duplicate email {author.email}"))
+                continue
+            taken.add(author.email)
+            rows.append((row, author.dict()))
+        _insert_chunk(db, models.Author.__table__, rows, result)
+    catalog_cache.invalidate("authors")
+    return result
+
+def bulk_create_categories(
+    db: Session,
+    records: Iterable[Any],
+    chunk_size: int = 1000,
+    start: int = 1,
+    result: Optional[schemas.BulkImportResult] = None
+) -> schemas.BulkImportResult:
+    result = result if result is not None else schemas.BulkImportResult()
+    for index, chunk in enumerate(chunked(records, chunk_size)):
+        valid = validate_chunk(chunk, start + index * chunk_size, schemas.CategoryCreate, result)
+        taken = _existing(db, models.Category.name, (category.name for _, category in valid))
+        rows = []
+        for row, category in valid:
+            if category.name in taken:
+                result.errors.append(schemas.BulkRowError(row=row, error=f"Duplicate category {category.name}"))
+                continue
+            taken.add(category.name)
+            rows.append((row, category.dict()))
+        _insert_chunk(db, models.Category.__table__, rows, result)
+    catalog_cache.invalidate("categories")
+    return result
+
+def bulk_create_books(
+    db: Session,
+    records: Iterable[Any],
+    chunk_size: int = 1000,
+    start: int = 1,
+    result: Optional[schemas.BulkImportResult] = None
+) -> schemas.BulkImportResult:
+    result = result if result is not None else schemas.BulkImportResult()
+    counted_authors, counted_categories = Counter(), Counter()
+
+    def link_categories(ids: List[int], values: List[dict]) -> None:
+        links = [
+            {"book_id": book_id, "category_id": category_id}
+            for book_id, data in zip(ids, values)
+            for category_id in category_ids_by_isbn[data["isbn"]]
+        ]
+        if links:
+            db.execute(insert(models.book_category), links)
+        # Counters move in the chunk's transaction, so a failed chunk leaves them alone
+        authors = _count_changes([], (data["author_id"] for data in values))
+        categories = _count_changes([], (link["category_id"] for link in links))
+        _adjust_book_counts(db, authors, categories)
+        counted_authors.update(authors)
+        counted_categories.update(categories)
+
+    for index, chunk in enumerate(chunked(records, chunk_size)):
+        valid = validate_chunk(chunk, start + index * chunk_size, schemas.BookCreate, result)
+        authors = _existing(db, models.Author.id, (book.author_id for _, book in valid))
+        categories = _existing(db, models.Category.id, (c for _, book in valid for c in book.category_ids or []))
+        taken = _existing(db, models.Book.isbn, (book.isbn for _, book in valid))
+        rows = []
+        category_ids_by_isbn = {}
+        for row, book in valid:
+            missing = set(book.category_ids or []) - categories
+            if book.author_id not in authors:
+                error = f"Author {book.author_id} not found"
+            elif missing:
+                error = f"Categories {sorted(missing)} not found"
+            elif book.isbn in taken:
+                error = f"Duplicate ISBN {book.isbn}"
+            else:
+                error = None
+            if error:
+                result.errors.append(schemas.BulkRowError(row=row, error=error))
+                continue
+            taken.add(book.isbn)
+            data = book.dict()
+            category_ids_by_isbn[book.isbn] = list(dict.fromkeys(data.pop("category_ids") or []))
+            rows.append((row, data))
+        _insert_chunk(db, models.Book.__table__, rows, result, link=link_categories)
+    catalog_cache.invalidate("books")
+    _invalidate_counts(counted_authors, counted_categories)
+    return result
+
@@ -1,19 +1,233 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.sql import Select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from threading import Lock
+from typing import AsyncIterator, List, Optional
 import os
+import time
+
+from .metrics import record_query, watch_pool
+from .profiling import observe_statement
 
 # Database URL - using SQLite for simplicity, can be changed to PostgreSQL
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./bookstore.db")
 
+def _env_int(name: str, default: Optional[int]) -> Optional[int]:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    return default if value in (None, "") else value.lower() in ("1", "true", "yes", "on")
+
+
+class EngineSettings:
+    """Engine tuning read from the environment.
+
+    Pool settings apply to server databases and file-backed SQLite; the
+    SQLite profile (WAL journal, synchronous=NORMAL, mmap, page cache, busy
+    timeout) is applied to every new connection. WAL lets readers proceed
+    while a writer commits, and the busy timeout makes writers wait for the
+    lock instead of failing with "database is locked".
+    """
+
+    def __init__(self, **overrides):
+        self.pool_size = _env_int("DB_POOL_SIZE", 10)
+        self.max_overflow = _env_int("DB_MAX_OVERFLOW", 20)
+        self.pool_timeout = _env_int("DB_POOL_TIMEOUT", 30)
+        self.pool_recycle = _env_int("DB_POOL_RECYCLE", 1800)
+        self.pool_pre_ping = _env_bool("DB_POOL_PRE_PING", True)
+        self.statement_timeout_ms = _env_int("DB_STATEMENT_TIMEOUT_MS", None)
+        self.sqlite_journal_mode = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+        self.sqlite_synchronous = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+        self.sqlite_busy_timeout_ms = _env_int("SQLITE_BUSY_TIMEOUT_MS", 5000)
+        self.sqlite_mmap_size = _env_int("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)
+        # Negative values are KiB, as in PRAGMA cache_size
+        self.sqlite_cache_size = _env_int("SQLITE_CACHE_SIZE", -64 * 1024)
+        for name, value in overrides.items():
+            if not hasattr(self, name):
+                raise TypeError(f"Unknown engine setting: {name}")
+            setattr(self, name, value)
+
+    def sqlite_pragmas(self, in_memory: bool) -> list:
+        pragmas = [
+            ("busy_timeout", self.sqlite_busy_timeout_ms),
+            ("synchronous", self.sqlite_synchronous),
+            ("cache_size", self.sqlite_cache_size),
+        ]
+        if not in_memory:
+            pragmas += [("journal_mode", self.sqlite_journal_mode), ("mmap_size", self.sqlite_mmap_size)]
+        return [(name, value) for name, value in pragmas if value is not None]
+
+    def engine_options(self, url: str) -> dict:
+        """Keyword arguments for ``create_engine``/``create_async_engine``."""
+        parsed = make_url(url)
+        options = {"pool_pre_ping": self.pool_pre_ping}
+        if parsed.get_backend_name() == "sqlite":
+            if parsed.get_driver_name() in ("pysqlite", ""):
+                options["connect_args"] = {"check_same_thread": False}
+            if _sqlite_in_memory(url):
+                # In-memory databases use a single connection per thread
+                return options
+            if parsed.get_driver_name() == "aiosqlite":
+                # aiosqlite defaults to NullPool, which takes no pool settings
+                options["poolclass"] = AsyncAdaptedQueuePool
+        elif self.statement_timeout_ms is not None:
+            if parsed.get_driver_name() == "asyncpg":
+                options["connect_args"] = {"server_settings": {"statement_timeout": str(self.statement_timeout_ms)}}
+            elif parsed.get_backend_name() == "postgresql":
+                options["connect_args"] = {"options": f"-c statement_timeout={self.statement_timeout_ms}"}
+        options.update(
+            pool_size=self.pool_size,
+            max_overflow=self.max_overflow,
+            pool_timeout=self.pool_timeout,
+            pool_recycle=self.pool_recycle,
+        )
+        return options
+
+
+def _sqlite_in_memory(url: str) -> bool:
+    database = make_url(url).database
+    return not database or database == ":memory:" or database.startswith("file::memory:")
+
+def apply_sqlite_profile(engine: Engine, settings: EngineSettings, in_memory: bool = False) -> None:
+    pragmas = settings.sqlite_pragmas(in_memory)
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """Report statement counts and timings to ``metrics`` (per engine and per
+    request) and to ``profiling`` (request profiles, slow-query log)."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info["query_started"].pop()
+        record_query(name, seconds)
+        observe_statement(conn, statement, parameters, executemany, seconds)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(context):
+        # after_cursor_execute does not run for failed statements
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            record_query(name, time.perf_counter() - started.pop())
+
+def make_engine(url: str, settings: Optional[EngineSettings] = None, name: str = "primary") -> Engine:
+    settings = settings or EngineSettings()
+    engine = create_engine(url, **settings.engine_options(url))
+    if engine.dialect.name == "sqlite":
+        apply_sqlite_profile(engine, settings, _sqlite_in_memory(url))
+    instrument_engine(engine, name)
+    return engine
+
 # Create SQLAlchemy engine
-engine = create_engine(
-    DATABASE_URL, 
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-)
+engine_settings = EngineSettings()
+engine = make_engine(DATABASE_URL, engine_settings)
+watch_pool("primary", engine)
+
+# Read replicas
+class ReplicaSet:
+    """Round-robin over replica engines, skipping ones that recently failed.
+
+    A replica that raises a connection-level error is taken out of rotation
+    for ``cooldown`` seconds; with no healthy replica, reads use the primary.
+    """
+
+    def __init__(self, engines: List[Engine], cooldown: float = 30.0):
+        self.engines = list(engines)
+        self.cooldown = cooldown
+        self._down_until = {}
+        self._next = 0
+        self._lock = Lock()
+        for replica in self.engines:
+            event.listen(replica, "handle_error", self._on_error)
+
+    def _on_error(self, context) -> None:
+        if context.is_disconnect or isinstance(context.sqlalchemy_exception, OperationalError):
+            self.mark_down(context.engine)
+
+    def mark_down(self, replica: Engine) -> None:
+        self._down_until[replica] = time.monotonic() + self.cooldown
+
+    def choose(self) -> Optional[Engine]:
+        now = time.monotonic()
+        with self._lock:
+            for _ in range(len(self.engines)):
+                replica = self.engines[self._next % len(self.engines)]
+                self._next += 1
+                if self._down_until.get(replica, 0) <= now:
+                    return replica
+        return None
+
+
+class RoutingSession(Session):
+    """Session that sends reads to a replica and everything else to the primary.
+
+    Plain SELECTs outside a flush go to ``replicas``; flushes, SELECT ... FOR
+    UPDATE and INSERT/UPDATE/DELETE/textual statements go to the primary bind. Once a session
+    has written, all later reads stay on the primary too, so a request always
+    reads its own writes despite replication lag. The replica is chosen once
+    per session, so the queries of one read (e.g. a selectinload) all see the
+    same replica state.
+    """
+
+    def __init__(self, *args, replicas: Optional[ReplicaSet] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        self.wrote = False
+        self.replica: Optional[Engine] = None
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        primary = super().get_bind(mapper=mapper, clause=clause, **kwargs)
+        if self.replicas is None or self.wrote:
+            return primary
+        locking = isinstance(clause, Select) and clause._for_update_arg is not None
+        if self._flushing or locking or not isinstance(clause, Select):
+            if self._flushing or clause is not None:
+                self.wrote = True
+            return primary
+        if self.replica is None:
+            self.replica = self.replicas.choose()
+        return self.replica or primary
+
+    def close(self) -> None:
+        super().close()
+        self.replica = None
+        self.wrote = False
+
+def use_primary(db: Session) -> None:
+    """Pin a session to the primary, e.g. before a read-modify-write."""
+    if isinstance(db, RoutingSession):
+        db.wrote = True
+
+def _replica_urls() -> List[str]:
+    return [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+
+replicas = ReplicaSet([
+    make_engine(url, engine_settings, name=f"replica{i}") for i, url in enumerate(_replica_urls())
+]) if _replica_urls() else None
+if replicas is not None:
+    for index, replica in enumerate(replicas.engines):
+        watch_pool(f"replica{index}", replica)
 
 # Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine, replicas=replicas)
 
 # Create Base class
 Base = declarative_base()
@@ -24,4 +238,55 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+# Async engine for the async API (aiosqlite / asyncpg drivers)
+def async_database_url(url: str) -> str:
+    """Map a sync database URL onto the matching async driver."""
+    scheme, sep, rest = url.partition("://")
+    if scheme in ("sqlite", "sqlite+pysqlite"):
+        return f"sqlite+aiosqlite://{rest}"
+    if scheme in ("postgresql", "postgresql+psycopg2", "postgres"):
+        return f"postgresql+asyncpg://{rest}"
+    return url
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", async_database_url(DATABASE_URL))
+
+AsyncSessionLocal = async_sessionmaker(
+    class_=AsyncSession, sync_session_class=RoutingSession, autoflush=False, expire_on_commit=False
+)
+
+_async_engine: Optional[AsyncEngine] = None
+_async_replicas: Optional[ReplicaSet] = None
+
+def make_async_engine(url: str, settings: Optional[EngineSettings] = None, name: str = "async-primary") -> AsyncEngine:
+    settings = settings or EngineSettings()
+    async_engine = create_async_engine(url, **settings.engine_options(url))
+    if async_engine.dialect.name == "sqlite":
+        apply_sqlite_profile(async_engine.sync_engine, settings, _sqlite_in_memory(url))
+    instrument_engine(async_engine.sync_engine, name)
+    return async_engine
+
+def get_async_engine() -> AsyncEngine:
+    # Created on first use so the async driver is only needed by the async API
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = make_async_engine(ASYNC_DATABASE_URL, engine_settings)
+        watch_pool("async-primary", _async_engine.sync_engine)
+    return _async_engine
+
+def get_async_replicas() -> Optional[ReplicaSet]:
+    global _async_replicas
+    if _async_replicas is None and _replica_urls():
+        _async_replicas = ReplicaSet([
+            make_async_engine(async_database_url(url), engine_settings, name=f"async-replica{i}").sync_engine
+            for i, url in enumerate(_replica_urls())
+        ])
+        for index, replica in enumerate(_async_replicas.engines):
+            watch_pool(f"async-replica{index}", replica)
+    return _async_replicas
+
+# Dependency to get an async database session
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal(bind=get_async_engine(), replicas=get_async_replicas()) as db:
+        yield db
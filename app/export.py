@@ -0,0 +1,52 @@
+import csv
+import io
+import json
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, List
+
+# Catalog export: book rows (flat dicts with EXPORT_FIELDS) rendered one line
+# at a time so responses stream with constant memory.
+
+EXPORT_FIELDS = [
+    "id", "title", "isbn", "description", "price", "stock_quantity",
+    "published_date", "author_id", "author_name", "category_ids",
+    "created_at", "updated_at",
+]
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+def ndjson_line(row: dict) -> str:
+    return json.dumps({field: row.get(field) for field in EXPORT_FIELDS}, default=str) + "\n"
+
+def _csv_line(values: Iterable) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerow(values)
+    return buffer.getvalue()
+
+def csv_line(row: dict) -> str:
+    values = []
+    for field in EXPORT_FIELDS:
+        value = row.get(field)
+        if field == "category_ids":
+            # Same list encoding the bulk importer reads back
+            value = ";".join(str(v) for v in value or [])
+        values.append("" if value is None else value)
+    return _csv_line(values)
+
+def ndjson_lines(rows: Iterable[dict]) -> Iterator[str]:
+    for row in rows:
+        yield ndjson_line(row)
+
+def csv_lines(rows: Iterable[dict]) -> Iterator[str]:
+    yield _csv_line(EXPORT_FIELDS)
+    for row in rows:
+        yield csv_line(row)
+
+def render(rows: Iterable[dict], fmt: str) -> Iterator[str]:
+    return csv_lines(rows) if fmt == "csv" else ndjson_lines(rows)
+
+async def render_batches(batches: AsyncIterable[List[dict]], fmt: str) -> AsyncIterator[str]:
+    """``render`` for rows arriving in batches from an async source; one chunk per batch."""
+    if fmt == "csv":
+        yield _csv_line(EXPORT_FIELDS)
+    line = csv_line if fmt == "csv" else ndjson_line
+    async for batch in batches:
+        yield "".join(line(row) for row in batch)
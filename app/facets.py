@@ -0,0 +1,67 @@
+from collections import Counter
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+from . import schemas
+
+# Facet counts for the books listing: per author, per category, a price
+# histogram and in/out of stock, all for the rows matching the current filter.
+
+# Upper bounds of the price buckets; the last bucket is open-ended
+PRICE_EDGES = (10.0, 20.0, 50.0, 100.0)
+
+def price_bucket(price: Optional[float]) -> Optional[int]:
+    if price is None:
+        return None
+    for index, edge in enumerate(PRICE_EDGES):
+        if price < edge:
+            return index
+    return len(PRICE_EDGES)
+
+def price_range(bucket: int) -> Tuple[float, Optional[float]]:
+    low = PRICE_EDGES[bucket - 1] if bucket else 0.0
+    high = PRICE_EDGES[bucket] if bucket < len(PRICE_EDGES) else None
+    return low, high
+
+
+def count_facets(
+    author_ids: Sequence[Optional[int]],
+    category_ids: Iterable[Iterable[int]],
+    prices: Iterable[Optional[float]],
+    stocks: Sequence[Optional[int]],
+    author: Callable[[int], Optional[dict]],
+    category: Callable[[int], Optional[dict]],
+) -> schemas.BookFacets:
+    """Facets from per-book column values (used by the mock store); author and
+    category names are looked up once per distinct id."""
+    def named(counts: Counter, lookup: Callable[[int], Optional[dict]]) -> List[Tuple[int, str, int]]:
+        found = ((key, lookup(key), count) for key, count in counts.items())
+        return [(key, row.get("name"), count) for key, row, count in found if row]
+
+    buckets = Counter(map(price_bucket, prices))
+    buckets.pop(None, None)
+    in_stock = sum(1 for stock in stocks if (stock or 0) > 0)
+    return build_facets(
+        named(Counter(key for key in author_ids if key is not None), author),
+        named(Counter(key for keys in category_ids for key in keys), category),
+        dict(buckets), in_stock, len(stocks) - in_stock,
+    )
+
+
+def build_facets(authors: List[Tuple[int, str, int]], categories: List[Tuple[int, str, int]],
+                 prices: dict, in_stock: int, out_of_stock: int) -> schemas.BookFacets:
+    """Assemble facets; value lists are ordered by count, then name."""
+    def values(rows):
+        ordered = sorted(rows, key=lambda row: (-row[2], row[1] or "", row[0]))
+        return [schemas.FacetValue(id=key, name=name, count=count) for key, name, count in ordered]
+
+    return schemas.BookFacets(
+        authors=values(authors),
+        categories=values(categories),
+        price=[
+            schemas.PriceBucket(min=low, max=high, count=prices.get(bucket, 0))
+            for bucket in range(len(PRICE_EDGES) + 1)
+            for low, high in [price_range(bucket)]
+        ],
+        in_stock=in_stock,
+        out_of_stock=out_of_stock,
+    )
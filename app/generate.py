@@ -0,0 +1,216 @@
+import argparse
+import math
+import os
+import random
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Iterator, List, Optional
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.engine import Engine
+
+from . import models
+from .bulk import chunked
+from .crud import refresh_book_counts
+from .store import MemoryStore
+
+# Deterministic synthetic catalogs at production scale.
+#
+# The same arguments always produce the same rows. Distributions are skewed
+# the way real catalogs are: author popularity follows a Zipf law (a few
+# authors own many books), books have 1-4 categories picked with their own
+# Zipf skew, prices are log-normal (most books cheap, a long expensive tail)
+# and a share of books is out of stock.
+
+GENRES = [
+    "Fantasy", "Horror", "Mystery", "Classic", "Science Fiction", "Romance", "Thriller",
+    "Young Adult", "Biography", "History", "Poetry", "Travel", "Cooking", "Science",
+    "Philosophy", "Business", "Self Help", "Children", "Graphic Novels", "Drama",
+]
+WORDS = [
+    "dragon", "empire", "garden", "harbor", "island", "journey", "kingdom", "letters",
+    "memory", "night", "ocean", "patterns", "quiet", "river", "shadow", "summer",
+    "theory", "voyage", "winter", "world", "silver", "forgotten", "city", "glass",
+    "storm", "orchard", "machine", "stars", "winds", "stone", "fire", "house",
+]
+FIRST_NAMES = ["Ada", "Ben", "Chloe", "David", "Elena", "Farid", "Grace", "Hiro", "Ines", "Jonas", "Kemi", "Liam"]
+LAST_NAMES = ["Adams", "Brooks", "Chen", "Diaz", "Evans", "Fischer", "Garcia", "Hughes", "Ito", "Jensen", "Khan", "Lopez"]
+
+def zipf_cum_weights(n: int, s: float) -> List[float]:
+    """Cumulative weights for ``random.choices`` over ranks 1..n with P(k) ~ 1/k**s."""
+    return list(accumulate(1.0 / (rank ** s) for rank in range(1, n + 1)))
+
+
+class CatalogGenerator:
+    """Seedable generator of author, category and book rows (plain dicts).
+
+    Ids start after ``*_offset`` so a catalog can be appended to existing data.
+    Book rows carry ``category_ids``; writers turn them into association rows.
+    """
+
+    def __init__(self, books: int, authors: Optional[int] = None, categories: Optional[int] = None,
+                 seed: int = 0, author_skew: float = 0.9, category_skew: float = 0.8,
+                 author_offset: int = 0, category_offset: int = 0, book_offset: int = 0):
+        self.book_count = books
+        self.author_count = authors if authors is not None else max(1, books // 10)
+        self.category_count = categories if categories is not None else len(GENRES)
+        self.seed = seed
+        self.author_skew = author_skew
+        self.category_skew = category_skew
+        self.author_offset = author_offset
+        self.category_offset = category_offset
+        self.book_offset = book_offset
+
+    def _rng(self, stream: str) -> random.Random:
+        # Separate streams, so e.g. the author rows do not depend on the book count
+        return random.Random(f"{self.seed}:{stream}")
+
+    def authors(self) -> Iterator[dict]:
+        rng = self._rng("authors")
+        for i in range(1, self.author_count + 1):
+            author_id = self.author_offset + i
+            yield {
+                "id": author_id,
+                "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {author_id}",
+                "biography": f"Writes about {' and '.join(rng.sample(WORDS, 2))}.",
+                "email": f"author{author_id}@example.com",
+            }
+
+    def categories(self) -> Iterator[dict]:
+        for i in range(1, self.category_count + 1):
+            name = GENRES[i - 1] if i <= len(GENRES) else f"Genre {i}"
+            yield {
+                "id": self.category_offset + i,
+                "name": name if not self.category_offset else f"{name} {self.category_offset + i}",
+                "description": f"{name} books",
+            }
+
+    def books(self, batch_size: int = 10000) -> Iterator[dict]:
+        rng = self._rng("books")
+        # Popularity rank -> id through a shuffle, so popular authors are spread over the id range
+        author_ids = [self.author_offset + i for i in range(1, self.author_count + 1)]
+        self._rng("author-ranks").shuffle(author_ids)
+        author_weights = zipf_cum_weights(self.author_count, self.author_skew)
+        category_ids = [self.category_offset + i for i in range(1, self.category_count + 1)]
+        category_weights = zipf_cum_weights(self.category_count, self.category_skew)
+        epoch = datetime(1950, 1, 1)
+
+        for start in range(0, self.book_count, batch_size):
+            count = min(batch_size, self.book_count - start)
+            authors = rng.choices(author_ids, cum_weights=author_weights, k=count)
+            for offset, author_id in enumerate(authors):
+                book_id = self.book_offset + start + offset + 1
+                wanted = min(self.category_count, 1 + min(3, int(rng.expovariate(1.2))))
+                categories = set()
+                while len(categories) < wanted:
+                    categories.add(rng.choices(category_ids, cum_weights=category_weights)[0])
+                title = " ".join(rng.sample(WORDS, rng.randint(2, 4))).title()
+                yield {
+                    "id": book_id,
+                    "title": f"The {title}",
+                    "isbn": f"978{book_id:010d}",
+                    "description": " ".join(rng.choices(WORDS, k=rng.randint(8, 30))),
+                    # Log-normal around ~15 with a long tail, priced at .99
+                    "price": max(0.99, math.floor(rng.lognormvariate(2.7, 0.6)) + 0.99),
+                    "stock_quantity": 0 if rng.random() < 0.15 else int(rng.expovariate(1 / 25)) + 1,
+                    "published_date": epoch + timedelta(days=rng.randint(0, 27000)),
+                    "author_id": author_id,
+                    "category_ids": sorted(categories),
+                }
+
+
+def write_database(engine: Engine, generator: CatalogGenerator, batch_size: int = 10000) -> dict:
+    """Bulk-insert the generated catalog with executemany, one transaction per batch.
+
+    Ids are assigned after the current maximum of each table, so existing
+    rows are kept. Returns the number of rows written per table.
+    """
+    with engine.connect() as connection:
+        generator.author_offset = connection.scalar(select(func.coalesce(func.max(models.Author.id), 0)))
+        generator.category_offset = connection.scalar(select(func.coalesce(func.max(models.Category.id), 0)))
+        generator.book_offset = connection.scalar(select(func.coalesce(func.max(models.Book.id), 0)))
+
+    counts = {"authors": 0, "categories": 0, "books": 0, "book_category": 0}
+    for table, key, rows in (
+        (models.Author, "authors", generator.authors()),
+        (models.Category, "categories", generator.categories()),
+    ):
+        for batch in chunked(rows, batch_size):
+            with engine.begin() as connection:
+                connection.execute(insert(table), batch)
+            counts[key] += len(batch)
+    for batch in chunked(generator.books(batch_size), batch_size):
+        links = [
+            {"book_id": book["id"], "category_id": category_id}
+            for book in batch for category_id in book.pop("category_ids")
+        ]
+        with engine.begin() as connection:
+            connection.execute(insert(models.Book), batch)
+            connection.execute(insert(models.book_category), links)
+        counts["books"] += len(batch)
+        counts["book_category"] += len(links)
+    # One recount instead of per-batch counter updates
+    with engine.begin() as connection:
+        refresh_book_counts(connection)
+    return counts
+
+def write_store(store: MemoryStore, generator: CatalogGenerator, created_at: str = "2024-01-01T00:00:00") -> dict:
+    """Load the generated catalog into an in-memory store, in the mock app's row shape."""
+    generator.author_offset = max((row["id"] for row in store.authors), default=0)
+    generator.category_offset = max((row["id"] for row in store.categories), default=0)
+    generator.book_offset = max((row["id"] for row in store.books), default=0)
+
+    authors = {}
+    for row in generator.authors():
+        authors[row["id"]] = store.authors.insert(dict(row, created_at=created_at), row_id=row["id"])
+    categories = {}
+    for row in generator.categories():
+        categories[row["id"]] = store.categories.insert(dict(row, created_at=created_at), row_id=row["id"])
+    books = 0
+    # books_count follows from the book inserts (see MemoryStore)
+    for row in generator.books():
+        row.update(
+            author=authors[row["author_id"]],
+            category=categories[row["category_ids"][0]],
+            published_date=row["published_date"].isoformat(),
+            created_at=created_at,
+            updated_at=created_at,
+        )
+        store.books.insert(row, row_id=row["id"])
+        books += 1
+    return {"authors": len(authors), "categories": len(categories), "books": books}
+
+
+def migrate_schema(url: str) -> None:
+    """Create or upgrade the schema at ``url`` through the migrations, so the
+    database is stamped and ``run.py``'s ``alembic upgrade head`` finds it current."""
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini"))
+    config.set_main_option("sqlalchemy.url", url.replace("%", "%%"))  # ini interpolation
+    command.upgrade(config, "head")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from .database import DATABASE_URL, make_engine
+
+    parser = argparse.ArgumentParser(description="Generate a synthetic catalog into the configured database")
+    parser.add_argument("--books", type=int, default=100000)
+    parser.add_argument("--authors", type=int, help="defaults to books / 10")
+    parser.add_argument("--categories", type=int, help=f"defaults to {len(GENRES)}")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    parser.add_argument("--create-schema", action="store_true", help="create or upgrade the schema (alembic upgrade head) first")
+    args = parser.parse_args(argv)
+
+    if args.create_schema:
+        migrate_schema(args.database_url)
+    engine = make_engine(args.database_url)
+    generator = CatalogGenerator(args.books, args.authors, args.categories, seed=args.seed)
+    counts = write_database(engine, generator, args.batch_size)
+    print(", ".join(f"{count} {name}" for name, count in counts.items()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import os
+import struct
+import uuid
+from contextlib import contextmanager
+from threading import RLock
+from typing import Callable, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from .serialization import dumps, loads
+
+try:
+    import fcntl
+except ImportError:  # not POSIX: writes are only serialized within one process
+    fcntl = None
+
+# Shared write journal for the in-memory store.
+#
+# With several worker processes, each keeps its own copy of the catalog in
+# memory (reads stay dict lookups) and every write goes through one
+# append-only file they all share: on tmpfs (/dev/shm) for a shared but
+# volatile catalog, or next to a snapshot for persistence (see ``snapshot``):
+#
+# - a writer takes an exclusive flock, replays the records it has not seen
+#   yet, applies its write locally and appends it, so ids and versions are
+#   allocated on the latest state and every process applies the same
+#   sequence of writes;
+# - before each request a process catches up (JournalMiddleware); when
+#   nothing was written that costs one fstat.
+#
+# Layout: an 8-byte magic, a 16-byte journal id and the 16-byte id of the
+# snapshot the journal continues from (zeros: the seed data), then records of
+# <uint32 length><JSON [table, op, row id, row]>.
+
+MAGIC = b"BSJOURN2"
+HEADER = struct.Struct("<8s16s16s")
+NO_SNAPSHOT = bytes(16)
+LENGTH = struct.Struct("<I")
+
+# encode(table, row) -> JSON-able row; apply(table, op, row_id, row) replays a record
+Encode = Callable[[str, Optional[dict]], Optional[dict]]
+Apply = Callable[[str, str, int, Optional[dict]], None]
+
+
+def _header(base: Optional[str]) -> bytes:
+    return HEADER.pack(MAGIC, uuid.uuid4().bytes, bytes.fromhex(base) if base else NO_SNAPSHOT)
+
+def create(path: str, base: Optional[str] = None) -> None:
+    """Atomically replace ``path`` with an empty journal continuing from snapshot ``base``."""
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(_header(base))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+
+
+class Journal:
+    def __init__(self, path: str, encode: Encode, apply: Apply, base: Optional[str] = None):
+        self.path = path
+        self.encode = encode
+        self.apply = apply
+        self._lock = RLock()
+        self._depth = 0
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o600)
+        with self._file_lock():
+            if os.fstat(self._fd).st_size == 0:
+                os.write(self._fd, _header(base))
+        magic, journal_id, journal_base = HEADER.unpack(os.pread(self._fd, HEADER.size, 0))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a store journal")
+        # Same for every process sharing the file; lets them agree on ETags
+        self.id = journal_id.hex()
+        self.base = journal_base.hex() if journal_base != NO_SNAPSHOT else None
+        self.offset = HEADER.size
+        self.records = 0
+
+    @contextmanager
+    def _file_lock(self):
+        with self._lock:
+            # flock is per open file, not per thread: only the outermost holder locks
+            if self._depth == 0 and fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if self._depth == 0 and fcntl is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    @contextmanager
+    def locked(self):
+        """Hold the write lock, caught up with every record written so far."""
+        with self._file_lock():
+            self._catch_up()
+            yield
+
+    def behind(self) -> bool:
+        """Whether the file holds records not applied here yet (one fstat, no lock)."""
+        return os.fstat(self._fd).st_size != self.offset
+
+    def sync(self) -> int:
+        """Apply the records other processes appended; returns how many."""
+        if not self.behind():
+            return 0
+        with self._lock:
+            return self._catch_up()
+
+    def _catch_up(self) -> int:
+        size = os.fstat(self._fd).st_size
+        if size <= self.offset:
+            return 0
+        data = os.pread(self._fd, size - self.offset, self.offset)
+        position = applied = 0
+        while position + LENGTH.size <= len(data):
+            (length,) = LENGTH.unpack_from(data, position)
+            end = position + LENGTH.size + length
+            if end > len(data):
+                break  # still being appended; picked up on the next sync
+            name, op, row_id, row = loads(data[position + LENGTH.size:end])
+            self.apply(name, op, row_id, row)
+            position = end
+            applied += 1
+        self.offset += position
+        self.records += applied
+        return applied
+
+    def append(self, name: str, op: str, row_id: int, row: Optional[dict]) -> None:
+        """Log a write that was just applied locally; call with ``locked()`` held."""
+        payload = dumps([name, op, row_id, self.encode(name, row)])
+        os.write(self._fd, LENGTH.pack(len(payload)) + payload)
+        self.offset += LENGTH.size + len(payload)
+        self.records += 1
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class JournalMiddleware:
+    """Catch up with the shared journal before handling each request."""
+
+    def __init__(self, app, journal: Journal):
+        self.app = app
+        self.journal = journal
+
+    async def __call__(self, scope, receive, send):
+        # Catching up takes the journal lock, which a write in a threadpool
+        # handler may hold: wait for it off the event loop
+        if scope["type"] == "http" and self.journal.behind():
+            await run_in_threadpool(self.journal.sync)
+        await self.app(scope, receive, send)
@@ -1,14 +1,39 @@
-from fastapi import FastAPI, Query, HTTPException, Body
+from fastapi import FastAPI, Query, HTTPException, Body, Request
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Optional
+from fastapi.responses import StreamingResponse
+from bisect import bisect_right
+from typing import Callable, List, Optional, Tuple
+import heapq
 import math
+import os
+import uuid
+
+from . import schemas
+from .bulk import RecordDecoder, format_from_content_type, stream_chunks, validate_chunk
+from .cache import (
+    book_dependencies, cached, catalog_cache,
+    invalidate_author, invalidate_book, invalidate_category,
+)
+from .export import MEDIA_TYPES, render
+from .facets import count_facets
+from .journal import JournalMiddleware
+from .mock_data import seed_store
+from .metrics import MetricsMiddleware, metrics_response
+from .profiling import ProfilingMiddleware, router as profiling_router
+from .conditional import conditional, make_etag
+from .pagination import decode_cursor, next_cursor, parse_ids
+from .search import InvertedIndex
+from .serialization import FastJSONResponse, json_response
+from .snapshot import journal_path, open_store
+from .store import Table
 
 app = FastAPI(
     title="Book Store Service (Mock)",
     description="A comprehensive book store management API (mock/in-memory mode)",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=FastJSONResponse,
 )
 
 app.add_middleware(
@@ -24,46 +49,114 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.include_router(profiling_router)
+
+# In-memory mock data: the seed catalog, or the last snapshot plus the
+# journal when STORE_DATA_DIR is set (see snapshot)
+STORE_DATA_DIR = os.getenv("STORE_DATA_DIR")
+if STORE_DATA_DIR:
+    store, _snapshot = open_store(STORE_DATA_DIR, seed_store)
+else:
+    store, _snapshot = seed_store(), None
+MOCK_AUTHORS = store.authors
+MOCK_CATEGORIES = store.categories
+MOCK_BOOKS = store.books
+
+# Full-text index over book titles and descriptions, maintained on every
+# book write. Only the book's own fields are indexed (as in the database
+# FTS): author and category rows are attached when a book is read, so
+# writes to them need no reindexing.
+book_index = MOCK_BOOKS.watch(InvertedIndex({"title": 2.0, "description": 1.0}))
+
+# Drop cached reads that depend on a row whenever it is written
+MOCK_AUTHORS.watch(lambda old, new: invalidate_author((new or old)["id"]))
+MOCK_CATEGORIES.watch(lambda old, new: invalidate_category((new or old)["id"]))
+MOCK_BOOKS.watch(lambda old, new: invalidate_book((new or old)["id"]))
+
+# Writes go through a journal when the catalog is persistent or shared by
+# several workers (run.py --production); it is replayed here, after the
+# watchers are in place
+STORE_JOURNAL = os.getenv("STORE_JOURNAL") or (journal_path(STORE_DATA_DIR) if STORE_DATA_DIR else None)
+journal = store.share(STORE_JOURNAL, _snapshot) if STORE_JOURNAL else None
+if journal is not None:
+    app.add_middleware(JournalMiddleware, journal=journal)
+app.add_middleware(ProfilingMiddleware)
+# Added last, so it is outermost and also times the CORS middleware
+app.add_middleware(MetricsMiddleware)
+
+# ETags: per-row versions and per-table revisions, plus a boot id because the
+# in-memory counters restart with the process. Workers sharing a journal
+# apply the same writes in the same order, so they share the journal's id.
+# Rows that embed rows of other tables (books: their author and category,
+# whose books_count and names change independently) add those tables'
+# revisions, like the cache's book_dependencies.
+_BOOT_ID = journal.id if journal is not None else uuid.uuid4().hex
+BOOK_RELATED = (MOCK_AUTHORS, MOCK_CATEGORIES)
+
+def _row_etag(name: str, table: Table, row_id: int, related: Tuple[Table, ...] = ()) -> Optional[str]:
+    version = table.version(row_id)
+    if version is None:
+        return None
+    return make_etag(_BOOT_ID, name, row_id, version, [other.revision for other in related])
+
+def _list_etag(name: str, table: Table, related: Tuple[Table, ...] = ()) -> Callable[..., str]:
+    return lambda **params: make_etag(
+        _BOOT_ID, name, table.revision, [other.revision for other in related], params,
+    )
+
+CURSOR_QUERY = Query(
+    None,
+    description="Keyset pagination cursor: send an empty value for the first page, "
+                "then the previous response's next_cursor",
+)
+
+def _cursor_page(table: Table, cursor: str, limit: int, predicate=None, ids: Optional[List[int]] = None) -> dict:
+    # With ``ids`` (sorted), the page is taken from them instead of scanning the table
+    try:
+        after = decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    last_id = after[-1] if after else None
+    if ids is None:
+        items = table.after(last_id, limit, predicate)
+    else:
+        start = 0 if last_id is None else bisect_right(ids, last_id)
+        items = [row for row in map(table.get, ids[start:start + limit]) if row is not None]
+    return {
+        "items": items,
+        "next_cursor": next_cursor(items[-1] if items else None, limit, len(items)),
+    }
 
-# In-memory mock data
-MOCK_AUTHORS = [
-    {"id": 1, "name": "Mock Author 1", "biography": "Bio 1", "books_count": 1, "created_at": "2024-01-01T00:00:00"},
-    {"id": 2, "name": "Mock Author 2", "biography": "Bio 2", "books_count": 1, "created_at": "2024-01-01T00:00:00"},
-]
-MOCK_CATEGORIES = [
-    {"id": 1, "name": "Mock Category 1", "description": "Desc 1", "books_count": 1, "created_at": "2024-01-01T00:00:00"},
-    {"id": 2, "name": "Mock Category 2", "description": "Desc 2", "books_count": 1, "created_at": "2024-01-01T00:00:00"},
-]
-MOCK_BOOKS = [
-    {
-        "id": 1,
-        "title": "Mock Book 1",
-        "author": MOCK_AUTHORS[0],
-        "category": MOCK_CATEGORIES[0],
-        "price": 10.99,
-        "stock": 5,
-        "description": "A mock book for testing.",
-        "isbn": "1234567890",
-        "publication_year": 2020,
-        "pages": 200,
-        "created_at": "2024-01-01T00:00:00",
-        "updated_at": "2024-01-01T00:00:00"
-    },
-    {
-        "id": 2,
-        "title": "Mock Book 2",
-        "author": MOCK_AUTHORS[1],
-        "category": MOCK_CATEGORIES[1],
-        "price": 15.99,
-        "stock": 0,
-        "description": "Another mock book.",
-        "isbn": "0987654321",
-        "publication_year": 2021,
-        "pages": 300,
-        "created_at": "2024-01-01T00:00:00",
-        "updated_at": "2024-01-01T00:00:00"
-    },
-]
+IDS_QUERY = Query(..., description="Ids to fetch, comma-separated and/or repeated")
+TOP_LIMIT = Query(10, ge=1, le=100)
+
+def _top(table: Table, limit: int) -> List[dict]:
+    # Most books first, ties newest first (as the database app orders them)
+    return heapq.nlargest(limit, table, key=lambda row: (row.get("books_count", 0), row["id"]))
+
+def _batch(table: Table, ids: List[str]) -> dict:
+    try:
+        ids = parse_ids(ids)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    rows = [(i, table.get(i)) for i in ids]
+    return {
+        "items": [row for _, row in rows if row is not None],
+        "missing": [i for i, row in rows if row is None],
+    }
+
+BULK_CHUNK_SIZE = 1000
+
+async def _bulk_import(request: Request, fmt: Optional[str], import_chunk) -> schemas.BulkImportResult:
+    # Decode the body as it streams in and import each full chunk of records
+    try:
+        decoder = RecordDecoder(fmt or format_from_content_type(request.headers.get("content-type")))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    result = schemas.BulkImportResult()
+    async for row, chunk in stream_chunks(request.stream(), decoder, BULK_CHUNK_SIZE):
+        import_chunk(chunk, row, result)
+    return result
 
 @app.get("/", tags=["Root"])
 def read_root():
@@ -78,154 +171,354 @@ def read_root():
 def health_check():
     return {"status": "healthy", "service": "book-store-service-mock"}
 
+@app.get("/metrics", tags=["Health"], include_in_schema=False)
+def metrics():
+    """Prometheus text-format metrics."""
+    return metrics_response()
+
+@app.get("/cache/stats", tags=["Health"])
+def cache_stats():
+    return catalog_cache.stats()
+
 # Authors
 @app.get("/authors/", tags=["Authors"])
-def read_authors(skip: int = 0, limit: int = 100, search: Optional[str] = None):
-    items = MOCK_AUTHORS
+@conditional(_list_etag("authors", MOCK_AUTHORS))
+@cached(("authors",))
+def read_authors(skip: int = 0, limit: int = 100, search: Optional[str] = None, cursor: Optional[str] = CURSOR_QUERY):
+    if cursor is not None:
+        predicate = (lambda a: search.lower() in a["name"].lower()) if search else None
+        return _cursor_page(MOCK_AUTHORS, cursor, limit, predicate)
     if search:
-        items = [a for a in items if search.lower() in a["name"].lower()]
-    return {"items": items[skip:skip+limit], "total": len(items)}
+        items = [a for a in MOCK_AUTHORS if search.lower() in a["name"].lower()]
+        return {"items": items[skip:skip+limit], "total": len(items)}
+    return {"items": MOCK_AUTHORS.slice(skip, limit), "total": len(MOCK_AUTHORS)}
+
+@app.get("/authors/batch", tags=["Authors"])
+def read_authors_batch(ids: List[str] = IDS_QUERY):
+    """Fetch many authors by id; results follow the request order."""
+    return _batch(MOCK_AUTHORS, ids)
+
+@app.get("/authors/top", tags=["Authors"])
+@cached(("authors",))
+def read_top_authors(limit: int = TOP_LIMIT):
+    """Authors with the most books, from the maintained ``books_count``."""
+    return _top(MOCK_AUTHORS, limit)
 
 @app.get("/authors/{author_id}", tags=["Authors"])
+@conditional(lambda author_id: _row_etag("author", MOCK_AUTHORS, author_id))
+@cached(lambda author_id: (f"author:{author_id}",))
 def read_author(author_id: int):
-    for author in MOCK_AUTHORS:
-        if author["id"] == author_id:
-            return author
-    raise HTTPException(status_code=404, detail="Author not found")
+    author = MOCK_AUTHORS.get(author_id)
+    if author is None:
+        raise HTTPException(status_code=404, detail="Author not found")
+    return author
 
 @app.post("/authors/", tags=["Authors"])
 def create_author(author: dict = Body(...)):
-    new_id = max([a["id"] for a in MOCK_AUTHORS], default=0) + 1
-    author["id"] = new_id
     author["created_at"] = "2024-01-01T00:00:00"
-    MOCK_AUTHORS.append(author)
-    return author
+    return MOCK_AUTHORS.insert(author)
+
+def _import_authors(chunk: list, start: int, result: schemas.BulkImportResult) -> None:
+    for _, author in validate_chunk(chunk, start, schemas.AuthorCreate, result):
+        author = author.dict()
+        author["created_at"] = "2024-01-01T00:00:00"
+        MOCK_AUTHORS.insert(author)
+        result.created += 1
+
+@app.post("/authors/bulk", tags=["Authors"], response_model=schemas.BulkImportResult)
+async def bulk_create_authors(request: Request, format: Optional[str] = None):
+    return await _bulk_import(request, format, _import_authors)
 
 @app.put("/authors/{author_id}", tags=["Authors"])
 def update_author(author_id: int, author: dict = Body(...)):
-    for idx, a in enumerate(MOCK_AUTHORS):
-        if a["id"] == author_id:
-            author["id"] = author_id
-            author["updated_at"] = "2024-01-01T00:00:00"
-            MOCK_AUTHORS[idx] = author
-            return author
-    raise HTTPException(status_code=404, detail="Author not found")
+    author["updated_at"] = "2024-01-01T00:00:00"
+    if MOCK_AUTHORS.replace(author_id, author) is None:
+        raise HTTPException(status_code=404, detail="Author not found")
+    return author
 
 @app.delete("/authors/{author_id}", tags=["Authors"])
 def delete_author(author_id: int):
-    for idx, a in enumerate(MOCK_AUTHORS):
-        if a["id"] == author_id:
-            del MOCK_AUTHORS[idx]
-            return {"message": "Author deleted"}
-    raise HTTPException(status_code=404, detail="Author not found")
+    if MOCK_AUTHORS.delete(author_id) is None:
+        raise HTTPException(status_code=404, detail="Author not found")
+    return {"message": "Author deleted"}
 
 # Categories
 @app.get("/categories/", tags=["Categories"])
-def read_categories(skip: int = 0, limit: int = 100, search: Optional[str] = None):
-    items = MOCK_CATEGORIES
+@conditional(_list_etag("categories", MOCK_CATEGORIES))
+@cached(("categories",))
+def read_categories(skip: int = 0, limit: int = 100, search: Optional[str] = None, cursor: Optional[str] = CURSOR_QUERY):
+    if cursor is not None:
+        predicate = (lambda c: search.lower() in c["name"].lower()) if search else None
+        return _cursor_page(MOCK_CATEGORIES, cursor, limit, predicate)
     if search:
-        items = [c for c in items if search.lower() in c["name"].lower()]
-    return {"items": items[skip:skip+limit], "total": len(items)}
+        items = [c for c in MOCK_CATEGORIES if search.lower() in c["name"].lower()]
+        return {"items": items[skip:skip+limit], "total": len(items)}
+    return {"items": MOCK_CATEGORIES.slice(skip, limit), "total": len(MOCK_CATEGORIES)}
+
+@app.get("/categories/batch", tags=["Categories"])
+def read_categories_batch(ids: List[str] = IDS_QUERY):
+    """Fetch many categories by id; results follow the request order."""
+    return _batch(MOCK_CATEGORIES, ids)
+
+@app.get("/categories/top", tags=["Categories"])
+@cached(("categories",))
+def read_top_categories(limit: int = TOP_LIMIT):
+    """Categories with the most books, from the maintained ``books_count``."""
+    return _top(MOCK_CATEGORIES, limit)
 
 @app.get("/categories/{category_id}", tags=["Categories"])
+@conditional(lambda category_id: _row_etag("category", MOCK_CATEGORIES, category_id))
+@cached(lambda category_id: (f"category:{category_id}",))
 def read_category(category_id: int):
-    for category in MOCK_CATEGORIES:
-        if category["id"] == category_id:
-            return category
-    raise HTTPException(status_code=404, detail="Category not found")
+    category = MOCK_CATEGORIES.get(category_id)
+    if category is None:
+        raise HTTPException(status_code=404, detail="Category not found")
+    return category
 
 @app.post("/categories/", tags=["Categories"])
 def create_category(category: dict = Body(...)):
-    new_id = max([c["id"] for c in MOCK_CATEGORIES], default=0) + 1
-    category["id"] = new_id
     category["created_at"] = "2024-01-01T00:00:00"
-    MOCK_CATEGORIES.append(category)
-    return category
+    return MOCK_CATEGORIES.insert(category)
+
+def _import_categories(chunk: list, start: int, result: schemas.BulkImportResult) -> None:
+    for _, category in validate_chunk(chunk, start, schemas.CategoryCreate, result):
+        category = category.dict()
+        category["created_at"] = "2024-01-01T00:00:00"
+        MOCK_CATEGORIES.insert(category)
+        result.created += 1
+
+@app.post("/categories/bulk", tags=["Categories"], response_model=schemas.BulkImportResult)
+async def bulk_create_categories(request: Request, format: Optional[str] = None):
+    return await _bulk_import(request, format, _import_categories)
 
 @app.put("/categories/{category_id}", tags=["Categories"])
 def update_category(category_id: int, category: dict = Body(...)):
-    for idx, c in enumerate(MOCK_CATEGORIES):
-        if c["id"] == category_id:
-            category["id"] = category_id
-            category["updated_at"] = "2024-01-01T00:00:00"
-            MOCK_CATEGORIES[idx] = category
-            return category
-    raise HTTPException(status_code=404, detail="Category not found")
+    category["updated_at"] = "2024-01-01T00:00:00"
+    if MOCK_CATEGORIES.replace(category_id, category) is None:
+        raise HTTPException(status_code=404, detail="Category not found")
+    return category
 
 @app.delete("/categories/{category_id}", tags=["Categories"])
 def delete_category(category_id: int):
-    for idx, c in enumerate(MOCK_CATEGORIES):
-        if c["id"] == category_id:
-            del MOCK_CATEGORIES[idx]
-            return {"message": "Category deleted"}
-    raise HTTPException(status_code=404, detail="Category not found")
+    if MOCK_CATEGORIES.delete(category_id) is None:
+        raise HTTPException(status_code=404, detail="Category not found")
+    return {"message": "Category deleted"}
 
 # Books
 @app.get("/books/", tags=["Books"])
-def read_books(page: int = Query(1, ge=1), size: int = Query(10, ge=1, le=100), search: Optional[str] = None):
-    items = MOCK_BOOKS
+@conditional(_list_etag("books", MOCK_BOOKS, BOOK_RELATED))
+@cached(book_dependencies())
+def read_books(
+    page: int = Query(1, ge=1),
+    size: int = Query(10, ge=1, le=100),
+    search: Optional[str] = None,
+    author_name: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    in_stock: Optional[bool] = None,
+    cursor: Optional[str] = CURSOR_QUERY,
+    facets: bool = Query(False, description="Include author, category, price and stock counts for the search"),
+):
+    ids = _book_ids(search, author_name, min_price, max_price, in_stock)
+    if cursor is not None:
+        page_data = _cursor_page(MOCK_BOOKS, cursor, size, ids=sorted(ids) if search else ids)
+        page_data["size"] = size
+    else:
+        skip = (page - 1) * size
+        if ids is not None:
+            total = len(ids)
+            items = [MOCK_BOOKS.get(i) for i in ids[skip:skip+size]]
+        else:
+            total = len(MOCK_BOOKS)
+            items = MOCK_BOOKS.slice(skip, size)
+        pages = math.ceil(total / size)
+        page_data = {
+            "items": items,
+            "total": total,
+            "page": page,
+            "size": size,
+            "pages": pages
+        }
+    if facets:
+        # Plain dict so the key-value cache backend can store it as JSON
+        page_data["facets"] = _book_facets(ids).dict()
+    return page_data
+
+def _book_ids(
+    search: Optional[str],
+    author_name: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    in_stock: Optional[bool] = None,
+) -> Optional[List[int]]:
+    """Ids of the matching books, best title match first with a search and
+    in id order without; None when nothing is filtered.
+
+    Price, stock and author filters run over the book columns
+    (``MemoryStore.find_books``), so rows are only built for the page.
+    """
+    ids = None
+    if author_name or min_price is not None or max_price is not None or in_stock is not None:
+        author_ids = None
+        if author_name:
+            author_ids = [a["id"] for a in MOCK_AUTHORS if author_name.lower() in (a.get("name") or "").lower()]
+        ids = store.find_books(min_price=min_price, max_price=max_price, in_stock=in_stock, author_ids=author_ids)
     if search:
-        items = [b for b in items if search.lower() in b["title"].lower()]
-    total = len(items)
-    pages = math.ceil(total / size)
-    skip = (page - 1) * size
-    return {
-        "items": items[skip:skip+size],
-        "total": total,
-        "page": page,
-        "size": size,
-        "pages": pages
-    }
+        ranked = book_index.search(search, fields=("title",))
+        if ids is not None:
+            matches = set(ids)
+            ranked = [i for i in ranked if i in matches]
+        ids = ranked
+    return ids
+
+def _book_facets(ids: Optional[List[int]]) -> schemas.BookFacets:
+    # Counted from the book columns (like ``store.find_books``), so no row is built
+    columns = MOCK_BOOKS.columns(
+        ("author_id", "category_id", "category_ids", "price", "stock_quantity", "stock"), ids
+    )
+    category_ids = (
+        dict.fromkeys(many) if many else ([one] if one is not None else [])
+        for many, one in zip(columns["category_ids"], columns["category_id"])
+    )
+    stocks = [
+        quantity if quantity is not None else stock
+        for quantity, stock in zip(columns["stock_quantity"], columns["stock"])
+    ]
+    return count_facets(
+        columns["author_id"], category_ids, columns["price"], stocks, MOCK_AUTHORS.get, MOCK_CATEGORIES.get
+    )
+
+def _book_matches(book: dict, search: schemas.BookSearch) -> bool:
+    stock = book.get("stock_quantity", book.get("stock")) or 0
+    author = book.get("author") or {}
+    category = book.get("category") or {}
+    price = book.get("price")
+    return (
+        (not search.author_name or search.author_name.lower() in (author.get("name") or "").lower())
+        and (not search.category_name or search.category_name.lower() in (category.get("name") or "").lower())
+        and (search.min_price is None or (price is not None and price >= search.min_price))
+        and (search.max_price is None or (price is not None and price <= search.max_price))
+        and (search.in_stock is None or (stock > 0) == search.in_stock)
+    )
+
+def _export_row(book: dict) -> dict:
+    author = book.get("author") or {}
+    category = book.get("category")
+    return dict(
+        book,
+        stock_quantity=book.get("stock_quantity", book.get("stock")),
+        author_id=book.get("author_id", author.get("id")),
+        author_name=author.get("name"),
+        category_ids=book.get("category_ids") or ([category["id"]] if category else []),
+    )
+
+def _iter_export_rows(search: schemas.BookSearch):
+    # Narrow on the title index and the columns first; without filters the
+    # table is walked in keyset batches, so the export never copies the catalog
+    ids = _book_ids(search.title, search.author_name, search.min_price, search.max_price, search.in_stock)
+    books = MOCK_BOOKS if ids is None else filter(None, map(MOCK_BOOKS.get, sorted(ids)))
+    for book in books:
+        if _book_matches(book, search):
+            yield _export_row(book)
+
+@app.get("/books/export", tags=["Books"])
+def export_books(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    title: Optional[str] = None,
+    author_name: Optional[str] = None,
+    category_name: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    in_stock: Optional[bool] = None,
+):
+    """Stream the whole (optionally filtered) catalog as NDJSON or CSV."""
+    search = schemas.BookSearch(
+        title=title, author_name=author_name, category_name=category_name,
+        min_price=min_price, max_price=max_price, in_stock=in_stock,
+    )
+    return StreamingResponse(
+        render(_iter_export_rows(search), format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="books.{format}"'},
+    )
+
+@app.get("/books/batch", tags=["Books"])
+def read_books_batch(ids: List[str] = IDS_QUERY):
+    """Fetch many books by id; results follow the request order."""
+    return _batch(MOCK_BOOKS, ids)
 
 @app.get("/books/{book_id}", tags=["Books"])
+@conditional(lambda book_id: _row_etag("book", MOCK_BOOKS, book_id, BOOK_RELATED))
+@cached(lambda book_id: book_dependencies(book_id))
 def read_book(book_id: int):
-    for book in MOCK_BOOKS:
-        if book["id"] == book_id:
-            return book
-    raise HTTPException(status_code=404, detail="Book not found")
+    book = MOCK_BOOKS.get(book_id)
+    if book is None:
+        raise HTTPException(status_code=404, detail="Book not found")
+    return book
+
+def _attach_relations(book: dict) -> dict:
+    # Attach author and category objects if ids are provided
+    book["author"] = MOCK_AUTHORS.get(book.get("author_id"))
+    book["category"] = MOCK_CATEGORIES.get(book.get("category_id"))
+    return book
 
 @app.post("/books/", tags=["Books"])
 def create_book(book: dict = Body(...)):
-    new_id = max([b["id"] for b in MOCK_BOOKS], default=0) + 1
-    book["id"] = new_id
-    # Attach author and category objects if ids are provided
-    author_id = book.get("author_id")
-    category_id = book.get("category_id")
-    book["author"] = next((a for a in MOCK_AUTHORS if a["id"] == author_id), None)
-    book["category"] = next((c for c in MOCK_CATEGORIES if c["id"] == category_id), None)
+    _attach_relations(book)
     book["created_at"] = "2024-01-01T00:00:00"
     book["updated_at"] = "2024-01-01T00:00:00"
-    MOCK_BOOKS.append(book)
-    return book
+    return MOCK_BOOKS.insert(book)
+
+def _import_books(chunk: list, start: int, result: schemas.BulkImportResult) -> None:
+    for row, book in validate_chunk(chunk, start, schemas.BookCreate, result):
+        missing = [c for c in book.category_ids or [] if c not in MOCK_CATEGORIES]
+        if book.author_id not in MOCK_AUTHORS:
+            error = f"Author {book.author_id} not found"
+        elif missing:
+            error = f"Categories {missing} not found"
+        else:
+            error = None
+        if error:
+            result.errors.append(schemas.BulkRowError(row=row, error=error))
+            continue
+        book = book.dict()
+        book["category_id"] = book["category_ids"][0] if book["category_ids"] else None
+        _attach_relations(book)
+        book["created_at"] = "2024-01-01T00:00:00"
+        book["updated_at"] = "2024-01-01T00:00:00"
+        MOCK_BOOKS.insert(book)
+        result.created += 1
+
+@app.post("/books/bulk", tags=["Books"], response_model=schemas.BulkImportResult)
+async def bulk_create_books(request: Request, format: Optional[str] = None):
+    """Import books from an NDJSON (default) or CSV body streamed in chunks.
+
+    Rows that fail validation or reference unknown authors/categories are
+    reported in ``errors`` without stopping the import.
+    """
+    return await _bulk_import(request, format, _import_books)
 
 @app.put("/books/{book_id}", tags=["Books"])
 def update_book(book_id: int, book: dict = Body(...)):
-    for idx, b in enumerate(MOCK_BOOKS):
-        if b["id"] == book_id:
-            book["id"] = book_id
-            author_id = book.get("author_id")
-            category_id = book.get("category_id")
-            book["author"] = next((a for a in MOCK_AUTHORS if a["id"] == author_id), None)
-            book["category"] = next((c for c in MOCK_CATEGORIES if c["id"] == category_id), None)
-            book["updated_at"] = "2024-01-01T00:00:00"
-            MOCK_BOOKS[idx] = book
-            return book
-    raise HTTPException(status_code=404, detail="Book not found")
+    if book_id not in MOCK_BOOKS:
+        raise HTTPException(status_code=404, detail="Book not found")
+    _attach_relations(book)
+    book["updated_at"] = "2024-01-01T00:00:00"
+    return MOCK_BOOKS.replace(book_id, book)
 
 @app.delete("/books/{book_id}", tags=["Books"])
 def delete_book(book_id: int):
-    for idx, b in enumerate(MOCK_BOOKS):
-        if b["id"] == book_id:
-            del MOCK_BOOKS[idx]
-            return {"message": "Book deleted"}
-    raise HTTPException(status_code=404, detail="Book not found")
+    if MOCK_BOOKS.delete(book_id) is None:
+        raise HTTPException(status_code=404, detail="Book not found")
+    return {"message": "Book deleted"}
 
 # Search
 @app.get("/search/books/", tags=["Search"])
+@json_response
+@cached(book_dependencies())
 def search_books(q: str = Query(...)):
-    items = [b for b in MOCK_BOOKS if q.lower() in b["title"].lower() or q.lower() in b["description"].lower()]
-    return items
+    return [MOCK_BOOKS.get(i) for i in book_index.search(q)]
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,256 @@
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextvars import ContextVar
+from threading import Lock
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from starlette.responses import Response
+from starlette.routing import Match
+
+from .cache import catalog_cache
+
+# Request instrumentation in the Prometheus text format.
+#
+# MetricsMiddleware times every request and keeps an in-flight gauge; the
+# database cursor hooks (registered per engine in ``database``) add query
+# counts and time to the current request through a context variable, which
+# follows the request into threadpool workers and ``run_sync`` greenlets.
+# Responses carry a ``Server-Timing`` header splitting app time into database
+# time and the rest, so a slow request can be attributed to the DB,
+# serialization/handler work, or queueing (in-flight requests).
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+Labels = Tuple[Tuple[str, str], ...]
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted(labels.items()))
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._lock = Lock()
+
+    @abstractmethod
+    def samples(self) -> List[Tuple[str, Labels, float]]:
+        """(sample name, labels, value) triples, in exposition order."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines += [f"{name}{_format_labels(labels)} {_format_value(value)}" for name, labels, value in self.samples()]
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(_labels(labels), 0.0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, labels, value) for labels, value in sorted(self._values.items())]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Labels, List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _labels(labels)
+        with self._lock:
+            # [bucket counts..., +Inf count, sum]
+            series = self._series.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(_labels(labels))
+        return int(sum(series[:-1])) if series else 0
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for labels, series in sorted(self._series.items()):
+                cumulative = 0.0
+                for bound, count in zip(self.buckets + (float("inf"),), series):
+                    cumulative += count
+                    samples.append((f"{self.name}_bucket", labels + (("le", _format_value(bound)),), cumulative))
+                samples.append((f"{self.name}_count", labels, cumulative))
+                samples.append((f"{self.name}_sum", labels, series[-1]))
+        return samples
+
+
+class Registry:
+    """Metrics plus collectors sampled at scrape time (cache, pools)."""
+
+    def __init__(self):
+        self.metrics: List[Metric] = []
+        self.collectors: List[Callable[[], Iterable[Metric]]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        metrics = list(self.metrics)
+        for collect in self.collectors:
+            metrics.extend(collect())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+registry = Registry()
+REQUESTS = registry.register(Counter("http_requests_total", "HTTP requests by route and status."))
+REQUEST_TIME = registry.register(Histogram("http_request_duration_seconds", "Time from request to response start."))
+IN_FLIGHT = registry.register(Gauge("http_requests_in_flight", "Requests currently being handled."))
+REQUEST_DB_QUERIES = registry.register(Histogram(
+    "http_request_db_queries", "Database queries per request.", buckets=(0, 1, 2, 5, 10, 20, 50, 100),
+))
+REQUEST_DB_TIME = registry.register(Histogram("http_request_db_seconds", "Database time per request."))
+DB_QUERIES = registry.register(Counter("db_queries_total", "Database statements executed."))
+DB_QUERY_TIME = registry.register(Histogram("db_query_duration_seconds", "Database statement execution time."))
+
+
+# Per-request database accounting
+class RequestStats:
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+def record_query(engine_name: str, seconds: float) -> None:
+    DB_QUERIES.inc(engine=engine_name)
+    DB_QUERY_TIME.observe(seconds, engine=engine_name)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += seconds
+
+
+# Connection pools, sampled at scrape time
+_pools: Dict[str, object] = {}
+
+def watch_pool(name: str, engine) -> None:
+    _pools[name] = engine
+
+def _collect_pools() -> Iterable[Metric]:
+    gauges = {
+        "size": Gauge("db_pool_size", "Configured pool size."),
+        "checkedout": Gauge("db_pool_checked_out", "Connections currently checked out."),
+        "overflow": Gauge("db_pool_overflow", "Connections open beyond the pool size."),
+        "checkedin": Gauge("db_pool_checked_in", "Idle connections in the pool."),
+    }
+    for name, engine in list(_pools.items()):
+        for attribute, gauge in gauges.items():
+            method = getattr(engine.pool, attribute, None)
+            if method is not None:
+                gauge.inc(method(), engine=name)
+    return gauges.values()
+
+def _collect_cache() -> Iterable[Metric]:
+    stats = catalog_cache.stats()
+    metrics = []
+    for key in ("hits", "misses", "evictions"):
+        counter = Counter(f"cache_{key}_total", f"Catalog cache {key}.")
+        counter.inc(stats.get(key, 0))
+        metrics.append(counter)
+    for key in ("size", "maxsize"):
+        if key in stats:
+            gauge = Gauge(f"cache_{key}", f"Catalog cache {key}.")
+            gauge.inc(stats[key])
+            metrics.append(gauge)
+    return metrics
+
+registry.collectors += [_collect_cache, _collect_pools]
+
+
+# Middleware
+def _route_path(app, scope) -> str:
+    # Route template, e.g. /books/{book_id}; keeps label cardinality bounded
+    for route in getattr(app, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", "unmatched")
+    return "unmatched"
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        route = _route_path(scope["app"], scope) if "app" in scope else "unmatched"
+        method = scope["method"]
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+        status = 500
+        IN_FLIGHT.inc()
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                elapsed = time.perf_counter() - started
+                REQUEST_TIME.observe(elapsed, method=method, route=route)
+                timing = (
+                    f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.queries} queries", '
+                    f"app;dur={(elapsed - stats.db_seconds) * 1000:.2f}"
+                )
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            IN_FLIGHT.dec()
+            _request_stats.reset(token)
+            REQUESTS.inc(method=method, route=route, status=str(status))
+            REQUEST_DB_QUERIES.observe(stats.queries, route=route)
+            REQUEST_DB_TIME.observe(stats.db_seconds, route=route)
+
+def metrics_response() -> Response:
+    return Response(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,49 @@
+import copy
+
+from .store import MemoryStore
+
+# Seed catalog of the in-memory (mock) mode. books_count on authors and
+# categories is derived from the books by MemoryStore.
+SEED_AUTHORS = [
+    {"id": 1, "name": "Mock Author 1", "biography": "Bio 1", "created_at": "2024-01-01T00:00:00"},
+    {"id": 2, "name": "Mock Author 2", "biography": "Bio 2", "created_at": "2024-01-01T00:00:00"},
+]
+SEED_CATEGORIES = [
+    {"id": 1, "name": "Mock Category 1", "description": "Desc 1", "created_at": "2024-01-01T00:00:00"},
+    {"id": 2, "name": "Mock Category 2", "description": "Desc 2", "created_at": "2024-01-01T00:00:00"},
+]
+SEED_BOOKS = [
+    {
+        "id": 1,
+        "title": "Mock Book 1",
+        "author": SEED_AUTHORS[0],
+        "category": SEED_CATEGORIES[0],
+        "price": 10.99,
+        "stock": 5,
+        "description": "A mock book for testing.",
+        "isbn": "1234567890",
+        "publication_year": 2020,
+        "pages": 200,
+        "created_at": "2024-01-01T00:00:00",
+        "updated_at": "2024-01-01T00:00:00"
+    },
+    {
+        "id": 2,
+        "title": "Mock Book 2",
+        "author": SEED_AUTHORS[1],
+        "category": SEED_CATEGORIES[1],
+        "price": 15.99,
+        "stock": 0,
+        "description": "Another mock book.",
+        "isbn": "0987654321",
+        "publication_year": 2021,
+        "pages": 300,
+        "created_at": "2024-01-01T00:00:00",
+        "updated_at": "2024-01-01T00:00:00"
+    },
+]
+
+def seed_store() -> MemoryStore:
+    """A fresh store holding (copies of) the seed rows."""
+    authors, categories, books = copy.deepcopy((SEED_AUTHORS, SEED_CATEGORIES, SEED_BOOKS))
+    return MemoryStore(authors=authors, categories=categories, books=books)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, Index, Table, DDL, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
@@ -7,8 +7,10 @@ from .database import Base
 book_category = Table(
     'book_category',
     Base.metadata,
-    Column('book_id', Integer, ForeignKey('books.id')),
-    Column('category_id', Integer, ForeignKey('categories.id'))
+    Column('book_id', Integer, ForeignKey('books.id'), primary_key=True),
+    Column('category_id', Integer, ForeignKey('categories.id'), primary_key=True),
+    # The primary key serves book -> categories; this serves the category filter
+    Index('ix_book_category_category_id_book_id', 'category_id', 'book_id'),
 )
 
 class Book(Base):
@@ -24,6 +26,17 @@ class Book(Base):
     author_id = Column(Integer, ForeignKey("authors.id"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Incremented by the ORM on every UPDATE; feeds ETags and optimistic locking
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version}
+    # Composite indexes end in id so filters and keyset pages (sort, id) read in index order
+    __table_args__ = (
+        Index("ix_books_author_id_id", "author_id", "id"),
+        Index("ix_books_price_id", "price", "id"),
+        Index("ix_books_stock_quantity_id", "stock_quantity", "id"),
+        Index("ix_books_title_lower", func.lower(title)),
+    )
     
     # Relationships
     author = relationship("Author", back_populates="books")
@@ -36,8 +49,16 @@ class Author(Base):
     name = Column(String(255), nullable=False, index=True)
     biography = Column(Text)
     email = Column(String(255), unique=True, index=True)
+    # Denormalized count of the author's books, maintained by the book writes in crud
+    books_count = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Incremented by the ORM on every UPDATE; feeds ETags and optimistic locking
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version}
+    # "Top authors" reads this index backwards
+    __table_args__ = (Index("ix_authors_books_count_id", "books_count", "id"),)
     
     # Relationships
     books = relationship("Book", back_populates="author")
@@ -48,8 +69,67 @@ class Category(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False, unique=True, index=True)
     description = Column(Text)
+    # Denormalized count of linked books, maintained by the book writes in crud
+    books_count = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Incremented by the ORM on every UPDATE; feeds ETags and optimistic locking
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version}
+    __table_args__ = (Index("ix_categories_books_count_id", "books_count", "id"),)
     
     # Relationships
-    books = relationship("Book", secondary=book_category, back_populates="categories") 
\ No newline at end of file
+    books = relationship("Book", secondary=book_category, back_populates="categories")
+
+class StockReservation(Base):
+    __tablename__ = "stock_reservations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # pending -> committed | released
+    status = Column(String(16), nullable=False, default="pending", index=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    items = relationship("StockReservationItem", cascade="all, delete-orphan", lazy="selectin")
+
+class StockReservationItem(Base):
+    __tablename__ = "stock_reservation_items"
+
+    reservation_id = Column(Integer, ForeignKey("stock_reservations.id"), primary_key=True)
+    book_id = Column(Integer, ForeignKey("books.id"), primary_key=True)
+    quantity = Column(Integer, nullable=False)
+
+# Full-text search structures, created alongside the books table.
+# SQLite: an external-content FTS5 table kept in sync by triggers.
+BOOKS_FTS_SQLITE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5("
+    "title, description, content='books', content_rowid='id', tokenize='unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS books_fts_ai AFTER INSERT ON books BEGIN "
+    "INSERT INTO books_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS books_fts_ad AFTER DELETE ON books BEGIN "
+    "INSERT INTO books_fts(books_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS books_fts_au AFTER UPDATE OF title, description ON books BEGIN "
+    "INSERT INTO books_fts(books_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO books_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+]
+# PostgreSQL: GIN expression indexes matching search.apply_fulltext.
+BOOKS_FTS_POSTGRESQL = [
+    "CREATE INDEX IF NOT EXISTS ix_books_title_fts ON books "
+    "USING gin (to_tsvector('simple', coalesce(title, '')))",
+    "CREATE INDEX IF NOT EXISTS ix_books_fts ON books "
+    "USING gin (to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(description, '')))",
+    # Trigram index for case-insensitive substring matches (ILIKE '%...%') on title
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_books_title_trgm ON books USING gin (title gin_trgm_ops)",
+]
+
+for _statement in BOOKS_FTS_SQLITE:
+    event.listen(Book.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+for _statement in BOOKS_FTS_POSTGRESQL:
+    event.listen(Book.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+event.listen(
+    Book.__table__, "before_drop",
+    DDL("DROP TABLE IF EXISTS books_fts").execute_if(dialect="sqlite"),
+)
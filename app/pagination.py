@@ -0,0 +1,57 @@
+import base64
+import json
+from typing import Any, List, Optional, Tuple
+
+# Opaque keyset cursors: the sort key of the last row served (plus its id as a
+# tie-breaker), JSON-encoded and base64url-wrapped so clients treat it as a token.
+
+def encode_cursor(*key: Any) -> str:
+    raw = json.dumps(list(key), separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[Any, ...]]:
+    """Decode a cursor; an empty cursor means "start from the beginning".
+
+    Raises ``ValueError`` if the cursor was not produced by ``encode_cursor``.
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(raw)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(key, list) or not key or not isinstance(key[-1], int):
+        raise ValueError("Invalid cursor")
+    return tuple(key)
+
+def next_cursor(row: Any, limit: int, count: int, sort: str = "id") -> Optional[str]:
+    """Cursor for the page after ``row`` (the last row served), or None at the end."""
+    if row is None or count < limit:
+        return None
+    get = row.get if isinstance(row, dict) else lambda name: getattr(row, name)
+    if sort == "id":
+        return encode_cursor(get("id"))
+    return encode_cursor(get(sort), get("id"))
+
+# Batch reads: ids arrive as repeated and/or comma-separated query values
+MAX_BATCH_IDS = 500
+
+def parse_ids(values: List[str], limit: int = MAX_BATCH_IDS) -> List[int]:
+    """Parse ``ids=1,2&ids=3`` into unique ids in request order.
+
+    Raises ``ValueError`` for non-integer ids or more than ``limit`` ids.
+    """
+    ids = {}
+    for value in values:
+        for part in value.split(","):
+            part = part.strip()
+            if not part:
+                continue
+            try:
+                ids[int(part)] = None
+            except ValueError:
+                raise ValueError(f"Invalid id: {part}") from None
+    if len(ids) > limit:
+        raise ValueError(f"At most {limit} ids per request")
+    return list(ids)
@@ -0,0 +1,196 @@
+import logging
+import os
+import time
+import uuid
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+from threading import Lock
+from typing import Any, List, Optional
+
+from fastapi import APIRouter, HTTPException
+
+# Opt-in SQL profiling.
+#
+# - Slow-query log (SLOW_QUERY_MS): statements slower than the threshold are
+#   logged to ``app.slow_queries`` with their EXPLAIN / EXPLAIN QUERY PLAN.
+# - Request profiles (QUERY_PROFILING=1): a request sent with the
+#   ``X-Debug-Profile: 1`` header records every statement with its timing and
+#   flags N+1 patterns (the same SQL run repeatedly with different
+#   parameters). The response carries ``X-Query-Profile: <id>`` and the
+#   profile is kept for GET /debug/profiles/<id>.
+#
+# Statements arrive from the cursor hooks in ``database.instrument_engine``.
+
+logger = logging.getLogger("app.slow_queries")
+
+PROFILE_HEADER = b"x-debug-profile"
+
+def _env_int(name: str) -> Optional[int]:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else None
+
+
+class ProfilingSettings:
+    def __init__(self):
+        self.enabled = os.getenv("QUERY_PROFILING", "").lower() in ("1", "true", "yes", "on")
+        self.slow_query_ms = _env_int("SLOW_QUERY_MS")
+        self.n_plus_one_threshold = _env_int("N_PLUS_ONE_THRESHOLD") or 5
+        self.max_profiles = _env_int("QUERY_PROFILE_HISTORY") or 100
+
+settings = ProfilingSettings()
+
+
+class QueryProfile:
+    def __init__(self, method: str, path: str):
+        self.id = uuid.uuid4().hex[:16]
+        self.method = method
+        self.path = path
+        self.started = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+        self.status: Optional[int] = None
+        self.queries: List[dict] = []
+
+    def add(self, entry: dict) -> None:
+        self.queries.append(entry)
+
+    def n_plus_one(self) -> List[dict]:
+        counts = Counter(query["statement"] for query in self.queries if not query["executemany"])
+        suspects = []
+        for statement, count in counts.most_common():
+            if count < settings.n_plus_one_threshold:
+                break
+            params = {query["parameters"] for query in self.queries if query["statement"] == statement}
+            if len(params) > 1:
+                suspects.append({"statement": statement, "count": count, "distinct_parameters": len(params)})
+        return suspects
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "duration_ms": self.duration_ms,
+            "query_count": len(self.queries),
+            "db_ms": round(sum(query["duration_ms"] for query in self.queries), 3),
+            "n_plus_one": self.n_plus_one(),
+            "queries": self.queries,
+        }
+
+
+_current: ContextVar[Optional[QueryProfile]] = ContextVar("query_profile", default=None)
+_profiles: "OrderedDict[str, QueryProfile]" = OrderedDict()
+_profiles_lock = Lock()
+
+def _store(profile: QueryProfile) -> None:
+    with _profiles_lock:
+        _profiles[profile.id] = profile
+        while len(_profiles) > settings.max_profiles:
+            _profiles.popitem(last=False)
+
+def get_profile(profile_id: str) -> Optional[QueryProfile]:
+    return _profiles.get(profile_id)
+
+
+# EXPLAIN capture
+EXPLAIN_PREFIX = {"sqlite": "EXPLAIN QUERY PLAN ", "postgresql": "EXPLAIN ", "mysql": "EXPLAIN "}
+
+def explain(conn, statement: str, parameters: Any) -> Optional[List[str]]:
+    """Plan for a SELECT, run on the raw DBAPI connection so no events fire."""
+    prefix = EXPLAIN_PREFIX.get(conn.dialect.name)
+    if prefix is None or not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        return None
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters or ())
+        return [" ".join(str(column) for column in row) for row in cursor.fetchall()]
+    except Exception as exc:  # the plan is diagnostic only
+        return [f"EXPLAIN failed: {exc}"]
+    finally:
+        cursor.close()
+
+def _format_parameters(parameters: Any) -> str:
+    text = repr(parameters)
+    return text if len(text) <= 200 else text[:197] + "..."
+
+def observe_statement(conn, statement: str, parameters: Any, executemany: bool, seconds: float) -> None:
+    """Called for every executed statement; cheap when profiling is off."""
+    profile = _current.get()
+    slow = settings.slow_query_ms is not None and seconds * 1000 >= settings.slow_query_ms
+    if profile is None and not slow:
+        return
+    plan = explain(conn, statement, parameters) if slow and not executemany else None
+    if slow:
+        logger.warning(
+            "Slow query (%.1f ms): %s\nparameters: %s%s",
+            seconds * 1000, statement, _format_parameters(parameters),
+            "".join(f"\n  {line}" for line in plan or []),
+        )
+    if profile is not None:
+        profile.add({
+            "statement": statement,
+            "parameters": _format_parameters(parameters),
+            "executemany": executemany,
+            "duration_ms": round(seconds * 1000, 3),
+            "slow": slow,
+            "plan": plan,
+        })
+
+
+# Middleware and endpoints
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if not settings.enabled or scope["type"] != "http" or not _wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+        profile = QueryProfile(scope["method"], scope["path"])
+        token = _current.set(profile)
+
+        async def send_with_profile(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-query-profile", profile.id.encode()),
+                    (b"x-query-count", str(len(profile.queries)).encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            _current.reset(token)
+            profile.duration_ms = round((time.perf_counter() - profile.started) * 1000, 3)
+            _store(profile)
+            suspects = profile.n_plus_one()
+            if suspects:
+                logger.warning("Possible N+1 in %s %s: %s", profile.method, profile.path, suspects)
+
+def _wants_profile(scope) -> bool:
+    return any(name == PROFILE_HEADER and value not in (b"", b"0") for name, value in scope["headers"])
+
+router = APIRouter(prefix="/debug/profiles", tags=["Debug"], include_in_schema=False)
+
+def _require_enabled() -> None:
+    if not settings.enabled:
+        raise HTTPException(status_code=404, detail="Query profiling is disabled")
+
+@router.get("/")
+def list_profiles(limit: int = 20):
+    _require_enabled()
+    with _profiles_lock:
+        recent = list(_profiles.values())[-limit:]
+    return [
+        {key: value for key, value in profile.to_dict().items() if key != "queries"}
+        for profile in reversed(recent)
+    ]
+
+@router.get("/{profile_id}")
+def read_profile(profile_id: str):
+    _require_enabled()
+    profile = get_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile.to_dict()
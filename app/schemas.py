@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import List, Optional
 from datetime import datetime
 
@@ -54,16 +54,20 @@ class BookUpdate(BaseModel):
 # Response schemas
 class AuthorResponse(AuthorBase):
     id: int
+    books_count: int = 0
     created_at: datetime
     updated_at: Optional[datetime] = None
+    version: int = 1
 
     class Config:
         from_attributes = True
 
 class CategoryResponse(CategoryBase):
     id: int
+    books_count: int = 0
     created_at: datetime
     updated_at: Optional[datetime] = None
+    version: int = 1
 
     class Config:
         from_attributes = True
@@ -73,12 +77,23 @@ class BookResponse(BookBase):
     author_id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
+    version: int = 1
     author: AuthorResponse
     categories: List[CategoryResponse] = []
 
     class Config:
         from_attributes = True
 
+class BookSummary(BaseModel):
+    id: int
+    title: str
+    price: float
+    stock_quantity: int
+    author_name: str
+
+    class Config:
+        from_attributes = True
+
 # Search and filter schemas
 class BookSearch(BaseModel):
     title: Optional[str] = None
@@ -88,14 +103,83 @@ class BookSearch(BaseModel):
     max_price: Optional[float] = None
     in_stock: Optional[bool] = None
 
+# Stock reservation schemas
+class ReservationItem(BaseModel):
+    book_id: int
+    quantity: int = Field(..., gt=0)
+    # Reserve only if the book is still at this version (optimistic check)
+    expected_version: Optional[int] = None
+
+class ReservationCreate(BaseModel):
+    items: List[ReservationItem] = Field(..., min_length=1)
+    ttl_seconds: int = Field(900, gt=0)
+
+class ReservationItemResponse(BaseModel):
+    book_id: int
+    quantity: int
+
+    class Config:
+        from_attributes = True
+
+class ReservationResponse(BaseModel):
+    id: int
+    status: str
+    expires_at: datetime
+    created_at: datetime
+    items: List[ReservationItemResponse] = []
+
+    class Config:
+        from_attributes = True
+
+# Bulk import schemas
+class BulkRowError(BaseModel):
+    row: int
+    error: str
+
+class BulkImportResult(BaseModel):
+    created: int = 0
+    errors: List[BulkRowError] = []
+
 # Pagination schema
 class PaginationParams(BaseModel):
     page: int = 1
     size: int = 10
 
+# Batch read schemas: items in request order, unknown ids in ``missing``
+class AuthorBatch(BaseModel):
+    items: List[AuthorResponse]
+    missing: List[int] = []
+
+class CategoryBatch(BaseModel):
+    items: List[CategoryResponse]
+    missing: List[int] = []
+
+class BookBatch(BaseModel):
+    items: List[BookResponse]
+    missing: List[int] = []
+
+# Facet schemas
+class FacetValue(BaseModel):
+    id: int
+    name: Optional[str] = None
+    count: int
+
+class PriceBucket(BaseModel):
+    min: float
+    max: Optional[float] = None
+    count: int
+
+class BookFacets(BaseModel):
+    authors: List[FacetValue] = []
+    categories: List[FacetValue] = []
+    price: List[PriceBucket] = []
+    in_stock: int = 0
+    out_of_stock: int = 0
+
 class PaginatedResponse(BaseModel):
     items: List[BookResponse]
     total: int
     page: int
     size: int
-    pages: int 
\ No newline at end of file
+    pages: int
+    facets: Optional[BookFacets] = None
@@ -0,0 +1,152 @@
+import math
+import re
+from bisect import bisect_left, insort
+from collections import defaultdict
+from threading import RLock
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import column, false, func, literal_column, or_, select, table
+from sqlalchemy.orm import Query
+
+from . import models
+
+_TOKEN_RE = re.compile(r"\w+")
+
+def tokenize(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    return _TOKEN_RE.findall(text.lower())
+
+
+class InvertedIndex:
+    """Tokenized full-text index over row dicts for mock mode.
+
+    Every query term is matched as a prefix against a sorted vocabulary, all
+    terms must match, and results are ranked by field-weighted tf-idf.
+    """
+
+    def __init__(self, fields: Dict[str, float]):
+        self.fields = fields
+        self._postings: Dict[str, Dict[int, Dict[str, int]]] = {}
+        self._terms: List[str] = []
+        self._doc_terms: Dict[int, set] = {}
+        self._lock = RLock()
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def __call__(self, old: Optional[dict], new: Optional[dict]) -> None:
+        # Table watcher: keep the index in step with inserts/updates/deletes
+        if old is not None:
+            self.remove(old["id"])
+        if new is not None:
+            self.add(new["id"], new)
+
+    def add(self, doc_id: int, doc: dict) -> None:
+        with self._lock:
+            self.remove(doc_id)
+            terms = set()
+            for field in self.fields:
+                for term in tokenize(doc.get(field)):
+                    postings = self._postings.get(term)
+                    if postings is None:
+                        postings = self._postings[term] = {}
+                        insort(self._terms, term)
+                    counts = postings.setdefault(doc_id, {})
+                    counts[field] = counts.get(field, 0) + 1
+                    terms.add(term)
+            self._doc_terms[doc_id] = terms
+
+    def remove(self, doc_id: int) -> None:
+        with self._lock:
+            for term in self._doc_terms.pop(doc_id, ()):
+                postings = self._postings[term]
+                del postings[doc_id]
+                if not postings:
+                    del self._postings[term]
+                    del self._terms[bisect_left(self._terms, term)]
+
+    def _expand(self, prefix: str) -> Iterable[str]:
+        idx = bisect_left(self._terms, prefix)
+        while idx < len(self._terms) and self._terms[idx].startswith(prefix):
+            yield self._terms[idx]
+            idx += 1
+
+    def search(self, q: str, fields: Optional[Iterable[str]] = None) -> List[int]:
+        """Return matching doc ids, best match first."""
+        with self._lock:
+            return self._search(q, fields)
+
+    def _search(self, q: str, fields: Optional[Iterable[str]]) -> List[int]:
+        weights = {f: self.fields[f] for f in (fields or self.fields)}
+        total_docs = len(self._doc_terms) or 1
+        scores: Optional[Dict[int, float]] = None
+        for token in dict.fromkeys(tokenize(q)):
+            token_scores: Dict[int, float] = defaultdict(float)
+            for term in self._expand(token):
+                postings = self._postings[term]
+                idf = math.log(1 + total_docs / len(postings))
+                for doc_id, counts in postings.items():
+                    if scores is not None and doc_id not in scores:
+                        continue
+                    score = sum(weights[f] * n for f, n in counts.items() if f in weights)
+                    if score:
+                        token_scores[doc_id] += score * idf
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {d: s + token_scores[d] for d, s in scores.items() if d in token_scores}
+            if not scores:
+                return []
+        if not scores:
+            return []
+        return [d for d, _ in sorted(scores.items(), key=lambda item: (-item[1], item[0]))]
+
+
+# Database full-text search (SQLite FTS5 / PostgreSQL tsvector)
+_books_fts = table("books_fts", column("rowid"))
+
+def _fts5_expression(tokens: List[str], columns: Optional[Tuple[str, ...]]) -> str:
+    expr = " AND ".join(f'"{t}"*' for t in tokens)
+    if columns:
+        expr = "{%s} : (%s)" % (" ".join(columns), expr)
+    return expr
+
+def _ts_vector(columns: Tuple[str, ...]):
+    document = func.coalesce(getattr(models.Book, columns[0]), "")
+    for name in columns[1:]:
+        document = document.op("||")(" ").op("||")(func.coalesce(getattr(models.Book, name), ""))
+    return func.to_tsvector(literal_column("'simple'"), document)
+
+def apply_fulltext(
+    query: Query,
+    q: str,
+    columns: Tuple[str, ...] = ("title", "description"),
+    rank: bool = True,
+) -> Query:
+    """Restrict a Book query to full-text matches of ``q``, best match first.
+
+    Uses the FTS5 table on SQLite and the expression GIN indexes on
+    PostgreSQL (see ``models``); other dialects fall back to ``ilike``.
+    A ``q`` without any token matches nothing, as in ``InvertedIndex.search``.
+    """
+    tokens = list(dict.fromkeys(tokenize(q)))
+    if not tokens:
+        return query.filter(false())
+    dialect = query.session.get_bind().dialect.name
+    if dialect == "sqlite":
+        matches = (
+            select(_books_fts.c.rowid, literal_column("bm25(books_fts)").label("score"))
+            .where(literal_column("books_fts").op("MATCH")(_fts5_expression(tokens, columns)))
+            .subquery()
+        )
+        query = query.join(matches, matches.c.rowid == models.Book.id)
+        return query.order_by(matches.c.score, models.Book.id) if rank else query
+    if dialect == "postgresql":
+        vector = _ts_vector(columns)
+        ts_query = func.to_tsquery(literal_column("'simple'"), " & ".join(f"{t}:*" for t in tokens))
+        query = query.filter(vector.op("@@")(ts_query))
+        return query.order_by(func.ts_rank(vector, ts_query).desc(), models.Book.id) if rank else query
+    for token in tokens:
+        query = query.filter(or_(*[getattr(models.Book, c).ilike(f"%{token}%") for c in columns]))
+    return query
@@ -1,7 +1,10 @@
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from . import crud, models, schemas
-from .database import SessionLocal
+from .database import SessionLocal, engine
+from .generate import CatalogGenerator, write_database
 from datetime import datetime
+import os
 
 def seed_database():
     db = SessionLocal()
@@ -163,5 +166,26 @@ def seed_database():
     finally:
         db.close()
 
+def seed_synthetic(books: int, seed: int = 0) -> dict:
+    """Bulk-load a generated catalog of ``books`` books on top of existing data."""
+    print(f"Generating {books} synthetic books (seed {seed})...")
+    counts = write_database(engine, CatalogGenerator(books, seed=seed))
+    print("Created " + ", ".join(f"{count} {name}" for name, count in counts.items()))
+    return counts
+
+def seed_synthetic_from_env() -> None:
+    # e.g. SEED_SYNTHETIC_BOOKS=1000000 for a production-sized local catalog
+    books = int(os.getenv("SEED_SYNTHETIC_BOOKS") or 0)
+    if not books:
+        return
+    # Runs on every start: generate once, not another catalog per restart
+    with engine.connect() as connection:
+        existing = connection.scalar(select(func.count()).select_from(models.Book))
+    if existing >= books:
+        print(f"Database already holds {existing} books. Skipping synthetic seed...")
+        return
+    seed_synthetic(books, int(os.getenv("SEED_SYNTHETIC_SEED") or 0))
+
 if __name__ == "__main__":
-    seed_database() 
\ No newline at end of file
+    seed_database()
+    seed_synthetic_from_env() 
\ No newline at end of file
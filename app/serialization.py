@@ -0,0 +1,67 @@
+import json
+from functools import wraps
+from typing import Any, Callable, Union
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib encoder
+    orjson = None
+
+# Fast response serialization for list endpoints.
+#
+# FastAPI's default path validates the returned value against the response
+# model, converts it with jsonable_encoder (a recursive Python walk) and then
+# runs json.dumps. The helpers here serialize in one step instead: dicts go
+# straight to orjson, and ORM rows are converted and dumped by a pre-built
+# pydantic TypeAdapter in Rust.
+
+def _default(value: Any) -> Any:
+    # Anything orjson does not handle natively (pydantic models, Decimal, ...)
+    return jsonable_encoder(value)
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+def loads(data: Union[bytes, memoryview]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(bytes(data) if isinstance(data, memoryview) else data)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when it is installed."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def json_response(func: Callable) -> Callable:
+    """Return the endpoint's (already JSON-shaped) result as a FastJSONResponse.
+
+    Returning a Response makes FastAPI skip its own encoding of the value.
+    """
+    @wraps(func)
+    def wrapper(**kwargs):
+        return FastJSONResponse(func(**kwargs))
+    return wrapper
+
+def model_response(adapter: TypeAdapter, value: Any, status_code: int = 200) -> Response:
+    """Serialize ``value`` (ORM rows or dicts of them) through a reusable adapter.
+
+    One ``validate_python`` reads the attributes and one ``dump_json`` writes
+    the bytes, replacing FastAPI's validate/serialize/encode/dumps sequence.
+    """
+    body = adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+    return Response(body, status_code=status_code, media_type="application/json")
+
+def model_data(adapter: TypeAdapter, value: Any) -> Any:
+    """``value`` validated through ``adapter`` and dumped to JSON-shaped data,
+    for results that are cached or wrapped later (see ``conditional``)."""
+    return adapter.dump_python(adapter.validate_python(value, from_attributes=True), mode="json")
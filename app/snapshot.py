@@ -0,0 +1,198 @@
+import mmap
+import os
+import struct
+import sys
+import uuid
+from array import array
+from contextlib import nullcontext
+from typing import Callable, Dict, List, Optional, Tuple
+
+from . import journal as journals
+from .journal import Journal
+from .serialization import dumps, loads
+from .store import MemoryStore
+
+# Snapshot persistence for the in-memory store.
+#
+# A snapshot holds the whole store plus the journal position it covers; the
+# journal next to it holds every write since. Starting up maps the snapshot,
+# bulk-loads the tables (no per-row inserts or watcher calls) and replays
+# only the journal tail, so start time follows the snapshot size rather than
+# the write history. It still grows linearly with the catalog: every row is
+# rebuilt as a dict, since the store serves dicts. Row versions and table
+# revisions are part of the snapshot, so ETags stay valid across restarts.
+#
+# Layout: a fixed header, then one section per column, column-major and
+# 8-byte aligned, then a JSON directory of the sections. Integer and float
+# columns are raw native-endian arrays, other columns JSON lists (the
+# journal's encoding; nothing in the file is unpickled). A column some rows
+# lack also gets a "present" section, one byte per row.
+
+MAGIC = b"BSSNAP02"
+# magic, snapshot id, journal id, journal offset, directory offset, directory length
+HEADER = struct.Struct("<8s16s16sQQQ")
+NO_JOURNAL = bytes(16)
+VERSION_COLUMN = "_version"
+ARRAY_TYPES = ((int, "q"), (float, "d"))
+
+SNAPSHOT_FILE = "catalog.snapshot"
+JOURNAL_FILE = "catalog.journal"
+
+
+def _encode_column(values: List) -> Tuple[str, Optional[str], bytes]:
+    for kind, typecode in ARRAY_TYPES:
+        if all(type(value) is kind for value in values):
+            try:
+                return "array", typecode, array(typecode, values).tobytes()
+            except OverflowError:
+                break
+    return "json", None, dumps(values)
+
+def _capture(store: MemoryStore, name: str) -> dict:
+    # Copies the values out, so rows may change once the lock is released
+    rows, versions, revision, next_id = store.tables[name].state()
+    rows = [store.encode(name, row) for row in rows]
+    names = list(dict.fromkeys(key for row in rows for key in row))
+    columns, present = {}, {}
+    for key in names:
+        columns[key] = [row.get(key) for row in rows]
+        if not all(key in row for row in rows):
+            present[key] = bytes(key in row for row in rows)
+    columns[VERSION_COLUMN] = versions
+    return {"rows": len(rows), "revision": revision, "next_id": next_id, "columns": columns, "present": present}
+
+def write_snapshot(store: MemoryStore, path: str, journal: Optional[Journal] = None) -> str:
+    """Write ``store`` to ``path`` atomically and return the snapshot id.
+
+    With a journal, the state is captured under its lock, caught up, and the
+    snapshot records the journal position it covers.
+    """
+    with journal.locked() if journal is not None else nullcontext():
+        tables = {name: _capture(store, name) for name in store.tables}
+        journal_id = bytes.fromhex(journal.id) if journal is not None else NO_JOURNAL
+        journal_offset = journal.offset if journal is not None else 0
+
+    snapshot_id = uuid.uuid4().hex
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(bytes(HEADER.size))
+        directory = {"byteorder": sys.byteorder, "tables": {}}
+        for name, table in tables.items():
+            sections = []
+            present = table.pop("present")
+            for column, values in table.pop("columns").items():
+                encoded = [_encode_column(values)]
+                if column in present:
+                    encoded.append(("present", "B", present[column]))
+                for kind, typecode, data in encoded:
+                    file.write(bytes(-file.tell() % 8))
+                    sections.append((column, kind, typecode, file.tell(), len(data)))
+                    file.write(data)
+            directory["tables"][name] = dict(table, columns=sections)
+        data = dumps(directory)
+        directory_offset = file.tell()
+        file.write(data)
+        file.seek(0)
+        file.write(HEADER.pack(
+            MAGIC, bytes.fromhex(snapshot_id), journal_id, journal_offset, directory_offset, len(data),
+        ))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+    return snapshot_id
+
+
+class Snapshot:
+    """A snapshot file, memory-mapped; sections are decoded on demand."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        magic, snapshot_id, journal_id, journal_offset, directory_offset, directory_length = (
+            HEADER.unpack_from(self._view)
+        )
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a store snapshot")
+        directory = loads(self._view[directory_offset:directory_offset + directory_length])
+        if directory["byteorder"] != sys.byteorder:
+            self.close()
+            raise ValueError(f"{path} was written on a {directory['byteorder']}-endian machine")
+        self.id = snapshot_id.hex()
+        self.journal_id = journal_id.hex() if journal_id != NO_JOURNAL else None
+        self.journal_offset = journal_offset
+        self.tables: Dict[str, dict] = directory["tables"]
+
+    def column(self, table: str, name: str, kinds: Tuple[str, ...] = ("array", "json")) -> list:
+        for column, kind, typecode, offset, length in self.tables[table]["columns"]:
+            if column == name and kind in kinds:
+                section = self._view[offset:offset + length]
+                return section.cast(typecode).tolist() if kind != "json" else loads(section)
+        raise KeyError(name)
+
+    def table(self, name: str) -> Tuple[List[dict], List[int], int, int]:
+        """Rows, versions, revision and next id of one table (see ``Table.load``)."""
+        info = self.tables[name]
+        names = [
+            column for column, kind, *_ in info["columns"]
+            if column != VERSION_COLUMN and kind != "present"
+        ]
+        columns = [self.column(name, column) for column in names]
+        rows = [dict(zip(names, values)) for values in zip(*columns)]
+        for column, kind, *_ in info["columns"]:
+            if kind == "present":
+                for row, present in zip(rows, self.column(name, column, ("present",))):
+                    if not present:
+                        del row[column]
+        return rows, self.column(name, VERSION_COLUMN), info["revision"], info["next_id"]
+
+    def restore(self, store: MemoryStore) -> None:
+        store.restore({name: self.table(name) for name in store.tables})
+
+    def close(self) -> None:
+        self._view.release()
+        self._map.close()
+
+
+# Data directory: catalog.snapshot plus catalog.journal
+def journal_path(data_dir: str) -> str:
+    return os.path.join(data_dir, JOURNAL_FILE)
+
+def open_store(data_dir: str, seed: Callable[[], MemoryStore]) -> Tuple[MemoryStore, Optional[Snapshot]]:
+    """The store as of the last snapshot in ``data_dir``, or ``seed()`` without one.
+
+    Pass the returned snapshot to ``MemoryStore.share`` with ``journal_path``
+    to replay the writes made since.
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, SNAPSHOT_FILE)
+    if not os.path.exists(path):
+        return seed(), None
+    snapshot = Snapshot(path)
+    store = MemoryStore()
+    try:
+        snapshot.restore(store)
+    finally:
+        snapshot.close()
+    return store, snapshot
+
+def compact(data_dir: str, seed: Callable[[], MemoryStore]) -> Optional[str]:
+    """Fold the journal into a new snapshot and start an empty journal.
+
+    Only safe while no other process has the journal open: run.py calls it
+    before starting the workers. Returns the new snapshot id, or None when
+    the journal held nothing new.
+    """
+    store, snapshot = open_store(data_dir, seed)
+    journal = store.share(journal_path(data_dir), snapshot)
+    try:
+        if snapshot is not None and journal.records == 0:
+            return None
+        snapshot_id = write_snapshot(store, os.path.join(data_dir, SNAPSHOT_FILE), journal)
+    finally:
+        journal.close()
+    # A crash before this point leaves the old journal, which the new
+    # snapshot records as covered; after it, the new journal continues it
+    journals.create(journal_path(data_dir), base=snapshot_id)
+    return snapshot_id
@@ -0,0 +1,720 @@
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from functools import reduce
+from itertools import compress, islice, repeat
+from operator import and_, ge, gt, le
+from threading import RLock, local
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from .journal import Journal
+
+# Called as watcher(old_row, new_row); old is None on insert, new on delete
+Watcher = Callable[[Optional[dict], Optional[dict]], None]
+
+# Writes made by watchers, or replayed from a journal, are derived and are
+# not journaled themselves; this tracks that per thread
+_derived = local()
+
+@contextmanager
+def derived_writes():
+    _derived.depth = getattr(_derived, "depth", 0) + 1
+    try:
+        yield
+    finally:
+        _derived.depth -= 1
+
+
+class Table:
+    """In-memory collection of row dicts indexed by primary key.
+
+    Rows live in a dict keyed by ``id`` so lookups, replacements and deletes
+    are O(1), and ids come from a monotonic counter instead of ``max(id)``.
+    Dict insertion order keeps listings in creation order, and an id-sorted
+    list (with lazily compacted tombstones) serves keyset pages. Secondary
+    structures (search indexes, caches) subscribe to changes with ``watch``.
+    """
+
+    def __init__(self, rows: Iterable[dict] = ()):
+        self._rows: Dict[int, dict] = {}
+        self._order: List[int] = []
+        self._versions: Dict[int, int] = {}
+        self._next_id = 1
+        # Bumped on every write; identifies the state of the whole table
+        self.revision = 0
+        self._lock = RLock()
+        self._watchers: List[Watcher] = []
+        # Set by MemoryStore.share(): writes are serialized and logged through it
+        self.name: Optional[str] = None
+        self.journal = None
+        for row in rows:
+            self.insert(row, row_id=row.get("id"))
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(self.rows())
+
+    def __contains__(self, row_id: int) -> bool:
+        return row_id in self._rows
+
+    def watch(self, watcher: Watcher) -> Watcher:
+        with self._lock:
+            for row in self:
+                watcher(None, row)
+            self._watchers.append(watcher)
+        return watcher
+
+    def version(self, row_id: int) -> Optional[int]:
+        """Per-row version, starting at 1 and bumped on every replace or update."""
+        return self._versions.get(row_id)
+
+    def _notify(self, old: Optional[dict], new: Optional[dict]) -> None:
+        self.revision += 1
+        with derived_writes():
+            for watcher in self._watchers:
+                watcher(old, new)
+
+    def _journaled(self) -> bool:
+        return self.journal is not None and not getattr(_derived, "depth", 0)
+
+    def _write_lock(self):
+        # Journaled writes first take the journal's lock and catch up with
+        # the other processes, so ids and versions are allocated on the latest state
+        return self.journal.locked() if self._journaled() else nullcontext()
+
+    def _record(self, op: str, row_id: int, row: Optional[dict]) -> None:
+        if self._journaled():
+            self.journal.append(self.name, op, row_id, row)
+
+    def rows(self) -> List[dict]:
+        with self._lock:
+            return list(self._rows.values())
+
+    def get(self, row_id: Optional[int]) -> Optional[dict]:
+        return self._rows.get(row_id)
+
+    def next_id(self) -> int:
+        with self._lock:
+            row_id = self._next_id
+            self._next_id += 1
+            return row_id
+
+    def insert(self, row: dict, row_id: Optional[int] = None) -> dict:
+        with self._write_lock(), self._lock:
+            if row_id is None:
+                row_id = self.next_id()
+            elif row_id >= self._next_id:
+                self._next_id = row_id + 1
+            if not self._order or row_id > self._order[-1]:
+                self._order.append(row_id)
+            else:
+                idx = bisect_left(self._order, row_id)
+                if self._order[idx] != row_id:
+                    self._order.insert(idx, row_id)
+            row["id"] = row_id
+            self._rows[row_id] = row
+            self._versions[row_id] = 1
+            self._record("insert", row_id, row)
+            self._notify(None, row)
+            return row
+
+    def replace(self, row_id: int, row: dict) -> Optional[dict]:
+        with self._write_lock(), self._lock:
+            old = self._rows.get(row_id)
+            if old is None:
+                return None
+            row["id"] = row_id
+            self._rows[row_id] = row
+            self._versions[row_id] += 1
+            self._record("replace", row_id, row)
+            self._notify(old, row)
+            return row
+
+    def update(self, row_id: int, **fields) -> Optional[dict]:
+        """Set ``fields`` on the stored row in place (embedded references see it too)."""
+        with self._write_lock(), self._lock:
+            row = self._rows.get(row_id)
+            if row is None:
+                return None
+            old = dict(row)
+            row.update(fields)
+            self._versions[row_id] += 1
+            self._record("update", row_id, fields)
+            self._notify(old, row)
+            return row
+
+    def delete(self, row_id: int) -> Optional[dict]:
+        with self._write_lock(), self._lock:
+            old = self._rows.pop(row_id, None)
+            if old is not None:
+                del self._versions[row_id]
+                if len(self._order) > 2 * len(self._rows) + 64:
+                    self._order = [i for i in self._order if i in self._rows]
+                self._record("delete", row_id, None)
+                self._notify(old, None)
+            return old
+
+    def state(self) -> Tuple[List[dict], List[int], int, int]:
+        """Rows in id order with their versions, the revision and the next id."""
+        with self._lock:
+            ids = sorted(self._rows)
+            return [self._rows[i] for i in ids], [self._versions[i] for i in ids], self.revision, self._next_id
+
+    def load(self, rows: List[dict], versions: Iterable[int], revision: int, next_id: int) -> None:
+        """Replace the contents wholesale (the inverse of ``state``).
+
+        No watcher is called; load before registering watchers, which then
+        replay the loaded rows.
+        """
+        with self._lock:
+            self._rows = {row["id"]: row for row in rows}
+            self._order = sorted(self._rows)
+            self._versions = dict(zip((row["id"] for row in rows), versions))
+            self.revision = revision
+            self._next_id = next_id
+
+    def slice(self, skip: int = 0, limit: int = 100) -> List[dict]:
+        with self._lock:
+            return list(islice(self._rows.values(), skip, skip + limit))
+
+    def after(
+        self,
+        last_id: Optional[int],
+        limit: int = 100,
+        predicate: Optional[Callable[[dict], bool]] = None,
+    ) -> List[dict]:
+        """Return up to ``limit`` rows with ids greater than ``last_id``."""
+        with self._lock:
+            start = 0 if last_id is None else bisect_right(self._order, last_id)
+            page = []
+            for row_id in islice(self._order, start, None):
+                row = self._rows.get(row_id)
+                if row is None or (predicate and not predicate(row)):
+                    continue
+                page.append(row)
+                if len(page) >= limit:
+                    break
+            return page
+
+
+# Missing values in typed columns: the smallest int64, and NaN for floats
+MISSING_INT = -(2 ** 63)
+MISSING_FLOAT = float("nan")
+# Missing value in an object column
+_MISSING = object()
+
+def _fits(typecode: str, value: Any) -> bool:
+    if typecode == "d":
+        if type(value) is int:
+            return -(2 ** 53) <= value <= 2 ** 53
+        return type(value) is float and value == value and value != MISSING_INT
+    return type(value) is int and MISSING_INT < value < 2 ** 63
+
+
+class ColumnarTable(Table):
+    """Table storing its rows column by column, for large uniform tables.
+
+    ``numeric`` fields live in typed arrays (8 bytes a value instead of an
+    int or float object and a dict slot per row), each ``objects`` field in
+    one list with ``interned`` strings shared between rows, and anything else
+    (keys outside the schema, values a typed column cannot hold such as None)
+    in a per-row dict of extras. Columns are kept in id order, so an id maps
+    to its position by bisection; deletes leave tombstones that are
+    compacted once they outnumber the live rows.
+
+    Row dicts are only built for the rows handed out (``encode`` prepares a
+    row for storage and ``decode`` finishes a stored one), and ``select``
+    filters on whole columns without building any. Rows handed out are
+    copies: write through ``replace`` and ``update``. Integers stored in a
+    float column come back as floats.
+    """
+
+    def __init__(
+        self,
+        rows: Iterable[dict] = (),
+        numeric: Optional[Mapping[str, str]] = None,
+        objects: Iterable[str] = (),
+        interned: Iterable[str] = (),
+        encode: Optional[Callable[[dict], dict]] = None,
+        decode: Optional[Callable[[dict], dict]] = None,
+    ):
+        super().__init__()
+        self._typecodes = dict(numeric or {})
+        self._object_names = tuple(objects)
+        self._interned = frozenset(interned)
+        self._known = frozenset(("id", *self._typecodes, *self._object_names))
+        self._encode = encode
+        self._decode = decode
+        self._clear()
+        for row in rows:
+            self.insert(row, row_id=row.get("id"))
+
+    def _clear(self) -> None:
+        self._ids = array("q")
+        self._row_versions = array("q")
+        self._live = bytearray()
+        self._dead = 0
+        self._numeric = {name: array(typecode) for name, typecode in self._typecodes.items()}
+        self._objects: Dict[str, list] = {name: [] for name in self._object_names}
+        self._extras: Dict[int, dict] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids) - self._dead
+
+    def __iter__(self) -> Iterator[dict]:
+        # Keyset batches: rows are built a batch at a time, never the whole table
+        last_id = None
+        while True:
+            batch = self.after(last_id, 1000)
+            if not batch:
+                return
+            yield from batch
+            last_id = batch[-1]["id"]
+
+    def __contains__(self, row_id: int) -> bool:
+        with self._lock:
+            return self._position(row_id) is not None
+
+    def _position(self, row_id: Optional[int]) -> Optional[int]:
+        # Call with the lock held: positions move on inserts and compaction
+        if not isinstance(row_id, int):
+            return None
+        pos = bisect_left(self._ids, row_id)
+        if pos < len(self._ids) and self._ids[pos] == row_id and self._live[pos]:
+            return pos
+        return None
+
+    def _positions(self) -> Iterable[int]:
+        positions = range(len(self._ids))
+        return compress(positions, self._live) if self._dead else positions
+
+    def _raw(self, pos: int) -> dict:
+        row = {"id": self._ids[pos]}
+        for name, column in self._numeric.items():
+            value = column[pos]
+            if value == value and value != MISSING_INT:
+                row[name] = value
+        for name, column in self._objects.items():
+            value = column[pos]
+            if value is not _MISSING:
+                row[name] = value
+        extras = self._extras.get(row["id"])
+        if extras:
+            row.update(extras)
+        return row
+
+    def _row(self, pos: int) -> dict:
+        row = self._raw(pos)
+        return self._decode(row) if self._decode else row
+
+    def _write(self, pos: int, row: dict, new: bool) -> None:
+        """Store ``row`` at ``pos``: a new position (columns grow) or an existing one."""
+        if self._encode:
+            row = self._encode(row)
+        extras = {name: value for name, value in row.items() if name not in self._known}
+        for name, column in self._numeric.items():
+            value = row.get(name, _MISSING)
+            if value is _MISSING or not _fits(column.typecode, value):
+                if value is not _MISSING:
+                    extras[name] = value
+                value = MISSING_INT if column.typecode == "q" else MISSING_FLOAT
+            if new:
+                column.insert(pos, value)
+            else:
+                column[pos] = value
+        for name, column in self._objects.items():
+            value = row.get(name, _MISSING)
+            if name in self._interned and type(value) is str:
+                value = sys.intern(value)
+            if new:
+                column.insert(pos, value)
+            else:
+                column[pos] = value
+        row_id = self._ids[pos]
+        if extras:
+            self._extras[row_id] = extras
+        else:
+            self._extras.pop(row_id, None)
+
+    def _compact(self) -> None:
+        live = self._live
+        self._ids = array("q", compress(self._ids, live))
+        self._row_versions = array("q", compress(self._row_versions, live))
+        for name, column in self._numeric.items():
+            self._numeric[name] = array(column.typecode, compress(column, live))
+        for name, column in self._objects.items():
+            self._objects[name] = list(compress(column, live))
+        self._live = bytearray(b"\x01") * len(self._ids)
+        self._dead = 0
+
+    def version(self, row_id: int) -> Optional[int]:
+        with self._lock:
+            pos = self._position(row_id)
+            return None if pos is None else self._row_versions[pos]
+
+    def rows(self) -> List[dict]:
+        with self._lock:
+            return [self._row(pos) for pos in self._positions()]
+
+    def get(self, row_id: Optional[int]) -> Optional[dict]:
+        with self._lock:
+            pos = self._position(row_id)
+            return None if pos is None else self._row(pos)
+
+    def insert(self, row: dict, row_id: Optional[int] = None) -> dict:
+        with self._write_lock(), self._lock:
+            if row_id is None:
+                row_id = self.next_id()
+            elif row_id >= self._next_id:
+                self._next_id = row_id + 1
+            ids = self._ids
+            pos = len(ids) if not ids or row_id > ids[-1] else bisect_left(ids, row_id)
+            if pos < len(ids) and ids[pos] == row_id:
+                # The id's slot is still there (a tombstone, or a row being overwritten)
+                if not self._live[pos]:
+                    self._live[pos] = 1
+                    self._dead -= 1
+                self._row_versions[pos] = 1
+                self._write(pos, row, new=False)
+            else:
+                ids.insert(pos, row_id)
+                self._row_versions.insert(pos, 1)
+                self._live.insert(pos, 1)
+                self._write(pos, row, new=True)
+            row["id"] = row_id
+            self._record("insert", row_id, row)
+            new = self._row(pos)
+            self._notify(None, new)
+            return new
+
+    def replace(self, row_id: int, row: dict) -> Optional[dict]:
+        with self._write_lock(), self._lock:
+            pos = self._position(row_id)
+            if pos is None:
+                return None
+            old = self._row(pos)
+            row["id"] = row_id
+            self._write(pos, row, new=False)
+            self._row_versions[pos] += 1
+            self._record("replace", row_id, row)
+            new = self._row(pos)
+            self._notify(old, new)
+            return new
+
+    def update(self, row_id: int, **fields) -> Optional[dict]:
+        """Set ``fields`` on the stored row."""
+        with self._write_lock(), self._lock:
+            pos = self._position(row_id)
+            if pos is None:
+                return None
+            old = self._row(pos)
+            self._write(pos, {**self._raw(pos), **fields}, new=False)
+            self._row_versions[pos] += 1
+            self._record("update", row_id, fields)
+            new = self._row(pos)
+            self._notify(old, new)
+            return new
+
+    def delete(self, row_id: int) -> Optional[dict]:
+        with self._write_lock(), self._lock:
+            pos = self._position(row_id)
+            if pos is None:
+                return None
+            old = self._row(pos)
+            self._live[pos] = 0
+            self._dead += 1
+            # Let go of the values; the typed slots are reclaimed by compaction
+            for column in self._objects.values():
+                column[pos] = _MISSING
+            self._extras.pop(row_id, None)
+            if self._dead > len(self) + 64:
+                self._compact()
+            self._record("delete", row_id, None)
+            self._notify(old, None)
+            return old
+
+    def state(self) -> Tuple[List[dict], List[int], int, int]:
+        """Rows (as stored, not decoded) in id order with their versions, the revision and the next id."""
+        with self._lock:
+            positions = list(self._positions())
+            rows = [self._raw(pos) for pos in positions]
+            return rows, [self._row_versions[pos] for pos in positions], self.revision, self._next_id
+
+    def load(self, rows: List[dict], versions: Iterable[int], revision: int, next_id: int) -> None:
+        """Replace the contents with rows as ``state`` returns them, one column at a time."""
+        with self._lock:
+            versions = list(versions)
+            if any(left["id"] > right["id"] for left, right in zip(rows, rows[1:])):
+                order = sorted(range(len(rows)), key=lambda i: rows[i]["id"])
+                rows, versions = [rows[i] for i in order], [versions[i] for i in order]
+            self._clear()
+            self._ids = array("q", [row["id"] for row in rows])
+            self._row_versions = array("q", versions)
+            self._live = bytearray(b"\x01") * len(rows)
+            for row in rows:
+                if not row.keys() <= self._known:
+                    self._extras[row["id"]] = {name: value for name, value in row.items() if name not in self._known}
+            for name, typecode in self._typecodes.items():
+                missing = MISSING_INT if typecode == "q" else MISSING_FLOAT
+                values = [row.get(name, missing) for row in rows]
+                for pos, value in enumerate(values):
+                    if value is not missing and not _fits(typecode, value):
+                        self._extras.setdefault(rows[pos]["id"], {})[name] = value
+                        values[pos] = missing
+                self._numeric[name] = array(typecode, values)
+            for name in self._object_names:
+                values = [row.get(name, _MISSING) for row in rows]
+                if name in self._interned:
+                    values = [sys.intern(value) if type(value) is str else value for value in values]
+                self._objects[name] = values
+            self.revision = revision
+            self._next_id = next_id
+
+    def slice(self, skip: int = 0, limit: int = 100) -> List[dict]:
+        # Rows come in id order, which is creation order unless ids were given out of order
+        with self._lock:
+            return [self._row(pos) for pos in islice(self._positions(), skip, skip + limit)]
+
+    def after(
+        self,
+        last_id: Optional[int],
+        limit: int = 100,
+        predicate: Optional[Callable[[dict], bool]] = None,
+    ) -> List[dict]:
+        with self._lock:
+            start = 0 if last_id is None else bisect_right(self._ids, last_id)
+            page = []
+            for pos in range(start, len(self._ids)):
+                if not self._live[pos]:
+                    continue
+                row = self._row(pos)
+                if predicate and not predicate(row):
+                    continue
+                page.append(row)
+                if len(page) >= limit:
+                    break
+            return page
+
+    def columns(self, names: Sequence[str], ids: Optional[Iterable[int]] = None) -> Dict[str, list]:
+        """Values of the ``names`` fields of the rows with ``ids`` (every row
+        in id order by default), None where a row has no value.
+
+        Values are read straight from the columns, so no row is built.
+        """
+        with self._lock:
+            if ids is None:
+                positions = list(self._positions())
+            else:
+                positions = [pos for pos in map(self._position, ids) if pos is not None]
+            values = {}
+            for name in names:
+                if name in self._numeric:
+                    column = map(self._numeric[name].__getitem__, positions)
+                    values[name] = [None if v != v or v == MISSING_INT else v for v in column]
+                elif name in self._objects:
+                    column = map(self._objects[name].__getitem__, positions)
+                    values[name] = [None if v is _MISSING else v for v in column]
+                else:
+                    values[name] = [None] * len(positions)
+            if self._extras:
+                for index, pos in enumerate(positions):
+                    extras = self._extras.get(self._ids[pos])
+                    if extras:
+                        for name in names:
+                            if name in extras:
+                                values[name][index] = extras[name]
+            return values
+
+    def select(self, mask: Callable[[Dict[str, Sequence]], Iterable]) -> List[int]:
+        """Ids, in order, of the rows where ``mask`` is true.
+
+        ``mask`` gets the columns by name and returns one truth value per
+        position; built from ``map`` over the columns (see
+        ``MemoryStore.find_books``) it runs without materializing any row.
+        Missing values are MISSING_INT or NaN in typed columns.
+        """
+        with self._lock:
+            columns = {**self._numeric, **self._objects}
+            return list(compress(self._ids, map(and_, self._live, mask(columns))))
+
+
+# Mock book rows reference their author and categories either by id or by
+# embedding the row (seed data), depending on how they were written
+def book_author_ids(book: Optional[dict]) -> List[int]:
+    if not book:
+        return []
+    author_id = book.get("author_id") or (book.get("author") or {}).get("id")
+    return [author_id] if author_id is not None else []
+
+def book_category_ids(book: Optional[dict]) -> List[int]:
+    if not book:
+        return []
+    if book.get("category_ids"):
+        return list(dict.fromkeys(book["category_ids"]))
+    category_id = book.get("category_id") or (book.get("category") or {}).get("id")
+    return [category_id] if category_id is not None else []
+
+
+# Books are the large table, so they are stored column-wise (see ColumnarTable)
+BOOK_NUMERIC = {
+    "price": "d",
+    "stock": "q",
+    "stock_quantity": "q",
+    "publication_year": "q",
+    "pages": "q",
+    "author_id": "q",
+    "category_id": "q",
+}
+BOOK_OBJECTS = ("title", "description", "isbn", "published_date", "category_ids", "created_at", "updated_at")
+BOOK_INTERNED = ("published_date", "created_at", "updated_at")
+
+
+class MemoryStore:
+    """The authors, categories and books tables backing mock mode.
+
+    ``books_count`` on authors and categories is maintained from the book
+    writes: per-id counts live in a Counter (so they survive the referenced
+    row being replaced or re-inserted) and are mirrored into the rows.
+    Books are stored in the ``encode``d shape; their author and category
+    rows are attached when a book is read.
+    """
+
+    def __init__(
+        self,
+        authors: Iterable[dict] = (),
+        categories: Iterable[dict] = (),
+        books: Iterable[dict] = (),
+    ):
+        self.authors = Table(authors)
+        self.categories = Table(categories)
+        self.books = ColumnarTable(
+            books, BOOK_NUMERIC, BOOK_OBJECTS, BOOK_INTERNED,
+            encode=lambda row: self.encode("books", row),
+            decode=lambda row: self.decode("books", row),
+        )
+        self.tables: Dict[str, Table] = {"authors": self.authors, "categories": self.categories, "books": self.books}
+        self.author_books: Counter = Counter()
+        self.category_books: Counter = Counter()
+        # watch() replays the existing rows, which builds the counts
+        self.authors.watch(self._fill_count(self.author_books))
+        self.categories.watch(self._fill_count(self.category_books))
+        self.books.watch(self._count_books)
+
+    @staticmethod
+    def _fill_count(counts: Counter) -> Watcher:
+        def fill(old: Optional[dict], new: Optional[dict]) -> None:
+            if new is not None:
+                new["books_count"] = counts[new["id"]]
+        return fill
+
+    def _count_books(self, old: Optional[dict], new: Optional[dict]) -> None:
+        for table, counts, refs in (
+            (self.authors, self.author_books, book_author_ids),
+            (self.categories, self.category_books, book_category_ids),
+        ):
+            changes = Counter(refs(new))
+            changes.subtract(refs(old))
+            for row_id, delta in changes.items():
+                if not delta:
+                    continue
+                counts[row_id] += delta
+                if not counts[row_id]:
+                    del counts[row_id]
+                table.update(row_id, books_count=counts[row_id])
+
+    def restore(self, tables: Dict[str, Tuple[List[dict], Iterable[int], int, int]]) -> None:
+        """Bulk-load encoded rows (see ``Table.load``), then recount ``books_count``."""
+        for name in ("authors", "categories", "books"):
+            self.tables[name].load(*tables[name])
+        # In place: the fill watchers hold on to these counters
+        books = tables["books"][0]
+        for table, counts, refs in (
+            (self.authors, self.author_books, book_author_ids),
+            (self.categories, self.category_books, book_category_ids),
+        ):
+            counts.clear()
+            counts.update(ref for book in books for ref in refs(book))
+            for row in table:
+                row["books_count"] = counts[row["id"]]
+
+    def find_books(
+        self,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        in_stock: Optional[bool] = None,
+        author_ids: Optional[Iterable[int]] = None,
+    ) -> List[int]:
+        """Ids of the books matching every given filter, in id order.
+
+        The filters run over the book columns with ``map`` and ``compress``,
+        so no book row is built.
+        """
+        def mask(columns: Dict[str, Sequence]) -> Iterable:
+            tests = [repeat(True)]
+            if min_price is not None:
+                tests.append(map(ge, columns["price"], repeat(min_price)))
+            if max_price is not None:
+                tests.append(map(le, columns["price"], repeat(max_price)))
+            if in_stock is not None:
+                # A book has stock_quantity (API, generator) or stock (seed); the other is MISSING_INT
+                stock = map(max, columns["stock_quantity"], columns["stock"])
+                tests.append(map(gt if in_stock else le, stock, repeat(0)))
+            if author_ids is not None:
+                tests.append(map(frozenset(author_ids).__contains__, columns["author_id"]))
+            return reduce(lambda left, right: map(and_, left, right), tests)
+        return self.books.select(mask)
+
+    # Sharing between processes (see ``journal``)
+    def share(self, path: str, snapshot=None) -> Journal:
+        """Serialize writes through the journal at ``path`` and replay what it holds.
+
+        With a ``snapshot`` (see ``snapshot.Snapshot``) the store holds its
+        contents already, and only journal records written after it are replayed.
+        """
+        base = snapshot.id if snapshot is not None else None
+        journal = Journal(path, self.encode, self.apply, base=base)
+        if snapshot is not None and journal.id == snapshot.journal_id:
+            journal.offset = snapshot.journal_offset
+        elif journal.base != base:
+            journal.close()
+            raise ValueError(f"{path} does not continue from the loaded snapshot")
+        for name, table in self.tables.items():
+            table.name = name
+            table.journal = journal
+        journal.sync()
+        return journal
+
+    def encode(self, name: str, row: Optional[dict]) -> Optional[dict]:
+        # Embedded author/category rows are written as ids and re-attached on replay
+        if name != "books" or row is None:
+            return row
+        data = {key: value for key, value in row.items() if key not in ("author", "category")}
+        author_ids, category_ids = book_author_ids(row), book_category_ids(row)
+        data.setdefault("author_id", author_ids[0] if author_ids else None)
+        data.setdefault("category_id", category_ids[0] if category_ids else None)
+        return data
+
+    def decode(self, name: str, row: dict) -> dict:
+        if name == "books":
+            row["author"] = self.authors.get(row.get("author_id"))
+            row["category"] = self.categories.get(row.get("category_id"))
+        return row
+
+    def apply(self, name: str, op: str, row_id: int, row: Optional[dict]) -> None:
+        """Replay one journaled write."""
+        table = self.tables[name]
+        if op in ("insert", "replace"):
+            row = self.decode(name, row)
+        with derived_writes():
+            if op == "insert":
+                table.insert(row, row_id=row_id)
+            elif op == "replace":
+                table.replace(row_id, row)
+            elif op == "update":
+                table.update(row_id, **row)
+            elif op == "delete":
+                table.delete(row_id)
@@ -0,0 +1,3 @@
+# Benchmark suite: micro-benchmarks for crud functions and mock handlers, an
+# in-process ASGI load generator, and result files for regression checks.
+# Run ``python -m benchmarks --help``.
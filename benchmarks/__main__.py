@@ -0,0 +1,94 @@
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+from datetime import datetime
+from typing import List, Optional
+
+from . import micro
+from .catalog import build_database, load_mock_catalog
+from .load import catalog_endpoints, run_load
+from .results import RESULTS_DIR, compare, format_table, load, save
+
+SUMMARY_COLUMNS = ["suite", "name", "size", "count", "p50_ms", "p90_ms", "p99_ms", "ops_per_s"]
+
+def _sizes(value: str) -> List[int]:
+    units = {"k": 1000, "m": 1000000}
+    return [int(part[:-1]) * units[part[-1]] if part[-1] in units else int(part)
+            for part in value.lower().split(",") if part]
+
+def _output(path: Optional[str], kind: str) -> str:
+    return path or os.path.join(RESULTS_DIR, f"{kind}-{datetime.now():%Y%m%d-%H%M%S}.json")
+
+def _db_app(size: int):
+    from app.async_main import app
+    from app.database import AsyncSessionLocal, get_async_db, make_async_engine
+
+    path = os.path.join(tempfile.mkdtemp(prefix="bookstore-bench-"), "load.db")
+    build_database(f"sqlite:///{path}", size).dispose()
+    # Pooled like the real app, so connection setup is not part of each request
+    engine = make_async_engine(f"sqlite+aiosqlite:///{path}")
+
+    async def override_get_async_db():
+        async with AsyncSessionLocal(bind=engine) as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    return app
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Book store benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    micro_parser = commands.add_parser("micro", help="crud and mock handler micro-benchmarks")
+    micro_parser.add_argument("--suite", choices=["crud", "mock", "all"], default="all")
+    micro_parser.add_argument("--sizes", type=_sizes, default=_sizes("1k,100k"), help="e.g. 1k,100k,1m")
+    micro_parser.add_argument("--min-time", type=float, default=0.5, help="seconds per benchmark")
+    micro_parser.add_argument("--output", help="result file (default: benchmarks/results/micro-<time>.json)")
+
+    load_parser = commands.add_parser("load", help="in-process ASGI load test")
+    load_parser.add_argument("--app", choices=["mock", "db"], default="mock")
+    load_parser.add_argument("--size", type=lambda v: _sizes(v)[0], default=10000)
+    load_parser.add_argument("--concurrency", type=int, default=16)
+    load_parser.add_argument("--duration", type=float, default=10.0)
+    load_parser.add_argument("--output", help="result file (default: benchmarks/results/load-<time>.json)")
+
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.15, help="allowed p50 slowdown (0.15 = 15%%)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        rows = compare(load(args.baseline), load(args.current), args.threshold)
+        print(format_table(rows, ["suite", "name", "size", "baseline_ms", "current_ms", "ratio", "regressed"]))
+        regressions = [row for row in rows if row["regressed"]]
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.threshold:.0%}")
+            return 1
+        return 0
+
+    if args.command == "micro":
+        results = []
+        if args.suite in ("crud", "all"):
+            results += micro.run_crud(args.sizes, args.min_time)
+        if args.suite in ("mock", "all"):
+            results += micro.run_mock(args.sizes, args.min_time)
+    else:
+        if args.app == "db":
+            app = _db_app(args.size)
+        else:
+            from app.main import app
+            load_mock_catalog(args.size)
+        results = asyncio.run(run_load(app, catalog_endpoints(args.size), args.concurrency, args.duration))
+        for result in results:
+            result.update(size=args.size, app=args.app)
+
+    print(format_table(results, SUMMARY_COLUMNS))
+    print(f"Saved {save(results, _output(args.output, args.command))}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,27 @@
+from typing import List
+
+from sqlalchemy.engine import Engine
+
+from app.database import Base, make_engine
+from app.generate import CatalogGenerator, write_database, write_store
+
+# Benchmark catalogs come from app.generate: the same seed and size always
+# produce the same rows, so runs on different commits are comparable.
+
+def build_database(url: str, books: int, seed: int = 0) -> Engine:
+    """Create a fresh schema at ``url`` and load a catalog of ``books`` books."""
+    engine = make_engine(url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    write_database(engine, CatalogGenerator(books, seed=seed))
+    return engine
+
+def load_mock_catalog(books: int, seed: int = 0) -> List[int]:
+    """Replace the mock app's in-memory catalog with ``books`` generated books."""
+    from app import main
+
+    for table in (main.MOCK_BOOKS, main.MOCK_AUTHORS, main.MOCK_CATEGORIES):
+        for row in list(table):
+            table.delete(row["id"])
+    write_store(main.store, CatalogGenerator(books, seed=seed))
+    return [row["id"] for row in main.MOCK_BOOKS]
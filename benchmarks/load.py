@@ -0,0 +1,63 @@
+import asyncio
+import random
+import time
+from typing import Callable, Dict, List, Tuple
+
+import httpx
+
+from .results import summarize
+
+# In-process load generator: concurrent clients drive the ASGI app through
+# httpx's ASGI transport (no sockets, no server), so numbers reflect the
+# application stack itself. Each request picks the next endpoint in a fixed
+# rotation; endpoints are (name, path factory) pairs so ids and pages vary.
+
+Endpoint = Tuple[str, Callable[[random.Random], str]]
+
+def catalog_endpoints(size: int) -> List[Endpoint]:
+    pages = max(1, size // 100)
+    return [
+        ("root", lambda rng: "/"),
+        ("books_page", lambda rng: f"/books/?size=100&page={rng.randint(1, pages)}"),
+        ("books_facets", lambda rng: "/books/?size=20&facets=true"),
+        ("book", lambda rng: f"/books/{rng.randint(1, size)}"),
+        ("books_batch", lambda rng: "/books/batch?ids=" + ",".join(str(rng.randint(1, size)) for _ in range(20))),
+        ("search", lambda rng: f"/search/books/?q={rng.choice(['dragon', 'river', 'winter night'])}"),
+        ("authors", lambda rng: "/authors/?limit=100"),
+    ]
+
+async def _worker(client: httpx.AsyncClient, endpoints: List[Endpoint], rng: random.Random,
+                  deadline: float, limit: List[int], samples: Dict[str, List[float]], errors: Dict[str, int]) -> None:
+    position = rng.randrange(len(endpoints))
+    while time.perf_counter() < deadline and limit[0] > 0:
+        limit[0] -= 1
+        name, path = endpoints[position % len(endpoints)]
+        position += 1
+        begin = time.perf_counter()
+        response = await client.get(path(rng))
+        samples[name].append(time.perf_counter() - begin)
+        if response.status_code >= 400:
+            errors[name] += 1
+
+async def run_load(app, endpoints: List[Endpoint], concurrency: int = 16, duration: float = 5.0,
+                   max_requests: int = 10 ** 9, seed: int = 0) -> List[dict]:
+    """Drive ``app`` and return one summary per endpoint plus an ``all`` row."""
+    samples = {name: [] for name, _ in endpoints}
+    errors = {name: 0 for name, _ in endpoints}
+    limit = [max_requests]
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*[
+            _worker(client, endpoints, random.Random(seed + i), deadline, limit, samples, errors)
+            for i in range(concurrency)
+        ])
+        elapsed = time.perf_counter() - started
+    results = [
+        dict(suite="load", name=name, errors=errors[name], **summarize(values, elapsed))
+        for name, values in samples.items() if values
+    ]
+    every = [value for values in samples.values() for value in values]
+    results.append(dict(suite="load", name="all", errors=sum(errors.values()), **summarize(every, elapsed)))
+    return results
@@ -0,0 +1,77 @@
+import inspect
+import os
+import tempfile
+from typing import Callable, Dict, List
+
+from sqlalchemy.orm import Session
+
+from app import crud, schemas
+from app.generate import GENRES
+from .catalog import build_database, load_mock_catalog
+from .results import measure, summarize
+
+# Micro-benchmarks: crud functions against a SQLite catalog, and the mock
+# app's handlers (undecorated, so neither the cache nor ETags short-circuit
+# them) against the in-memory store, each at several catalog sizes.
+
+def crud_cases(size: int) -> Dict[str, Callable[[Session], object]]:
+    middle = size // 2
+    ids = list(range(1, size + 1, max(1, size // 100)))[:100]
+    filtered = schemas.BookSearch(category_name="Fantasy", min_price=10, max_price=50, in_stock=True)
+    return {
+        "get_books": lambda db: crud.get_books(db, limit=100),
+        "get_books_page_deep_offset": lambda db: crud.get_books_page(db, skip=middle, limit=100),
+        "get_books_keyset_price": lambda db: crud.get_books(db, limit=100, sort="price", after=(60.0, middle)),
+        "get_books_page_filtered": lambda db: crud.get_books_page(db, limit=100, search=filtered),
+        "get_books_count_filtered": lambda db: crud.get_books_count(db, filtered),
+        "get_book_facets": lambda db: crud.get_book_facets(db, schemas.BookSearch(max_price=30)),
+        "get_book": lambda db: crud.get_book(db, middle or 1),
+        "get_books_by_ids_100": lambda db: crud.get_books_by_ids(db, ids),
+        "search_books": lambda db: crud.search_books(db, "dragon river", limit=100),
+    }
+
+def run_crud(sizes: List[int], min_time: float = 0.5, workdir: str = None) -> List[dict]:
+    results = []
+    workdir = workdir or tempfile.mkdtemp(prefix="bookstore-bench-")
+    for size in sizes:
+        path = os.path.join(workdir, f"catalog-{size}.db")
+        engine = build_database(f"sqlite:///{path}", size)
+        try:
+            for name, case in crud_cases(size).items():
+                def call(case=case):
+                    with Session(engine) as db:
+                        return case(db)
+                results.append(dict(suite="crud", name=name, size=size, **summarize(measure(call, min_time))))
+        finally:
+            engine.dispose()
+    return results
+
+def _raw(endpoint: Callable) -> Callable:
+    # Skip the @conditional/@cached wrappers and time the handler itself
+    return inspect.unwrap(endpoint)
+
+def mock_cases(size: int, ids: List[int]) -> Dict[str, Callable[[], object]]:
+    from app import main
+
+    middle_page = max(1, size // 200)
+    batch = ",".join(str(i) for i in ids[:: max(1, len(ids) // 100)][:100])
+    read_books = _raw(main.read_books)
+    return {
+        "read_books_first_page": lambda: read_books(page=1, size=100, search=None, cursor=None, facets=False),
+        "read_books_middle_page": lambda: read_books(page=middle_page, size=100, search=None, cursor=None, facets=False),
+        "read_books_cursor": lambda: read_books(page=1, size=100, search=None, cursor="", facets=False),
+        "read_books_search": lambda: read_books(page=1, size=100, search="drag", cursor=None, facets=False),
+        "read_books_facets": lambda: read_books(page=1, size=100, search="river", cursor=None, facets=True),
+        "read_book": lambda: _raw(main.read_book)(book_id=ids[len(ids) // 2]),
+        "read_books_batch_100": lambda: _raw(main.read_books_batch)(ids=[batch]),
+        "search_books": lambda: _raw(main.search_books)(q="dragon river"),
+        "read_categories": lambda: _raw(main.read_categories)(skip=0, limit=len(GENRES), search=None, cursor=None),
+    }
+
+def run_mock(sizes: List[int], min_time: float = 0.5) -> List[dict]:
+    results = []
+    for size in sizes:
+        ids = load_mock_catalog(size)
+        for name, case in mock_cases(size, ids).items():
+            results.append(dict(suite="mock", name=name, size=size, **summarize(measure(case, min_time))))
+    return results
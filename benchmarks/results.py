@@ -0,0 +1,106 @@
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Timing helpers and result files.
+#
+# A result file is JSON: {"meta": {...}, "results": [{"suite", "name",
+# "size", "p50_ms", ...}]}. ``compare`` matches entries by (suite, name,
+# size) and flags any whose median got slower by more than the threshold.
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+def summarize(samples: List[float], elapsed: Optional[float] = None) -> dict:
+    """Latency summary in milliseconds; ``elapsed`` (seconds) gives throughput."""
+    count = len(samples)
+    total = elapsed if elapsed is not None else sum(samples)
+    return {
+        "count": count,
+        "mean_ms": round(sum(samples) / count * 1000, 4) if count else 0.0,
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 4),
+        "p90_ms": round(percentile(samples, 0.90) * 1000, 4),
+        "p99_ms": round(percentile(samples, 0.99) * 1000, 4),
+        "max_ms": round(max(samples) * 1000, 4) if count else 0.0,
+        "ops_per_s": round(count / total, 2) if total else 0.0,
+    }
+
+def measure(func: Callable[[], object], min_time: float = 0.5, max_calls: int = 1000) -> List[float]:
+    """Per-call durations (seconds) after one warm-up call."""
+    func()
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < max_calls and (time.perf_counter() - started < min_time or len(samples) < 5):
+        begin = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - begin)
+    return samples
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def metadata() -> dict:
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+def save(results: List[dict], path: str) -> str:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as handle:
+        json.dump({"meta": metadata(), "results": results}, handle, indent=2)
+    return path
+
+def load(path: str) -> List[dict]:
+    with open(path) as handle:
+        return json.load(handle)["results"]
+
+def _key(result: dict) -> Tuple:
+    return result["suite"], result["name"], result.get("size")
+
+def compare(baseline: List[dict], current: List[dict], threshold: float = 0.15) -> List[dict]:
+    """One row per benchmark present in both runs; ``regressed`` marks slowdowns."""
+    previous: Dict[Tuple, dict] = {_key(result): result for result in baseline}
+    rows = []
+    for result in current:
+        before = previous.get(_key(result))
+        if before is None or not before["p50_ms"]:
+            continue
+        ratio = result["p50_ms"] / before["p50_ms"]
+        rows.append({
+            "suite": result["suite"],
+            "name": result["name"],
+            "size": result.get("size"),
+            "baseline_ms": before["p50_ms"],
+            "current_ms": result["p50_ms"],
+            "ratio": round(ratio, 3),
+            "regressed": ratio > 1 + threshold,
+        })
+    return rows
+
+def format_table(rows: List[dict], columns: List[str]) -> str:
+    widths = {c: max(len(c), *(len(str(row.get(c, ""))) for row in rows)) for c in columns} if rows else {}
+    lines = ["  ".join(c.ljust(widths.get(c, len(c))) for c in columns)]
+    for row in rows:
+        lines.append("  ".join(str(row.get(c, "")).ljust(widths[c]) for c in columns))
+    return "\n".join(lines)
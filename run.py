@@ -1,18 +1,101 @@
+import argparse
+import os
+import tempfile
+
 import uvicorn
-from app.main import app
-from app.seed_data import seed_database
+from alembic import command
+from alembic.config import Config
+from app.seed_data import seed_database, seed_synthetic_from_env
+from app.mock_data import seed_store
+from app.snapshot import compact
+
+MOCK_APP = "app.main:app"
+
+def _journal_path() -> str:
+    # tmpfs when there is one, so the shared journal never touches disk
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, f"bookstore-{os.getpid()}.journal")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Book Store Service")
+    parser.add_argument("--app", default=os.getenv("APP_MODULE", MOCK_APP),
+                        help="ASGI app, e.g. app.async_main:app for the database-backed API")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--production", action="store_true",
+                        default=os.getenv("RUN_MODE", "").lower() == "production",
+                        help="several worker processes and no reload (also RUN_MODE=production)")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "0")),
+                        help="worker processes in production mode (default: one per CPU)")
+    parser.add_argument("--backlog", type=int, default=int(os.getenv("BACKLOG", "2048")))
+    parser.add_argument("--keep-alive", type=int, default=int(os.getenv("KEEP_ALIVE", "75")),
+                        help="idle keep-alive seconds; keep above the load balancer's idle timeout")
+    parser.add_argument("--access-log", action="store_true")
+    parser.add_argument("--skip-migrate", action="store_true",
+                        default=os.getenv("SKIP_MIGRATE", "").lower() in ("1", "true", "yes"),
+                        help="start without upgrading the database schema (also SKIP_MIGRATE=1)")
+    parser.add_argument("--skip-seed", action="store_true",
+                        default=os.getenv("SKIP_SEED", "").lower() in ("1", "true", "yes"),
+                        help="start without seeding the database (also SKIP_SEED=1)")
+    return parser.parse_args(argv)
+
+def migrate_database() -> None:
+    """Create or upgrade the schema in DATABASE_URL (``alembic upgrade head``)."""
+    command.upgrade(Config(os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")), "head")
+
+def prepare_store(args) -> None:
+    """Fold the persisted journal into a fresh snapshot before any worker opens it."""
+    data_dir = os.getenv("STORE_DATA_DIR")
+    if args.app == MOCK_APP and data_dir:
+        print("Compacting the catalog snapshot...")
+        compact(data_dir, seed_store)
+
+def serve(args) -> None:
+    """Production mode: one uvicorn worker per core sharing one catalog."""
+    workers = args.workers or os.cpu_count() or 1
+    journal = None
+    if args.app == MOCK_APP and not {"STORE_JOURNAL", "STORE_DATA_DIR"} & set(os.environ):
+        # The workers inherit the environment and open the same journal
+        journal = os.environ["STORE_JOURNAL"] = _journal_path()
+    print(f"Starting Book Store Service with {workers} workers...")
+    try:
+        uvicorn.run(
+            args.app,
+            host=args.host,
+            port=args.port,
+            workers=workers,
+            backlog=args.backlog,
+            timeout_keep_alive=args.keep_alive,
+            access_log=args.access_log,
+            log_level="info",
+        )
+    finally:
+        if journal is not None and os.path.exists(journal):
+            os.remove(journal)
 
 if __name__ == "__main__":
-    # Seed the database with sample data
-    print("Seeding database...")
-    seed_database()
-    
-    # Run the FastAPI application
-    print("Starting Book Store Service...")
-    uvicorn.run(
-        "app.main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
-    ) 
\ No newline at end of file
+    args = parse_args()
+
+    if not args.skip_migrate:
+        # Before seeding: the database-backed app and the seed need the tables
+        print("Migrating database...")
+        migrate_database()
+    if not args.skip_seed:
+        # Seed the database with sample data
+        print("Seeding database...")
+        seed_database()
+        seed_synthetic_from_env()
+    prepare_store(args)
+
+    if args.production:
+        serve(args)
+    else:
+        # Run the FastAPI application
+        print("Starting Book Store Service...")
+        uvicorn.run(
+            args.app,
+            host=args.host,
+            port=args.port,
+            reload=True,
+            log_level="info"
+        )
@@ -0,0 +1,234 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app import crud
+from app import async_main
+from app.async_main import app
+from app.cache import catalog_cache
+from app.database import AsyncSessionLocal, Base, get_async_db, instrument_engine
+
+
+@pytest.fixture
+def client(tmp_path):
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    sync_engine = create_engine(url)
+    Base.metadata.create_all(bind=sync_engine)
+    sync_engine.dispose()
+    engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"), poolclass=NullPool)
+    instrument_engine(engine.sync_engine, "test")
+
+    async def override_get_async_db():
+        async with AsyncSessionLocal(bind=engine) as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    catalog_cache.clear()  # entries from another test's database
+    with TestClient(app) as client:
+        yield client
+    app.dependency_overrides.clear()
+
+def test_async_book_workflow(client):
+    author = client.post("/authors/", json={"name": "Async Author", "email": "async@example.com"}).json()
+    category = client.post("/categories/", json={"name": "Async"}).json()
+    response = client.post("/books/", json={
+        "title": "Async Book", "isbn": "async-1", "price": 9.5,
+        "author_id": author["id"], "category_ids": [category["id"]],
+    })
+    assert response.status_code == 200
+    book = response.json()
+    assert book["author"]["name"] == "Async Author"
+    assert [c["name"] for c in book["categories"]] == ["Async"]
+
+    page = client.get("/books/", params={"category_name": "async"}).json()
+    assert page["total"] == 1 and page["items"][0]["id"] == book["id"]
+    facets = client.get("/books/", params={"facets": True}).json()["facets"]
+    assert facets["categories"] == [{"id": category["id"], "name": "Async", "count": 1}]
+    assert facets["out_of_stock"] == 1
+    assert client.get("/search/books/", params={"q": "asy"}).json()[0]["id"] == book["id"]
+
+    batch = client.get("/books/batch", params={"ids": f"{book['id'] + 1},{book['id']}"}).json()
+    assert [b["id"] for b in batch["items"]] == [book["id"]]
+    assert batch["items"][0]["categories"][0]["name"] == "Async"
+    assert batch["missing"] == [book["id"] + 1]
+    assert book["author"]["books_count"] == 1
+    assert [(c["id"], c["books_count"]) for c in client.get("/categories/top").json()] == [(category["id"], 1)]
+
+    updated = client.patch(f"/books/{book['id']}/stock", params={"quantity_change": 3}).json()
+    assert updated["stock_quantity"] == 3
+    assert client.delete(f"/books/{book['id']}").status_code == 200
+    assert client.get(f"/books/{book['id']}").status_code == 404
+    assert client.get("/authors/top").json()[0]["books_count"] == 0
+
+def _catalog(client, prices):
+    author = client.post("/authors/", json={"name": "Paged", "email": "paged@example.com"}).json()
+    category = client.post("/categories/", json={"name": "Paged"}).json()
+    books = [
+        client.post("/books/", json={
+            "title": f"Paged {n}", "isbn": f"paged-{n}", "price": price,
+            "author_id": author["id"], "category_ids": [category["id"]],
+        }).json()
+        for n, price in enumerate(prices)
+    ]
+    return author, category, books
+
+def test_cursor_pages_walk_the_catalog(client):
+    _, _, books = _catalog(client, [30, 10, 20, 10])
+    seen, cursor = [], ""
+    while cursor is not None:
+        page = client.get("/books/", params={"cursor": cursor, "size": 3, "sort": "price"}).json()
+        seen += [(b["price"], b["id"]) for b in page["items"]]
+        cursor = page["next_cursor"]
+    assert seen == sorted((b["price"], b["id"]) for b in books)
+
+    first = client.get("/authors/", params={"cursor": "", "limit": 1}).json()
+    assert len(first["items"]) == 1 and first["next_cursor"]
+    assert client.get("/authors/", params={"cursor": first["next_cursor"]}).json() == {"items": [], "next_cursor": None}
+    assert client.get("/books/", params={"cursor": first["next_cursor"], "sort": "price"}).status_code == 400
+
+def test_summary_fields_list_plain_columns(client):
+    _, _, books = _catalog(client, [30, 10, 20])
+    page = client.get("/books/", params={"fields": "summary", "size": 2, "page": 2}).json()
+    assert page["total"] == 3 and page["pages"] == 2
+    assert page["items"] == [{
+        "id": books[2]["id"], "title": "Paged 2", "price": 20.0, "stock_quantity": 0, "author_name": "Paged",
+    }]
+    cursor_page = client.get("/books/", params={"fields": "summary", "cursor": "", "sort": "price", "size": 2}).json()
+    assert [item["price"] for item in cursor_page["items"]] == [10.0, 20.0]
+    assert "author" not in cursor_page["items"][0]
+
+def test_etags_follow_rows_and_embedded_rows(client):
+    author, category, books = _catalog(client, [5])
+    book_url = f"/books/{books[0]['id']}"
+    for url in (book_url, "/books/", f"/authors/{author['id']}", "/authors/", "/categories/"):
+        response = client.get(url)
+        etag = response.headers["etag"]
+        again = client.get(url, headers={"If-None-Match": etag})
+        assert again.status_code == 304 and again.headers["etag"] == etag
+
+    book_etag, list_etag = client.get(book_url).headers["etag"], client.get("/books/").headers["etag"]
+    # Another book moves the embedded author's and category's books_count
+    client.post("/books/", json={"title": "More", "isbn": "paged-more", "price": 1, "author_id": author["id"]})
+    response = client.get(book_url, headers={"If-None-Match": book_etag})
+    assert response.status_code == 200 and response.json()["author"]["books_count"] == 2
+    assert client.get("/books/").headers["etag"] != list_etag
+    client.put(f"/categories/{category['id']}", json={"name": "Renamed"})
+    assert client.get(book_url).json()["categories"][0]["name"] == "Renamed"
+
+def test_bulk_endpoints_import_streamed_chunks(client, monkeypatch):
+    monkeypatch.setattr(async_main, "BULK_CHUNK_SIZE", 2)
+    authors = "\n".join(json.dumps({"name": f"Bulk {i}", "email": f"bulk{i}@example.com"}) for i in range(3))
+    assert client.post("/authors/bulk", content=authors).json() == {"created": 3, "errors": []}
+    response = client.post("/categories/bulk", content="name\nPoetry\nPoetry\n", headers={"content-type": "text/csv"})
+    assert response.json()["created"] == 1 and [e["row"] for e in response.json()["errors"]] == [2]
+
+    author_id = client.get("/authors/").json()[0]["id"]
+    category_id = client.get("/categories/").json()[0]["id"]
+    books = [
+        {"title": f"Bulk {i}", "isbn": f"bulk-{i}", "price": 2.5, "author_id": author_id, "category_ids": [category_id]}
+        for i in range(4)
+    ]
+    books.insert(2, {"title": "No author", "isbn": "bulk-x", "price": 1, "author_id": 999})
+    body = "\n".join(json.dumps(book) for book in books) + '\n{"title": "broken"}\n'
+    result = client.post("/books/bulk", content=body).json()
+    assert result["created"] == 4
+    assert [e["row"] for e in result["errors"]] == [3, 6]  # numbered across chunks
+    assert client.get(f"/categories/{category_id}").json()["books_count"] == 4
+    assert client.post("/books/bulk", params={"format": "xml"}, content="").status_code == 400
+
+def test_concurrent_update_is_a_conflict(client, monkeypatch):
+    author = client.post("/authors/", json={"name": "Racy", "email": "racy@example.com"}).json()
+    get_author = crud.get_author
+
+    def read_then_lose_the_race(db, author_id):
+        row = get_author(db, author_id)
+        # Another writer commits first and moves the version
+        db.execute(text("UPDATE authors SET version = version + 1 WHERE id = :id"), {"id": author_id})
+        return row
+
+    monkeypatch.setattr(crud, "get_author", read_then_lose_the_race)
+    response = client.put(f"/authors/{author['id']}", json={"name": "Mine"})
+    assert response.status_code == 409
+    monkeypatch.undo()
+    assert client.get(f"/authors/{author['id']}").json()["name"] == "Racy"
+    assert client.put(f"/authors/{author['id']}", json={"name": "Mine"}).json()["name"] == "Mine"
+
+def test_export_streams_books_from_the_database(client):
+    author = client.post("/authors/", json={"name": "Exporter", "email": "export@example.com"}).json()
+    category = client.post("/categories/", json={"name": "Exports"}).json()
+    for n, price in enumerate([5, 15, 25]):
+        client.post("/books/", json={
+            "title": f"Export {n}", "isbn": f"export-{n}", "price": price,
+            "author_id": author["id"], "category_ids": [category["id"]] if n else [],
+        })
+
+    response = client.get("/books/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["title"] for row in rows] == ["Export 0", "Export 1", "Export 2"]
+    assert [row["category_ids"] for row in rows] == [[], [category["id"]], [category["id"]]]
+    assert {row["author_name"] for row in rows} == {"Exporter"}
+
+    response = client.get("/books/export", params={"format": "csv", "min_price": 10})
+    assert response.headers["content-disposition"] == 'attachment; filename="books.csv"'
+    lines = list(csv.DictReader(io.StringIO(response.text)))
+    assert [(row["title"], row["category_ids"]) for row in lines] == [
+        ("Export 1", str(category["id"])), ("Export 2", str(category["id"])),
+    ]
+
+def test_expire_endpoint_releases_lapsed_reservations(client, monkeypatch):
+    author = client.post("/authors/", json={"name": "Reserver", "email": "reserve@example.com"}).json()
+    book = client.post("/books/", json={
+        "title": "Reserved", "isbn": "reserve-1", "price": 5, "stock_quantity": 4, "author_id": author["id"],
+    }).json()
+    lapsing = client.post("/reservations/", json={"items": [{"book_id": book["id"], "quantity": 3}], "ttl_seconds": 60}).json()
+    held = client.post("/reservations/", json={"items": [{"book_id": book["id"], "quantity": 1}], "ttl_seconds": 3600}).json()
+    assert client.post("/reservations/expire").json() == {"released": 0}
+
+    class Later(datetime):
+        @classmethod
+        def utcnow(cls):
+            return datetime.utcnow() + timedelta(minutes=5)
+
+    monkeypatch.setattr(crud, "datetime", Later)
+    assert client.post("/reservations/expire").json() == {"released": 1}
+    assert client.get(f"/reservations/{lapsing['id']}").json()["status"] == "released"
+    assert client.get(f"/reservations/{held['id']}").json()["status"] == "pending"
+    assert client.get(f"/books/{book['id']}").json()["stock_quantity"] == 3
+
+def test_metrics_count_db_queries_per_request(client):
+    author = client.post("/authors/", json={"name": "Metrics", "email": "metrics@example.com"}).json()
+    response = client.get(f"/authors/{author['id']}")
+    assert 'desc="2 queries"' in response.headers["server-timing"]  # version key, then the row
+    response = client.get(f"/authors/{author['id']}")
+    assert 'desc="1 queries"' in response.headers["server-timing"]  # cached under the same key
+
+    metrics = client.get("/metrics")
+    assert metrics.headers["content-type"].startswith("text/plain")
+    lines = metrics.text.splitlines()
+    assert any(line.startswith('http_requests_total{method="GET",route="/authors/{author_id}",status="200"}') for line in lines)
+    assert any(line.startswith('db_queries_total{engine="test"}') for line in lines)
+    assert "http_requests_in_flight 1" in lines  # the scrape itself
+
+def test_debug_profile_header_records_request_queries(client, monkeypatch):
+    from app import profiling
+
+    assert client.get("/debug/profiles/").status_code == 404  # disabled by default
+    monkeypatch.setattr(profiling.settings, "enabled", True)
+    author = client.post("/authors/", json={"name": "Profiled", "email": "profiled@example.com"}).json()
+    assert "x-query-profile" not in client.get(f"/authors/{author['id']}").headers
+
+    response = client.get(f"/authors/{author['id']}", headers={"X-Debug-Profile": "1"})
+    assert response.headers["x-query-count"] == "1"
+    profile = client.get(f"/debug/profiles/{response.headers['x-query-profile']}").json()
+    assert profile["path"] == f"/authors/{author['id']}" and profile["status"] == 200
+    assert "FROM authors" in profile["queries"][0]["statement"]
+    assert client.get("/debug/profiles/").json()[0]["id"] == profile["id"]
@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+from benchmarks import micro
+from benchmarks.__main__ import main
+from benchmarks.load import catalog_endpoints, run_load
+from benchmarks.results import compare, percentile, save
+
+def test_percentile():
+    samples = [float(i) for i in range(1, 101)]
+    assert percentile(samples, 0.5) in (50.0, 51.0)
+    assert percentile(samples, 0.99) == 99.0
+    assert percentile([], 0.5) == 0.0
+
+def test_compare_flags_slowdowns(tmp_path):
+    baseline = [{"suite": "crud", "name": "get_books", "size": 1000, "p50_ms": 10.0}]
+    current = [{"suite": "crud", "name": "get_books", "size": 1000, "p50_ms": 13.0}]
+    assert compare(baseline, current, threshold=0.2)[0]["regressed"] is True
+    assert compare(baseline, current, threshold=0.5)[0]["regressed"] is False
+    save(baseline, str(tmp_path / "a.json"))
+    save(current, str(tmp_path / "b.json"))
+    assert main(["compare", str(tmp_path / "a.json"), str(tmp_path / "b.json"), "--threshold", "0.2"]) == 1
+
+@pytest.fixture
+def mock_catalog():
+    # The mock benchmarks replace the shared in-memory catalog; put it back
+    from app import main
+
+    tables = (main.MOCK_AUTHORS, main.MOCK_CATEGORIES, main.MOCK_BOOKS)
+    saved = [[dict(row) for row in table] for table in tables]
+    yield
+    for table in reversed(tables):
+        for row in list(table):
+            table.delete(row["id"])
+    for table, rows in zip(tables, saved):
+        for row in rows:
+            table.insert(row, row_id=row["id"])
+
+def test_micro_and_load_smoke(tmp_path, mock_catalog):
+    results = micro.run_crud([200], min_time=0.0, workdir=str(tmp_path)) + micro.run_mock([200], min_time=0.0)
+    assert {r["suite"] for r in results} == {"crud", "mock"}
+    assert all(r["count"] >= 5 for r in results)
+
+    from app.main import app
+    load = asyncio.run(run_load(app, catalog_endpoints(200), concurrency=2, duration=5, max_requests=30))
+    overall = load[-1]
+    assert overall["name"] == "all" and overall["count"] == 30 and overall["errors"] == 0
@@ -0,0 +1,56 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from app import crud, models
+from app.bulk import RecordDecoder, iter_records
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_decoder_handles_split_lines_and_quoted_newlines():
+    decoder = RecordDecoder("csv")
+    records = decoder.feed(b'title,description,category_ids\nA,"multi\nline",1;2\nB')
+    records += decoder.feed(b',plain,\n')
+    records += decoder.close()
+    assert records == [
+        {"title": "A", "description": "multi\nline", "category_ids": ["1", "2"]},
+        {"title": "B", "description": "plain"},
+    ]
+
+def test_decoder_reports_bad_ndjson_lines():
+    records = list(iter_records([b'{"a": 1}\nnot json\n[1]\n']))
+    assert records[0] == {"a": 1}
+    assert all(isinstance(r, ValueError) for r in records[1:])
+
+def test_bulk_create_books_reports_row_errors(db):
+    lines = [{"name": "Author", "email": "author@example.com"}, {"name": "Bad", "email": "nope"}]
+    authors = crud.bulk_create_authors(db, lines)
+    assert authors.created == 1 and authors.errors[0].row == 2
+    crud.bulk_create_categories(db, [{"name": "Fiction"}])
+    author_id = db.query(models.Author.id).scalar()
+    category_id = db.query(models.Category.id).scalar()
+    books = [
+        {"title": f"Book {i}", "isbn": f"isbn-{i}", "price": 1.0, "author_id": author_id, "category_ids": [category_id]}
+        for i in range(5)
+    ]
+    books.append({"title": "Dup", "isbn": "isbn-0", "price": 1.0, "author_id": author_id})
+    books.append({"title": "Orphan", "isbn": "isbn-x", "price": 1.0, "author_id": 999})
+    result = crud.bulk_create_books(db, books, chunk_size=2)
+    assert result.created == 5
+    assert sorted(e.row for e in result.errors) == [6, 7]
+    assert db.query(models.book_category).count() == 5
+    assert [b.title for b in crud.search_books(db, "book")][:1] == ["Book 0"]
+
+def test_bulk_endpoint_accepts_ndjson_and_csv():
+    author_id = client.post("/authors/", json={"name": "Bulk", "email": "bulk@example.com"}).json()["id"]
+    body = "\n".join(json.dumps({"title": f"Bulk {i}", "isbn": str(i), "price": 2.5, "author_id": author_id}) for i in range(3))
+    response = client.post("/books/bulk", content=body + '\n{"title": "broken"}\n',
+                           headers={"content-type": "application/x-ndjson"})
+    assert response.status_code == 200
+    assert response.json()["created"] == 3
+    assert [e["row"] for e in response.json()["errors"]] == [4]
+    csv_body = f"title,isbn,price,author_id\nCsv Book,99,3.5,{author_id}\n"
+    response = client.post("/books/bulk", content=csv_body, headers={"content-type": "text/csv"})
+    assert response.json() == {"created": 1, "errors": []}
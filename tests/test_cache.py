@@ -0,0 +1,82 @@
+import time
+
+import pytest
+
+from app.cache import Cache, CacheBackend, KeyValueBackend, LRUBackend, LocalKeyValueClient
+from fastapi.testclient import TestClient
+from app.main import app
+
+client = TestClient(app)
+
+
+def _counting_loader(calls):
+    def loader():
+        calls.append(1)
+        return {"n": len(calls)}
+    return loader
+
+def test_lru_hits_invalidation_and_eviction():
+    cache = Cache(LRUBackend(maxsize=2, ttl=60))
+    calls = []
+    loader = _counting_loader(calls)
+    assert cache.get_or_set(("books",), {"page": 1}, loader) == {"n": 1}
+    assert cache.get_or_set(("books",), {"page": 1}, loader) == {"n": 1}
+    cache.invalidate("books")
+    assert cache.get_or_set(("books",), {"page": 1}, loader) == {"n": 2}
+    cache.get_or_set(("books",), {"page": 2}, loader)
+    cache.get_or_set(("books",), {"page": 3}, loader)
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["evictions"] == 2
+
+def test_lru_ttl_expiry():
+    cache = Cache(LRUBackend(maxsize=10, ttl=0.01))
+    calls = []
+    cache.get_or_set(("authors",), None, _counting_loader(calls))
+    time.sleep(0.02)
+    cache.get_or_set(("authors",), None, _counting_loader(calls))
+    assert len(calls) == 2
+
+def test_key_value_backend_round_trips_json():
+    cache = Cache(KeyValueBackend(LocalKeyValueClient()))
+    calls = []
+    cache.get_or_set(("book:1",), {"book_id": 1}, _counting_loader(calls))
+    assert cache.get_or_set(("book:1",), {"book_id": 1}, _counting_loader(calls)) == {"n": 1}
+    cache.invalidate("book:1")
+    cache.get_or_set(("book:1",), {"book_id": 1}, _counting_loader(calls))
+    assert len(calls) == 2
+
+def test_lru_generations_are_bounded_without_reusing_one():
+    cache = Cache(LRUBackend(maxsize=2, ttl=60))
+    calls = []
+    cache.invalidate("book:1")
+    cache.get_or_set(("book:1",), None, _counting_loader(calls))
+    cache.invalidate("book:2", "book:3")  # book:1's generation is dropped
+    assert len(cache.backend._generations) == 2
+    assert cache.get_or_set(("book:1",), None, _counting_loader(calls)) == {"n": 2}
+
+def test_local_client_deletes_expired_keys():
+    client = LocalKeyValueClient()
+    client.set("read", b"1", ex=0.01)
+    client.set("unread", b"1", ex=0.01)
+    client.set("kept", b"1")
+    time.sleep(0.02)
+    assert client.get("read") is None and "read" not in client._data
+    client.set("new", b"1", ex=60)
+    assert set(client._data) == {"kept", "new"}
+
+def test_backend_must_implement_the_whole_interface():
+    class GetOnly(CacheBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnly()
+
+def test_book_reads_are_invalidated_by_writes():
+    created = client.post("/books/", json={"title": "Cached", "price": 1.0}).json()
+    assert client.get(f"/books/{created['id']}").json()["title"] == "Cached"
+    client.put(f"/books/{created['id']}", json={"title": "Fresh", "price": 1.0})
+    assert client.get(f"/books/{created['id']}").json()["title"] == "Fresh"
+    client.delete(f"/books/{created['id']}")
+    assert client.get(f"/books/{created['id']}").status_code == 404
+    assert "hits" in client.get("/cache/stats").json()
@@ -0,0 +1,190 @@
+import pytest
+from sqlalchemy import update
+
+from app import crud, models, schemas
+from app.pagination import decode_cursor, next_cursor
+
+
+def _catalog(db, books=6):
+    author = crud.create_author(db, schemas.AuthorCreate(name="Author", email="author@example.com"))
+    category = crud.create_category(db, schemas.CategoryCreate(name="Fiction"))
+    for i in range(books):
+        crud.create_book(db, schemas.BookCreate(
+            title=f"Book {i}",
+            isbn=f"isbn-{i}",
+            price=float(10 + i % 3),
+            stock_quantity=i % 2,
+            author_id=author.id,
+            category_ids=[category.id],
+        ))
+    return author, category
+
+def test_get_books_keyset_by_price(db):
+    _catalog(db)
+    seen, after = [], None
+    while True:
+        page = crud.get_books(db, limit=4, sort="price", after=after)
+        seen.extend((b.price, b.id) for b in page)
+        cursor = next_cursor(page[-1] if page else None, 4, len(page), sort="price")
+        if cursor is None:
+            break
+        after = decode_cursor(cursor)
+    assert seen == sorted(seen)
+    assert len(seen) == 6
+
+def test_get_books_keyset_keeps_null_stock(db):
+    _catalog(db, books=4)
+    db.execute(update(models.Book).where(models.Book.id.in_([2, 3])).values(stock_quantity=None))
+    db.commit()
+    seen, after = [], None
+    while True:
+        page = crud.get_books(db, limit=2, sort="stock_quantity", after=after)
+        seen.extend(b.id for b in page)
+        cursor = next_cursor(page[-1] if page else None, 2, len(page), sort="stock_quantity")
+        if cursor is None:
+            break
+        after = decode_cursor(cursor)
+    assert seen == [1, 2, 3, 4]
+
+def test_get_authors_keyset(db):
+    for i in range(3):
+        crud.create_author(db, schemas.AuthorCreate(name=f"A{i}", email=f"a{i}@example.com"))
+    first = crud.get_authors(db, limit=2)
+    rest = crud.get_authors(db, limit=2, after=first[-1].id)
+    assert [a.name for a in first + rest] == ["A0", "A1", "A2"]
+
+def test_get_books_page_returns_items_and_total(db):
+    _, category = _catalog(db, books=5)
+    search = schemas.BookSearch(category_name="fic", in_stock=True)
+    items, total = crud.get_books_page(db, skip=0, limit=1, search=search)
+    assert len(items) == 1
+    assert total == crud.get_books_count(db, search) == 2
+    assert len(items[0].categories) == 1
+    assert crud.get_books_page(db, skip=10, limit=1, search=search) == ([], 2)
+
+def test_get_book_summaries_projection(db):
+    _catalog(db, books=3)
+    search = schemas.BookSearch(author_name="auth", max_price=11)
+    rows = crud.get_book_summaries(db, search=search)
+    summaries = [schemas.BookSummary.model_validate(row) for row in rows]
+    assert [s.title for s in summaries] == ["Book 0", "Book 1"]
+    assert summaries[0].author_name == "Author"
+
+def test_book_version_moves_on_update(db):
+    _catalog(db, books=1)
+    book = crud.get_books(db)[0]
+    assert crud.get_book_version(db, book.id) == 1
+    crud.update_book(db, book.id, schemas.BookUpdate(category_ids=[]))
+    assert crud.get_book_version(db, book.id) == 2
+    keys, total = crud.get_book_versions(db)
+    assert total == 1 and [key[:2] for key in keys] == [(book.id, 2)]
+
+def test_update_book_stock_is_clamped_and_bumps_version(db):
+    _catalog(db, books=1)
+    book = crud.get_books(db)[0]
+    assert crud.update_book_stock(db, book.id, 5).stock_quantity == 5
+    updated = crud.update_book_stock(db, book.id, -10)
+    assert updated.stock_quantity == 0
+    assert updated.version == 3
+    assert crud.update_book_stock(db, 999, 1) is None
+
+def test_reserve_commit_release(db):
+    _catalog(db, books=2)
+    first, second = crud.get_books(db)
+    crud.update_book_stock(db, first.id, 5)
+    crud.update_book_stock(db, second.id, 2)  # 5 and 3 in stock
+
+    request = schemas.ReservationCreate(items=[
+        schemas.ReservationItem(book_id=first.id, quantity=2),
+        schemas.ReservationItem(book_id=second.id, quantity=4),
+    ])
+    with pytest.raises(crud.InsufficientStock) as exc:
+        crud.reserve_stock(db, request)
+    assert exc.value.book_ids == [second.id]
+    assert crud.get_book(db, first.id).stock_quantity == 5  # all or nothing
+
+    reservation = crud.reserve_stock(db, schemas.ReservationCreate(items=[
+        schemas.ReservationItem(book_id=first.id, quantity=2),
+        schemas.ReservationItem(book_id=first.id, quantity=1),
+    ]))
+    assert [(i.book_id, i.quantity) for i in reservation.items] == [(first.id, 3)]
+    assert crud.get_book(db, first.id).stock_quantity == 2
+    assert crud.release_reservation(db, reservation.id).status == "released"
+    assert crud.get_book(db, first.id).stock_quantity == 5
+    # Already released: neither commit nor a second release changes anything
+    assert crud.commit_reservation(db, reservation.id).status == "released"
+    crud.release_reservation(db, reservation.id)
+    assert crud.get_book(db, first.id).stock_quantity == 5
+
+    reservation = crud.reserve_stock(db, schemas.ReservationCreate(items=[
+        schemas.ReservationItem(book_id=first.id, quantity=1, expected_version=crud.get_book_version(db, first.id)),
+    ]))
+    assert crud.commit_reservation(db, reservation.id).status == "committed"
+    assert crud.get_book(db, first.id).stock_quantity == 4
+
+def test_reservation_with_stale_version_is_rejected(db):
+    _catalog(db, books=1)
+    book = crud.update_book_stock(db, crud.get_books(db)[0].id, 5)
+    with pytest.raises(crud.InsufficientStock):
+        crud.reserve_stock(db, schemas.ReservationCreate(items=[
+            schemas.ReservationItem(book_id=book.id, quantity=1, expected_version=book.version - 1),
+        ]))
+
+def test_get_book_facets(db):
+    author, category = _catalog(db, books=6)
+    other = crud.create_author(db, schemas.AuthorCreate(name="Other", email="other@example.com"))
+    crud.create_book(db, schemas.BookCreate(
+        title="Pricey", isbn="isbn-x", price=150.0, stock_quantity=3, author_id=other.id,
+    ))
+    facets = crud.get_book_facets(db)
+    assert [(a.name, a.count) for a in facets.authors] == [("Author", 6), ("Other", 1)]
+    assert [(c.id, c.count) for c in facets.categories] == [(category.id, 6)]
+    assert [b.count for b in facets.price] == [0, 6, 0, 0, 1]
+    assert (facets.in_stock, facets.out_of_stock) == (4, 3)
+
+    filtered = crud.get_book_facets(db, schemas.BookSearch(min_price=100))
+    assert [a.name for a in filtered.authors] == ["Other"]
+    assert filtered.categories == []
+    assert filtered.price[-1].max is None and filtered.price[-1].count == 1
+
+def test_get_books_by_ids_in_request_order(db):
+    _catalog(db, books=3)
+    ids = [b.id for b in crud.get_books(db)]
+    books, missing = crud.get_books_by_ids(db, [ids[2], 999, ids[0]])
+    assert [b.id for b in books] == [ids[2], ids[0]]
+    assert missing == [999]
+    assert books[0].categories[0].name == "Fiction"
+
+def test_book_writes_maintain_counters(db):
+    author, fiction = _catalog(db, books=2)
+    other = crud.create_author(db, schemas.AuthorCreate(name="Other", email="other@example.com"))
+    poetry = crud.create_category(db, schemas.CategoryCreate(name="Poetry"))
+
+    def counts():
+        return crud.get_author(db, author.id).books_count, crud.get_category(db, fiction.id).books_count
+
+    assert counts() == (2, 2)
+
+    book = crud.get_books(db, limit=1)[0]
+    version = crud.get_author(db, author.id).version
+    crud.update_book(db, book.id, schemas.BookUpdate(author_id=other.id, category_ids=[fiction.id, poetry.id]))
+    assert counts() == (1, 2)
+    assert crud.get_author(db, other.id).books_count == crud.get_category(db, poetry.id).books_count == 1
+    assert crud.get_author(db, author.id).version == version  # counters leave the row version alone
+    assert [a.id for a in crud.get_top_authors(db, 1)] == [other.id]  # tie at 1: newest first
+
+    crud.delete_book(db, book.id)
+    assert counts() == (1, 1)
+    assert crud.get_category(db, poetry.id).books_count == 0
+
+    records = [
+        {"title": "Bulk", "isbn": "bulk-1", "price": 1.0, "author_id": other.id, "category_ids": [poetry.id]},
+        {"title": "Bad", "isbn": "bulk-2", "price": 1.0, "author_id": 999},
+    ]
+    assert crud.bulk_create_books(db, records).created == 1
+    assert [c.name for c in crud.get_top_categories(db, 2)] == ["Poetry", "Fiction"]
+
+    db.execute(update(models.Author).values(books_count=0))
+    crud.refresh_book_counts(db)
+    db.commit()
+    assert [(a.name, a.books_count) for a in crud.get_top_authors(db)] == [("Other", 1), ("Author", 1)]
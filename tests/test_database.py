@@ -0,0 +1,103 @@
+from sqlalchemy import text
+
+from app.database import EngineSettings, async_database_url, make_engine
+
+
+def test_sqlite_profile_applied_on_connect(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'profile.db'}", EngineSettings(sqlite_busy_timeout_ms=1234))
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 1234
+    assert engine.pool.size() == 10
+    engine.dispose()
+
+def test_engine_options_for_postgres():
+    settings = EngineSettings(pool_size=5, statement_timeout_ms=2000, pool_pre_ping=False)
+    options = settings.engine_options("postgresql://user@localhost/bookstore")
+    assert options["pool_size"] == 5
+    assert options["pool_pre_ping"] is False
+    assert options["connect_args"] == {"options": "-c statement_timeout=2000"}
+    async_options = settings.engine_options(async_database_url("postgresql://user@localhost/bookstore"))
+    assert async_options["connect_args"] == {"server_settings": {"statement_timeout": "2000"}}
+
+def test_async_sqlite_file_engine_is_pooled(tmp_path):
+    from app.database import make_async_engine
+
+    engine = make_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'async.db'}", EngineSettings(pool_size=3))
+    assert engine.pool.size() == 3
+    engine.sync_engine.dispose()
+
+def test_in_memory_sqlite_skips_pool_sizing():
+    options = EngineSettings().engine_options("sqlite://")
+    assert "pool_size" not in options
+
+
+def _engine_with_author(path, name):
+    from app import models
+    from app.database import Base
+
+    engine = make_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(models.Author.__table__.insert().values(name=name, email=f"{name}@example.com"))
+    return engine
+
+def test_routing_session_reads_replicas_until_it_writes(tmp_path):
+    from sqlalchemy.orm import sessionmaker
+
+    from app import crud, schemas
+    from app.database import ReplicaSet, RoutingSession
+
+    primary = _engine_with_author(tmp_path / "primary.db", "primary")
+    replica_a = _engine_with_author(tmp_path / "a.db", "replica-a")
+    replica_b = _engine_with_author(tmp_path / "b.db", "replica-b")
+    replicas = ReplicaSet([replica_a, replica_b])
+    Session = sessionmaker(class_=RoutingSession, autoflush=False, bind=primary, replicas=replicas)
+
+    names = []
+    for _ in range(2):
+        with Session() as db:
+            names.append(crud.get_authors(db)[0].name)
+    assert names == ["replica-a", "replica-b"]
+
+    replicas.mark_down(replica_a)
+    with Session() as db:
+        assert crud.get_authors(db)[0].name == "replica-b"
+        crud.update_author(db, 1, schemas.AuthorUpdate(biography="written"))
+        # Read-your-writes: the session sticks to the primary after writing
+        assert [a.name for a in crud.get_authors(db)] == ["primary"]
+        assert crud.get_author(db, 1).biography == "written"
+
+def _engine_with_book(path, title, linked):
+    from app import models
+
+    engine = _engine_with_author(path, title)
+    with engine.begin() as conn:
+        conn.execute(models.Category.__table__.insert().values(id=1, name="C"))
+        conn.execute(models.Book.__table__.insert().values(id=1, title=title, price=1.0, author_id=1))
+        if linked:
+            conn.execute(models.book_category.insert().values(book_id=1, category_id=1))
+    return engine
+
+def test_routing_session_keeps_one_replica_per_session(tmp_path):
+    from sqlalchemy.orm import sessionmaker
+
+    from app import crud
+    from app.database import ReplicaSet, RoutingSession
+
+    # The replicas disagree on the book's categories, as lagging replicas would
+    primary = _engine_with_book(tmp_path / "primary.db", "primary", linked=True)
+    replicas = ReplicaSet([
+        _engine_with_book(tmp_path / "a.db", "replica-a", linked=True),
+        _engine_with_book(tmp_path / "b.db", "replica-b", linked=False),
+    ])
+    Session = sessionmaker(class_=RoutingSession, autoflush=False, bind=primary, replicas=replicas)
+
+    seen = []
+    for _ in range(3):
+        with Session() as db:
+            # get_books issues the books query plus a selectinload for the categories
+            book = crud.get_books(db)[0]
+            seen.append((book.title, [c.name for c in book.categories]))
+    assert seen == [("replica-a", ["C"]), ("replica-b", []), ("replica-a", ["C"])]
@@ -0,0 +1,36 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from app import crud, schemas
+from app.bulk import iter_records
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_iter_book_rows_streams_filtered_catalog(db):
+    author = crud.create_author(db, schemas.AuthorCreate(name="Writer", email="w@example.com"))
+    fiction = crud.create_category(db, schemas.CategoryCreate(name="Fiction"))
+    for i in range(5):
+        crud.create_book(db, schemas.BookCreate(
+            title=f"Book {i}", isbn=str(i), price=float(i), author_id=author.id,
+            category_ids=[fiction.id] if i % 2 else [],
+        ))
+    rows = list(crud.iter_book_rows(db, schemas.BookSearch(min_price=1), batch_size=2))
+    assert [row["title"] for row in rows] == ["Book 1", "Book 2", "Book 3", "Book 4"]
+    assert rows[0]["author_name"] == "Writer"
+    assert rows[0]["category_ids"] == [fiction.id]
+    assert rows[1]["category_ids"] == []
+
+def test_export_endpoint_ndjson_and_csv():
+    response = client.get("/books/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert len(lines) == client.get("/books/").json()["total"]
+    assert {"id", "title", "author_name", "category_ids"} <= set(lines[0])
+
+    response = client.get("/books/export", params={"format": "csv", "max_price": 11})
+    records = list(iter_records([response.content], "csv"))
+    assert records and all(float(r["price"]) <= 11 for r in records)
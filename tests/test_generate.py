@@ -0,0 +1,45 @@
+from collections import Counter
+
+from sqlalchemy import func, select
+
+from app import models, seed_data
+from app.generate import CatalogGenerator, write_database, write_store
+from app.store import MemoryStore
+
+def test_generator_is_deterministic_and_skewed():
+    books = list(CatalogGenerator(5000, seed=7).books())
+    assert books == list(CatalogGenerator(5000, seed=7).books())
+    assert books != list(CatalogGenerator(5000, seed=8).books())
+    assert len({b["isbn"] for b in books}) == 5000
+
+    popularity = Counter(b["author_id"] for b in books).most_common()
+    assert popularity[0][1] > 10 * popularity[len(popularity) // 2][1]  # Zipf head
+    assert any(len(b["category_ids"]) > 1 for b in books)
+    prices = sorted(b["price"] for b in books)
+    assert prices[len(prices) // 2] < sum(prices) / len(prices)  # right-skewed
+    assert 0.1 < sum(b["stock_quantity"] == 0 for b in books) / len(books) < 0.2
+
+def test_write_database_appends_after_existing_rows(db):
+    engine = db.get_bind()
+    first = write_database(engine, CatalogGenerator(300, seed=1), batch_size=128)
+    second = write_database(engine, CatalogGenerator(100, seed=1), batch_size=128)
+    assert first["books"] == 300 and second["books"] == 100
+    assert db.scalar(select(func.count()).select_from(models.Book)) == 400
+    links = db.scalar(select(func.count()).select_from(models.book_category))
+    assert links == first["book_category"] + second["book_category"]
+
+def test_synthetic_seed_from_env_runs_once(db, monkeypatch):
+    monkeypatch.setattr(seed_data, "engine", db.get_bind())
+    monkeypatch.setenv("SEED_SYNTHETIC_BOOKS", "200")
+    seed_data.seed_synthetic_from_env()
+    seed_data.seed_synthetic_from_env()  # a restart with the same settings
+    assert db.scalar(select(func.count()).select_from(models.Book)) == 200
+
+def test_write_store_uses_mock_row_shape():
+    store = MemoryStore()
+    counts = write_store(store, CatalogGenerator(50, authors=5, seed=3))
+    assert counts == {"authors": 5, "categories": 20, "books": 50}
+    book = store.books.get(1)
+    assert book["author"]["id"] == book["author_id"]
+    assert book["category"]["id"] == book["category_ids"][0]
+    assert sum(a["books_count"] for a in store.authors) == 50
@@ -0,0 +1,96 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+
+import pytest
+
+from app.journal import JournalMiddleware
+from app.store import MemoryStore
+
+def _store():
+    return MemoryStore(
+        authors=[{"id": 1, "name": "A"}, {"id": 2, "name": "B"}],
+        categories=[{"id": 1, "name": "C"}],
+        books=[{"id": 1, "title": "Seed", "author": {"id": 1}, "category": {"id": 1}}],
+    )
+
+def test_stores_sharing_a_journal_see_one_catalog(tmp_path):
+    path = str(tmp_path / "catalog.journal")
+    first, second = _store(), _store()
+    first_journal, second_journal = first.share(path), second.share(path)
+    assert first_journal.id == second_journal.id
+
+    book = first.books.insert({"title": "One", "author_id": 2, "category_ids": [1]})
+    # The second writer catches up before allocating, so ids never collide
+    other = second.books.insert({"title": "Two", "author_id": 2})
+    assert (book["id"], other["id"]) == (2, 3)
+    first.authors.replace(1, {"name": "Renamed"})
+    first.books.delete(1)
+    # first caught up with "Two" when it locked for its own next write
+    assert second_journal.sync() == 2 and first_journal.sync() == 0
+
+    for store in (first, second):
+        assert [b["title"] for b in store.books] == ["One", "Two"]
+        assert [(a["name"], a["books_count"]) for a in store.authors] == [("Renamed", 0), ("B", 2)]
+    assert second.books.get(2)["author"] is second.authors.get(2)  # re-attached on replay
+    assert first.authors.version(2) == second.authors.version(2)
+    assert first.books.revision == second.books.revision
+
+    late = _store()
+    late.share(path)
+    assert [b["title"] for b in late.books] == ["One", "Two"]
+
+def test_middleware_waits_for_the_journal_lock_off_the_event_loop(tmp_path):
+    path = str(tmp_path / "catalog.journal")
+    first, second = _store(), _store()
+    journal = first.share(path)
+    second.share(path)
+    second.books.insert({"title": "Elsewhere", "author_id": 1})
+
+    async def app(scope, receive, send):
+        pass
+
+    async def main():
+        # A write in a threadpool handler holding the lock for a while
+        locked = threading.Event()
+
+        def write():
+            with journal._lock:
+                locked.set()
+                time.sleep(0.5)
+
+        held = threading.Thread(target=write)
+        held.start()
+        locked.wait()
+        call = asyncio.ensure_future(JournalMiddleware(app, journal)({"type": "http"}, None, None))
+        await asyncio.sleep(0.05)
+        assert not call.done()  # the loop kept running while the catch-up waited
+        await call
+        held.join()
+
+    asyncio.run(main())
+    assert [b["title"] for b in first.books] == ["Seed", "Elsewhere"]
+
+def _insert_books(path, count):
+    store = _store()
+    store.share(path)
+    for i in range(count):
+        store.books.insert({"title": f"{os.getpid()}-{i}", "author_id": 1})
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_concurrent_processes_serialize_writes(tmp_path):
+    path = str(tmp_path / "catalog.journal")
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_insert_books, args=(path, 50)) for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+        assert worker.exitcode == 0
+    store = _store()
+    store.share(path)
+    assert len(store.books) == 151
+    assert [b["id"] for b in store.books] == list(range(1, 152))
+    assert store.authors.get(1)["books_count"] == 151
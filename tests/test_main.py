@@ -9,24 +9,24 @@ def test_read_root():
     assert response.status_code == 200
     data = response.json()
     assert "message" in data
-    assert data["message"] == "Welcome to Book Store Service API"
+    assert data["message"] == "Welcome to Book Store Service API (Mock)"
 
 def test_health_check():
     response = client.get("/health")
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "healthy"
-    assert data["service"] == "book-store-service"
+    assert data["service"] == "book-store-service-mock"
 
 def test_get_authors():
     response = client.get("/authors/")
     assert response.status_code == 200
-    assert isinstance(response.json(), list)
+    assert isinstance(response.json()["items"], list)
 
 def test_get_categories():
     response = client.get("/categories/")
     assert response.status_code == 200
-    assert isinstance(response.json(), list)
+    assert isinstance(response.json()["items"], list)
 
 def test_get_books():
     response = client.get("/books/")
@@ -97,4 +97,98 @@ def test_create_book():
 def test_search_books():
     response = client.get("/search/books/?q=Harry")
     assert response.status_code == 200
-    assert isinstance(response.json(), list) 
\ No newline at end of file
+    assert isinstance(response.json(), list)
+
+def test_books_cursor_pagination_walks_catalog():
+    seen = []
+    cursor = ""
+    while cursor is not None:
+        response = client.get("/books/", params={"size": 1, "cursor": cursor})
+        assert response.status_code == 200
+        data = response.json()
+        seen.extend(book["id"] for book in data["items"])
+        cursor = data["next_cursor"]
+    assert seen == sorted(seen)
+    assert len(seen) == client.get("/books/").json()["total"]
+
+def test_authors_invalid_cursor():
+    response = client.get("/authors/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+def test_book_etag_conditional_get():
+    book_id = client.post("/books/", json={"title": "Etag Book", "price": 5.0}).json()["id"]
+    first = client.get(f"/books/{book_id}")
+    etag = first.headers["etag"]
+    cached = client.get(f"/books/{book_id}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    client.put(f"/books/{book_id}", json={"title": "Etag Book 2", "price": 5.0})
+    changed = client.get(f"/books/{book_id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+def test_books_list_etag_changes_on_write():
+    etag = client.get("/books/").headers["etag"]
+    assert client.get("/books/", headers={"If-None-Match": etag}).status_code == 304
+    client.post("/books/", json={"title": "Another", "price": 1.0})
+    assert client.get("/books/", headers={"If-None-Match": etag}).status_code == 200
+
+def test_books_facets():
+    data = client.get("/books/", params={"search": "mock", "facets": True}).json()
+    facets = data["facets"]
+    assert facets["in_stock"] + facets["out_of_stock"] == data["total"]
+    assert sum(bucket["count"] for bucket in facets["price"]) == data["total"]
+    assert {a["name"] for a in facets["authors"]} >= {"Mock Author 1", "Mock Author 2"}
+    assert "facets" not in client.get("/books/").json()
+
+def test_books_batch_keeps_request_order():
+    response = client.get("/books/batch", params={"ids": "2,999,1"})
+    assert response.status_code == 200
+    data = response.json()
+    assert [book["id"] for book in data["items"]] == [2, 1]
+    assert data["missing"] == [999]
+    assert client.get("/authors/batch", params={"ids": ["1", "1,x"]}).status_code == 400
+
+def test_top_authors_follow_book_writes():
+    author = client.post("/authors/", json={"name": "Prolific", "email": "prolific@example.com"}).json()
+    assert author["books_count"] == 0
+    books = client.get("/authors/top", params={"limit": 1}).json()[0]["books_count"] + 1
+    for i in range(books):
+        client.post("/books/", json={"title": f"Prolific {i}", "author_id": author["id"], "price": 1.0})
+    top = client.get("/authors/top", params={"limit": 1}).json()
+    assert [(a["id"], a["books_count"]) for a in top] == [(author["id"], books)]
+    assert client.get(f"/authors/{author['id']}").json()["books_count"] == books
+    assert client.get("/categories/top").status_code == 200
+
+def test_books_filter_on_price_stock_and_author():
+    author = client.post("/authors/", json={"name": "Columnar Writer", "email": "columnar@example.com"}).json()
+    for price, stock in ((5.0, 0), (15.0, 3), (25.0, 7)):
+        client.post("/books/", json={"title": "Filtered", "price": price, "stock_quantity": stock, "author_id": author["id"]})
+    params = {"author_name": "columnar writer", "min_price": 10, "in_stock": True}
+    data = client.get("/books/", params=params).json()
+    assert [(b["price"], b["stock_quantity"]) for b in data["items"]] == [(15.0, 3), (25.0, 7)]
+    assert data["total"] == 2
+    page = client.get("/books/", params={**params, "max_price": 20, "cursor": ""}).json()
+    assert [b["price"] for b in page["items"]] == [15.0]
+    out = client.get("/books/", params={"author_name": "columnar writer", "in_stock": False}).json()
+    assert [b["price"] for b in out["items"]] == [5.0]
+
+def test_book_etags_follow_embedded_author_counts():
+    author_id = client.post("/authors/", json={"name": "Etag Author", "email": "etag.author@example.com"}).json()["id"]
+    book_id = client.post("/books/", json={"title": "Counted", "price": 2.0, "author_id": author_id}).json()["id"]
+    etag = client.get(f"/books/{book_id}").headers["etag"]
+    client.post("/books/", json={"title": "Counted 2", "price": 2.0, "author_id": author_id})
+    changed = client.get(f"/books/{book_id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.json()["author"]["books_count"] == 2
+
+def test_author_rename_reaches_books_and_their_etags():
+    author_id = client.post("/authors/", json={"name": "Before Rename", "email": "rename@example.com"}).json()["id"]
+    book_id = client.post("/books/", json={"title": "Renamable Zebra", "price": 2.0, "author_id": author_id}).json()["id"]
+    etag = client.get(f"/books/{book_id}").headers["etag"]
+    list_etag = client.get("/books/").headers["etag"]
+    client.put(f"/authors/{author_id}", json={"name": "After Rename", "email": "rename@example.com"})
+    book = client.get(f"/books/{book_id}", headers={"If-None-Match": etag})
+    assert book.status_code == 200 and book.json()["author"]["name"] == "After Rename"
+    assert client.get("/books/", headers={"If-None-Match": list_etag}).status_code == 200
+    found = client.get("/search/books/", params={"q": "renamable zebra"}).json()
+    assert [b["author"]["name"] for b in found] == ["After Rename"]
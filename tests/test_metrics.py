@@ -0,0 +1,44 @@
+import pytest
+
+from app.metrics import Counter, Histogram, Metric, Registry, record_query, _request_stats, RequestStats
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, route="/x")
+    lines = histogram.render().splitlines()
+    assert lines[:2] == ["# HELP latency_seconds Latency.", "# TYPE latency_seconds histogram"]
+    assert 'latency_seconds_bucket{route="/x",le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/x",le="1"} 3' in lines
+    assert 'latency_seconds_bucket{route="/x",le="+Inf"} 4' in lines
+    assert 'latency_seconds_count{route="/x"} 4' in lines
+    assert 'latency_seconds_sum{route="/x"} 3.65' in lines
+
+def test_metric_subclasses_provide_samples():
+    with pytest.raises(TypeError):
+        Metric("bare", "No samples.")
+
+    class Constant(Metric):
+        def samples(self):
+            return [(self.name, (("kind", "fixed"),), 7)]
+
+    assert Constant("answer", "Fixed.").render().splitlines()[-1] == 'answer{kind="fixed"} 7'
+
+def test_registry_escapes_labels_and_runs_collectors():
+    registry = Registry()
+    counter = registry.register(Counter("hits_total", "Hits."))
+    counter.inc(route='say "hi"\n')
+    registry.collectors.append(lambda: [Counter("empty_total", "Nothing.")])
+    text = registry.render()
+    assert 'hits_total{route="say \\"hi\\"\\n"} 1' in text
+    assert "# TYPE empty_total counter" in text
+
+def test_record_query_adds_to_current_request():
+    stats = RequestStats()
+    token = _request_stats.set(stats)
+    try:
+        record_query("primary", 0.25)
+        record_query("primary", 0.5)
+    finally:
+        _request_stats.reset(token)
+    assert (stats.queries, stats.db_seconds) == (2, 0.75)
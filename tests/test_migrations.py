@@ -0,0 +1,88 @@
+import sqlite3
+import warnings
+from pathlib import Path
+
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app import crud, generate, models, schemas
+from app.database import Base
+
+def _config(url):
+    config = Config(str(Path(__file__).resolve().parents[1] / "alembic.ini"))
+    config.set_main_option("sqlalchemy.url", url)
+    return config
+
+def test_migrations_match_models(tmp_path):
+    url = f"sqlite:///{tmp_path / 'migrated.db'}"
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # expression index reflection is unsupported
+        command.upgrade(_config(url), "head")
+        with create_engine(url).connect() as connection:
+            diff = compare_metadata(MigrationContext.configure(connection), Base.metadata)
+    # The FTS5 tables come from raw DDL and are not part of the metadata
+    diff = [d for d in diff if not (d[0] == "remove_table" and d[1].name.startswith("books_fts"))]
+    assert diff == []
+
+def test_book_category_primary_key_migration_dedupes_links(tmp_path):
+    path = tmp_path / "legacy.db"
+    config = _config(f"sqlite:///{path}")
+    command.upgrade(config, "0001")
+    connection = sqlite3.connect(path)
+    connection.execute("INSERT INTO authors (id, name) VALUES (1, 'A')")
+    connection.execute("INSERT INTO categories (id, name) VALUES (1, 'C')")
+    connection.execute("INSERT INTO books (id, title, price, author_id) VALUES (1, 'T', 1.0, 1)")
+    connection.executemany("INSERT INTO book_category VALUES (?, ?)", [(1, 1), (1, 1), (1, None)])
+    connection.commit()
+    connection.close()
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        command.upgrade(config, "head")
+    connection = sqlite3.connect(path)
+    assert connection.execute("SELECT book_id, category_id FROM book_category").fetchall() == [(1, 1)]
+    plan = connection.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM books WHERE price BETWEEN 1 AND 2 ORDER BY price, id"
+    ).fetchall()
+    assert "ix_books_price_id" in str(plan)
+    # 0003 backfills the counters from the existing rows
+    assert connection.execute("SELECT books_count FROM authors").fetchall() == [(1,)]
+    assert connection.execute("SELECT books_count FROM categories").fetchall() == [(1,)]
+    connection.close()
+    command.downgrade(config, "base")
+
+def test_pre_migration_database_upgrades_to_a_working_schema(tmp_path):
+    # 0001 is the schema create_all made before migrations: stamp, then upgrade
+    path = tmp_path / "legacy.db"
+    config = _config(f"sqlite:///{path}")
+    command.upgrade(config, "0001")
+    connection = sqlite3.connect(path)
+    assert "version" not in {row[1] for row in connection.execute("PRAGMA table_info(books)")}
+    connection.execute("INSERT INTO authors (id, name) VALUES (1, 'A')")
+    connection.execute("INSERT INTO books (id, title, price, author_id) VALUES (1, 'Legacy Title', 1.0, 1)")
+    connection.commit()
+    connection.close()
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        command.upgrade(config, "head")
+    with Session(create_engine(f"sqlite:///{path}")) as db:
+        assert [book.version for book in crud.get_books(db)] == [1]
+        assert crud.create_author(db, schemas.AuthorCreate(name="B", email="b@example.com")).version == 1
+        assert [book.id for book in crud.search_books(db, "legacy")] == [1]  # FTS backfilled
+        assert crud.get_reservation(db, 1) is None
+
+def test_generated_schema_is_stamped_for_upgrades(tmp_path):
+    url = f"sqlite:///{tmp_path / 'generated.db'}"
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        generate.main(["--books", "20", "--database-url", url, "--create-schema"])
+        command.upgrade(_config(url), "head")  # what run.py does on start
+    with create_engine(url).connect() as connection:
+        assert MigrationContext.configure(connection).get_current_revision() == "0006"
+    with Session(create_engine(url)) as db:
+        assert len(crud.get_books(db)) == 20
@@ -0,0 +1,39 @@
+import logging
+
+import pytest
+from sqlalchemy import text
+
+from app import crud, profiling, schemas
+from app.database import instrument_engine
+
+@pytest.fixture
+def profiled(engine, monkeypatch):
+    instrument_engine(engine, "test")
+    monkeypatch.setattr(profiling.settings, "enabled", True)
+    monkeypatch.setattr(profiling.settings, "n_plus_one_threshold", 3)
+    profile = profiling.QueryProfile("GET", "/test")
+    token = profiling._current.set(profile)
+    yield profile
+    profiling._current.reset(token)
+
+def test_profile_records_statements_and_flags_n_plus_one(db, profiled):
+    author = crud.create_author(db, schemas.AuthorCreate(name="A", email="a@example.com"))
+    for book_id in range(3):
+        crud.get_book(db, book_id)
+    crud.get_author(db, author.id)
+    crud.get_author(db, author.id)
+
+    data = profiled.to_dict()
+    assert data["query_count"] == len(profiled.queries) >= 6
+    suspects = data["n_plus_one"]
+    assert len(suspects) == 1 and suspects[0]["count"] == 3 and "FROM books" in suspects[0]["statement"]
+
+def test_slow_queries_are_logged_with_plan(db, engine, monkeypatch, caplog):
+    instrument_engine(engine, "test")
+    monkeypatch.setattr(profiling.settings, "slow_query_ms", 0)
+    with caplog.at_level(logging.WARNING, logger="app.slow_queries"):
+        crud.get_books(db, search=schemas.BookSearch(min_price=5))
+        db.execute(text("SELECT 1"))
+    messages = [record.getMessage() for record in caplog.records]
+    books = next(message for message in messages if "FROM books" in message)
+    assert "ix_books_price_id" in books  # EXPLAIN QUERY PLAN output
@@ -0,0 +1,51 @@
+from app import crud, schemas
+from app.search import InvertedIndex
+
+
+def _index():
+    index = InvertedIndex({"title": 2.0, "description": 1.0})
+    index.add(1, {"title": "Harry Potter", "description": "A young wizard"})
+    index.add(2, {"title": "The Hobbit", "description": "Harry meets a wizard"})
+    index.add(3, {"title": "Dune", "description": None})
+    return index
+
+def test_index_ranks_title_matches_first():
+    assert _index().search("harry") == [1, 2]
+
+def test_index_prefix_and_all_terms():
+    index = _index()
+    assert index.search("wiz") == [1, 2]
+    assert index.search("harr hob") == [2]
+    assert index.search("harry dune") == []
+    assert index.search("harry", fields=("title",)) == [1]
+
+def test_index_tracks_updates_and_deletes():
+    index = _index()
+    index({"id": 1}, {"id": 1, "title": "Renamed", "description": ""})
+    assert index.search("potter") == []
+    assert index.search("renamed") == [1]
+    index({"id": 2}, None)
+    assert index.search("wizard") == []
+
+def test_fulltext_search_sqlite(db):
+    author = crud.create_author(db, schemas.AuthorCreate(name="Author", email="a@example.com"))
+    for title, description in [
+        ("Harry Potter", "A young wizard"),
+        ("The Hobbit", "Harry meets a wizard"),
+        ("Dune", "Desert planet"),
+    ]:
+        crud.create_book(db, schemas.BookCreate(
+            title=title, isbn=title[:13], description=description, price=10.0, author_id=author.id
+        ))
+    assert [b.title for b in crud.search_books(db, "harr")] == ["Harry Potter", "The Hobbit"]
+    assert crud.search_books(db, "!?") == []
+    assert crud.get_books_count(db, search=schemas.BookSearch(title="--")) == 0
+    search = schemas.BookSearch(title="harry")
+    assert [b.title for b in crud.get_books(db, search=search)] == ["Harry Potter"]
+    assert crud.get_books_count(db, search=search) == 1
+
+    dune = crud.search_books(db, "desert")[0]
+    crud.update_book(db, dune.id, schemas.BookUpdate(title="Arrakis"))
+    assert [b.title for b in crud.search_books(db, "arrakis")] == ["Arrakis"]
+    crud.delete_book(db, dune.id)
+    assert crud.search_books(db, "arrakis") == []
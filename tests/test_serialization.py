@@ -0,0 +1,29 @@
+import json
+from datetime import datetime
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app import crud, schemas
+from app.serialization import dumps, model_response
+
+def test_dumps_matches_jsonable_encoder():
+    content = {
+        "when": datetime(2024, 1, 2, 3, 4, 5),
+        "facets": schemas.FacetValue(id=1, name="x", count=2),
+        "items": [{"price": 1.5, "title": "Ünïcode"}],
+    }
+    assert json.loads(dumps(content)) == jsonable_encoder(content)
+
+def test_model_response_matches_response_model_output(db):
+    author = crud.create_author(db, schemas.AuthorCreate(name="A", email="a@example.com"))
+    category = crud.create_category(db, schemas.CategoryCreate(name="C"))
+    crud.create_book(db, schemas.BookCreate(
+        title="T", isbn="1", price=2.5, author_id=author.id, category_ids=[category.id],
+    ))
+    books = crud.get_books(db)
+    response = model_response(TypeAdapter(List[schemas.BookResponse]), books)
+    expected = jsonable_encoder([schemas.BookResponse.model_validate(book) for book in books])
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == expected
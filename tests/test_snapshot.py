@@ -0,0 +1,76 @@
+import pytest
+
+from app.snapshot import Snapshot, compact, journal_path, open_store, write_snapshot
+from app.store import MemoryStore
+
+def _store():
+    return MemoryStore(
+        authors=[{"id": 1, "name": "A"}, {"id": 2, "name": "B"}],
+        categories=[{"id": 1, "name": "C"}],
+        books=[
+            {"id": 1, "title": "Seed", "author": {"id": 1}, "category": {"id": 1}, "price": 9.5, "stock": 3},
+            {"id": 2, "title": "Odd", "author_id": 2, "category_ids": [1], "price": 12, "isbn": None},
+        ],
+    )
+
+def _open(data_dir):
+    store, snapshot = open_store(str(data_dir), _store)
+    journal = store.share(journal_path(str(data_dir)), snapshot)
+    return store, journal
+
+def test_snapshot_round_trip_keeps_versions_and_counts(tmp_path):
+    store = _store()
+    store.books.replace(1, {"title": "Seed v2", "author_id": 1, "category_id": 1, "price": 9.5})
+    store.books.delete(2)
+    path = str(tmp_path / "catalog.snapshot")
+    write_snapshot(store, path)
+
+    snapshot = Snapshot(path)
+    loaded = MemoryStore()
+    snapshot.restore(loaded)
+    snapshot.close()
+    assert snapshot.journal_id is None
+    assert loaded.books.get(1)["title"] == "Seed v2"
+    assert loaded.books.get(1)["author"] is loaded.authors.get(1)
+    assert loaded.books.version(1) == 2 and loaded.books.revision == store.books.revision
+    assert loaded.books.insert({"title": "New"})["id"] == 3  # deleted ids are not reused
+    assert [a["books_count"] for a in loaded.authors] == [1, 0]
+
+def test_warm_start_replays_only_the_journal_tail(tmp_path):
+    store, journal = _open(tmp_path)
+    store.books.insert({"title": "Before", "author_id": 2})
+    write_snapshot(store, str(tmp_path / "catalog.snapshot"), journal)
+    store.books.insert({"title": "After", "author_id": 2})
+    store.authors.replace(1, {"name": "Renamed"})
+    journal.close()
+
+    restarted, journal = _open(tmp_path)
+    assert journal.records == 2
+    assert [b["title"] for b in restarted.books] == ["Seed", "Odd", "Before", "After"]
+    assert restarted.authors.get(2)["books_count"] == 3
+    assert restarted.authors.get(1)["name"] == "Renamed"
+    assert restarted.books.get(1)["stock"] == 3 and "stock" not in restarted.books.get(2)
+    assert restarted.books.get(2)["isbn"] is None
+    assert restarted.books.revision == store.books.revision
+    journal.close()
+
+def test_compact_folds_the_journal_into_the_snapshot(tmp_path):
+    assert compact(str(tmp_path), _store) is not None  # first start snapshots the seed
+    store, journal = _open(tmp_path)
+    store.books.insert({"title": "Kept", "author_id": 1})
+    journal.close()
+
+    snapshot_id = compact(str(tmp_path), _store)
+    assert compact(str(tmp_path), _store) is None  # nothing new since
+    restarted, journal = _open(tmp_path)
+    assert journal.base == snapshot_id and journal.records == 0
+    assert restarted.books.get(3)["title"] == "Kept"
+    journal.close()
+
+def test_journal_for_another_snapshot_is_rejected(tmp_path):
+    compact(str(tmp_path), _store)
+    other = tmp_path / "other"
+    compact(str(other), _store)
+    (tmp_path / "catalog.journal").write_bytes((other / "catalog.journal").read_bytes())
+    with pytest.raises(ValueError):
+        _open(tmp_path)
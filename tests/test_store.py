@@ -0,0 +1,95 @@
+from app.store import MemoryStore, Table
+
+
+def test_table_allocates_monotonic_ids():
+    table = Table([{"id": 5, "name": "seed"}])
+    first = table.insert({"name": "a"})
+    table.delete(first["id"])
+    second = table.insert({"name": "b"})
+    assert first["id"] == 6
+    assert second["id"] == 7
+
+def test_table_get_replace_delete():
+    table = Table()
+    row = table.insert({"name": "a"})
+    assert table.get(row["id"]) is row
+    assert table.replace(row["id"], {"name": "b"})["name"] == "b"
+    assert table.replace(999, {"name": "c"}) is None
+    assert table.delete(row["id"])["name"] == "b"
+    assert table.get(row["id"]) is None
+    assert table.delete(row["id"]) is None
+
+def test_table_slice_keeps_insertion_order():
+    table = Table()
+    for i in range(5):
+        table.insert({"n": i})
+    table.delete(2)
+    assert [r["n"] for r in table.slice(1, 2)] == [2, 3]
+    assert len(table) == 4
+
+def test_table_after_skips_deleted_rows():
+    table = Table()
+    for i in range(200):
+        table.insert({"n": i})
+    for row_id in range(2, 200, 2):
+        table.delete(row_id)
+    assert [r["id"] for r in table.after(None, 3)] == [1, 3, 5]
+    assert [r["id"] for r in table.after(5, 2)] == [7, 9]
+    assert [r["id"] for r in table.after(9, 2, lambda r: r["id"] > 100)] == [101, 103]
+
+def test_memory_store_counts_books_per_author_and_category():
+    store = MemoryStore(
+        authors=[{"id": 1, "name": "A"}, {"id": 2, "name": "B"}],
+        categories=[{"id": 1, "name": "C"}],
+        books=[{"id": 1, "author": {"id": 1}, "category": {"id": 1}}],
+    )
+    assert store.authors.get(1)["books_count"] == 1 and store.authors.get(2)["books_count"] == 0
+    store.books.insert({"author_id": 1, "category_ids": [1, 1]})
+    assert store.authors.get(1)["books_count"] == 2 and store.categories.get(1)["books_count"] == 2
+    version = store.authors.version(2)
+    store.books.replace(2, {"author_id": 2, "category_ids": []})
+    assert store.authors.version(2) == version + 1  # ETags of the author move with its count
+    assert store.categories.get(1)["books_count"] == 1
+    # Counts survive the author row being replaced or re-inserted
+    store.authors.replace(1, {"name": "A2", "books_count": 99})
+    store.authors.delete(2)
+    store.authors.insert({"name": "B"}, row_id=2)
+    assert [a["books_count"] for a in store.authors] == [1, 1]
+    store.books.delete(1)
+    assert store.authors.get(1)["books_count"] == 0 and store.categories.get(1)["books_count"] == 0
+
+def test_columnar_books_round_trip_and_compact():
+    store = MemoryStore(authors=[{"id": 1, "name": "A"}])
+    first = store.books.insert({"title": "a", "price": 3, "stock": 2, "isbn": None, "tag": "x"})
+    assert first["price"] == 3.0 and first["stock"] == 2 and first["isbn"] is None and first["tag"] == "x"
+    assert "stock_quantity" not in first and first["author"] is None
+    for i in range(200):
+        store.books.insert({"title": f"b{i}", "author_id": 1, "pages": None})
+    for row_id in range(2, 150):
+        store.books.delete(row_id)  # tombstones are compacted along the way
+    store.books.update(1, author_id=1)
+    assert store.books.get(1)["author"] is store.authors.get(1)
+    assert store.books.version(1) == 2 and store.books.get(2) is None
+    assert len(store.books) == 53 and [b["id"] for b in store.books.slice(1, 2)] == [150, 151]
+    assert store.authors.get(1)["books_count"] == 53
+    store.books.insert({"title": "back"}, row_id=2)
+    assert [b["id"] for b in store.books.after(None, 3)] == [1, 2, 150]
+
+def test_find_books_filters_columns():
+    store = MemoryStore(books=[
+        {"id": 1, "price": 9.5, "stock": 1, "author_id": 1},
+        {"id": 2, "price": 12.0, "stock_quantity": 0, "author_id": 2},
+        {"id": 3, "price": 15.0, "stock_quantity": 4, "author_id": 2},
+        {"id": 4, "price": None, "author_id": 1},
+    ])
+    assert store.find_books() == [1, 2, 3, 4]
+    assert store.find_books(min_price=10) == [2, 3]
+    assert store.find_books(max_price=12, in_stock=True) == [1]
+    assert store.find_books(in_stock=False) == [2, 4]
+    assert store.find_books(author_ids=[1]) == [1, 4]
+    assert store.find_books(author_ids=[2], in_stock=True, min_price=10, max_price=20) == [3]
+    assert store.books.columns(("price", "author_id", "category_ids"), [4, 3, 9]) == {
+        "price": [None, 15.0], "author_id": [1, 2], "category_ids": [None, None],
+    }
+    store.books.delete(2)
+    assert store.books.columns(("stock_quantity",)) == {"stock_quantity": [None, 4, None]}